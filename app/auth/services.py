@@ -20,6 +20,10 @@ class AuthenticationService:
             return
         return self._client.close()
 
+    def reset(self) -> None:
+        """Forget client inherited from parent process without closing its connections"""
+        self._client = None
+
     @property
     def client(self) -> AuthenticationClient:
         if client := self._client:
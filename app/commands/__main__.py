@@ -1,9 +1,16 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
 import typer
 
-from app import setup
+from app import db, setup
+from app.commands import profile
+from app.commands import seed as seed_data
 from app.config import config
 from app.producer.models import URLSchema, URLSchemaEndpoint
 from app.producer.services import producer
+from app.utils import to_json
 
 typer_app = typer.Typer()
 
@@ -31,6 +38,116 @@ def update_url_schema() -> None:
     typer.echo("URL scheme was published")
 
 
+@typer_app.command(name="seed-data")
+def seed(
+    seed: int = typer.Option(42, help="Random seed, the same seed generates the same data"),
+    accounts: int = typer.Option(100, min=1),
+    journeys_per_account: int = typer.Option(20, min=1),
+    recommendations: int = typer.Option(1_000_000, min=0),
+    statuses_depth: int = typer.Option(5, min=0, help="Max number of platform statuses per recommendation"),
+    goal_updates: int = typer.Option(10_000, min=0),
+    days: int = typer.Option(365, min=1, help="Recommendations are created during this number of days"),
+    end_date: datetime = typer.Option(datetime(2022, 12, 1), help="Creation date of the newest recommendation"),
+    truncate: bool = typer.Option(False, help="Remove all existing data before seeding"),
+) -> None:
+    """Fill database with synthetic data for performance testing"""
+
+    if not truncate and any(seed_data.count_rows().values()):
+        typer.echo("Database is not empty, use --truncate to remove existing data")
+        raise typer.Exit(code=1)
+
+    options = seed_data.SeedOptions(
+        seed=seed,
+        accounts=accounts,
+        journeys_per_account=journeys_per_account,
+        recommendations=recommendations,
+        statuses_depth=statuses_depth,
+        goal_updates=goal_updates,
+        days=days,
+        end_date=end_date,
+    )
+    counts = seed_data.seed(options=options, truncate=truncate)
+    counts["decision_rollups"] = seed_data.rebuild_rollups()
+
+    for table, count in counts.items():
+        typer.echo(f"{table}: {count} rows")
+
+
+@typer_app.command(name="rebuild-decision-rollups")
+def rebuild_decision_rollups(
+    account_id: Optional[int] = typer.Option(None, help="Rebuild rollups of one account only"),
+) -> None:
+    """Rebuild daily rollups of decisions from recommendations in one transaction"""
+    from app.recommendations import services
+
+    with db.begin():
+        count = services.rebuild_decision_rollups(account_id=account_id)
+
+    typer.echo(f"Decision rollups were rebuilt: {count} rows")
+
+
+@typer_app.command(name="archive-recommendations")
+def archive_recommendations(
+    batch_size: Optional[int] = typer.Option(None, min=1, help="By default `ARCHIVE_BATCH_SIZE`"),
+    max_batches: Optional[int] = typer.Option(None, min=1, help="By default until everything is archived"),
+) -> None:
+    """Move old expired and decided recommendations to archive tables"""
+    from app.recommendations import services
+
+    count, statuses_count = services.archive_recommendations(batch_size=batch_size, max_batches=max_batches)
+    typer.echo(f"Archived recommendations: {count}, platform statuses: {statuses_count}")
+
+
+@typer_app.command(name="maintain-partitions")
+def maintain_partitions() -> None:
+    """Create partitions of platform statuses ahead and drop partitions out of retention"""
+    from app.recommendations import services
+
+    created, dropped = services.maintain_partitions()
+    typer.echo(f"Created partitions: {', '.join(created) or '-'}")
+    typer.echo(f"Dropped partitions: {', '.join(dropped) or '-'}")
+
+
+@typer_app.command(name="export-openapi")
+def export_openapi(output: Path = typer.Argument(Path("openapi.json"))) -> None:
+    """Precompute OpenAPI schema, set `OPENAPI_SCHEMA_FILE` to serve it"""
+    from fastapi import FastAPI
+
+    from app.main import create_app
+
+    app = create_app()
+    output.write_text(to_json(FastAPI.openapi(app)))
+    typer.echo(f"OpenAPI schema was saved to {output}")
+
+
+@typer_app.command(name="startup-profile")
+def startup_profile(
+    process: str = typer.Option("api", help=f"One of: {', '.join(profile.ENTRYPOINTS)}"),
+    top: int = typer.Option(20, min=1, help="Number of the slowest imports to show"),
+    target_ms: Optional[float] = typer.Option(None, help="Fail when time to ready is bigger"),
+) -> None:
+    """Show import time breakdown and time to ready of the process"""
+
+    if process not in profile.ENTRYPOINTS:
+        raise typer.BadParameter(f"Unknown process {process}")
+
+    report = profile.profile_startup(process)
+
+    typer.echo(f"Time to ready: {report['ready_ms']:.1f} ms, imports: {report['imports_ms']:.1f} ms")
+    typer.echo("\nPackages (self time):")
+    for package, self_ms in list(report["packages"].items())[:top]:
+        typer.echo(f"{self_ms:>10.1f} ms  {package}")
+
+    typer.echo("\nThe slowest imports (cumulative time):")
+    slowest = sorted(report["imports"], key=lambda item: item["cumulative_ms"], reverse=True)
+    for item in slowest[:top]:
+        typer.echo(f"{item['cumulative_ms']:>10.1f} ms  {item['module']}")
+
+    if target_ms is not None and report["ready_ms"] > target_ms:
+        typer.echo(f"Time to ready is bigger than target {target_ms} ms")
+        raise typer.Exit(code=1)
+
+
 @typer_app.command(name="hello")
 def hello(name: str) -> None:
     typer.echo(f"Hello world {name}")
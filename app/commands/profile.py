@@ -0,0 +1,76 @@
+"""
+Startup profile of service processes, based on `python -X importtime` output
+"""
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+from app.types import StrDict
+
+# entrypoints of processes: code that makes process ready to work
+ENTRYPOINTS = {
+    "api": "import app.main; app.main.create_app()",
+    "consumer": "import app.consumer.__main__",
+    "worker": "import app.worker.worker",
+    "commands": "import app.commands.__main__",
+}
+
+_IMPORT_TIME_RE = re.compile(r"^import time:\s+(?P<self>\d+)\s+\|\s+(?P<cumulative>\d+)\s+\|(?P<name>\s*\S+)\s*$")
+
+_SCRIPT = """
+import time
+started = time.perf_counter()
+{code}
+print((time.perf_counter() - started) * 1000)
+"""
+
+
+def parse_import_time(output: str) -> list[StrDict]:
+    """Parse stderr of `python -X importtime` into list of imports"""
+    imports = []
+    for line in output.splitlines():
+        match = _IMPORT_TIME_RE.match(line)
+        if not match:
+            continue
+        name = match["name"]
+        imports.append(
+            {
+                "module": name.strip(),
+                # nesting level is shown by indentation of module name
+                "level": (len(name) - len(name.lstrip())) // 2,
+                "self_ms": int(match["self"]) / 1000,
+                "cumulative_ms": int(match["cumulative"]) / 1000,
+            }
+        )
+    return imports
+
+
+def group_by_package(imports: list[StrDict]) -> dict[str, float]:
+    """Sum self import time by top level package"""
+    packages: defaultdict[str, float] = defaultdict(float)
+    for item in imports:
+        packages[item["module"].split(".")[0]] += item["self_ms"]
+    return dict(sorted(packages.items(), key=lambda item: item[1], reverse=True))
+
+
+def profile_startup(process: str) -> StrDict:
+    """Run entrypoint of the process in a clean interpreter and collect import times"""
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _SCRIPT.format(code=ENTRYPOINTS[process])],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"Failed to start {process}:\n" + "\n".join(errors[-10:]))
+
+    imports = parse_import_time(result.stderr)
+    return {
+        "process": process,
+        "ready_ms": float(result.stdout.strip().splitlines()[-1]),
+        "imports_ms": sum(item["self_ms"] for item in imports),
+        "packages": group_by_package(imports),
+        "imports": imports,
+    }
@@ -0,0 +1,380 @@
+"""
+Generator of synthetic data for performance testing. Data is generated
+deterministically for given seed, so runs on different machines are comparable.
+"""
+import csv
+import hashlib
+import io
+import json
+import logging
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Iterator
+
+import sqlalchemy as sa
+
+from app import db
+from app.recommendations.enums import RecommendationStatus
+from app.recommendations.models import PlatformStatus
+from app.recommendations.states import PlatformState, get_platforms_state
+from app.utils import to_json
+
+logger = logging.getLogger(__name__)
+
+PLATFORMS = ("facebook", "google", "tiktok", "snapchat")
+OBJECT_TYPES = ("campaign", "adset", "ad")
+PLATFORM_STATUS_TYPES = ("pending", "success", "error")
+CURRENCIES = ("USD", "EUR", "GBP")
+
+# statuses of recommendations, that are not sent to platforms
+NOT_SENT_STATUSES = (RecommendationStatus.ACTIVE, RecommendationStatus.REJECTED)
+
+# statuses of not the latest recommendations of journey, most of them
+# are expired by the next recommendation
+DECIDED_STATUSES_WEIGHTS = {
+    RecommendationStatus.EXPIRED: 80,
+    RecommendationStatus.ACCEPTED: 8,
+    RecommendationStatus.REJECTED: 7,
+    RecommendationStatus.ERROR: 3,
+    RecommendationStatus.ACCEPTING: 2,
+}
+
+RECOMMENDATION_COLUMNS = (
+    "id",
+    "uuid",
+    "creation_date",
+    "type",
+    "enabled",
+    "account_id",
+    "journey_id",
+    "media_plan_id",
+    "journey_name",
+    "version",
+    "taxonomy_hash",
+    "platforms_summary",
+    "platforms_state",
+    "user_id",
+    "currency",
+    "status",
+    "decision_time",
+    "reason",
+)
+PLATFORM_STATUS_COLUMNS = ("id", "recommendation_id", "platform", "data", "data_hash")
+GOAL_UPDATE_COLUMNS = ("id", "journey_id", "updated_at")
+TAXONOMY_COLUMNS = ("journey_id", "data")
+
+
+class SeedOptions:
+    def __init__(
+        self,
+        seed: int,
+        accounts: int,
+        journeys_per_account: int,
+        recommendations: int,
+        statuses_depth: int,
+        goal_updates: int,
+        days: int,
+        end_date: datetime,
+    ) -> None:
+        self.seed = seed
+        self.accounts = accounts
+        self.journeys_per_account = journeys_per_account
+        self.recommendations = recommendations
+        self.statuses_depth = statuses_depth
+        self.goal_updates = goal_updates
+        self.days = days
+        self.end_date = end_date
+
+    @property
+    def start_date(self) -> datetime:
+        return self.end_date - timedelta(days=self.days)
+
+
+def _split_by_weights(rng: random.Random, total: int, size: int) -> list[int]:
+    """
+    Split total number of items into `size` parts with skewed distribution:
+    few parts are much bigger than others
+    """
+    weights = [rng.paretovariate(1.2) for _ in range(size)]
+    weights_sum = sum(weights)
+    counts = [int(total * weight / weights_sum) for weight in weights]
+    # give remainder to the biggest part
+    counts[weights.index(max(weights))] += total - sum(counts)
+    return counts
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _platform_status_data(rng: random.Random) -> list[dict[str, Any]]:
+    data = []
+    for _ in range(rng.randint(1, 5)):
+        status = rng.choices(PLATFORM_STATUS_TYPES, weights=(20, 75, 5))[0]
+        data.append(
+            {
+                "object_id": str(rng.randint(10**9, 10**10)),
+                "object_type": rng.choice(OBJECT_TYPES),
+                "status": status,
+                "details": "Synthetic error" if status == "error" else None,
+            }
+        )
+    return data
+
+
+def _jsonb_text(value: Any) -> str:
+    """Text of value normalized like by `jsonb`, keys of objects are ordered by length, then by bytes"""
+    if isinstance(value, dict):
+        items = sorted(value.items(), key=lambda item: (len(item[0].encode()), item[0].encode()))
+        return "{" + ", ".join(f"{_jsonb_text(key)}: {_jsonb_text(item)}" for key, item in items) + "}"
+    if isinstance(value, list):
+        return "[" + ", ".join(_jsonb_text(item) for item in value) + "]"
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _data_hash(data: list[dict[str, Any]]) -> str:
+    """The same hash as computed by database in `insert_platform_status`"""
+    return hashlib.md5(_jsonb_text(data).encode()).hexdigest()
+
+
+class SeedGenerator:
+    def __init__(self, options: SeedOptions) -> None:
+        self.options = options
+        self.rng = random.Random(options.seed)
+        self._journey_ids: list[int] = []
+        # statuses of generated recommendations, index is recommendation id - 1
+        self._statuses: list[RecommendationStatus] = []
+        # hashes of interned taxonomies by journey id, see `_intern_taxonomies`
+        self.taxonomy_hashes: dict[int, str] = {}
+
+    def _taxonomy(self, journey_id: int) -> dict[str, Any]:
+        rng = random.Random(journey_id)
+        return {
+            "journey_id": journey_id,
+            "channels": sorted(rng.sample(PLATFORMS, k=rng.randint(1, len(PLATFORMS)))),
+            "budget": {"total": rng.randint(100, 100_000), "period": "month"},
+        }
+
+    def generate_taxonomies(self) -> Iterator[tuple]:
+        for journey_index in range(self.options.accounts * self.options.journeys_per_account):
+            journey_id = 10_000 + journey_index
+            yield journey_id, to_json(self._taxonomy(journey_id))
+
+    def _platform_statuses(self, recommendation_id: int) -> list[tuple[str, list[dict[str, Any]]]]:
+        """
+        Platform statuses of recommendation are generated by own random generator, so
+        the same statuses are generated for summary of recommendation and for their rows
+        """
+        rng = random.Random(self.options.seed << 40 | recommendation_id)
+        return [
+            (rng.choice(PLATFORMS), _platform_status_data(rng))
+            for _ in range(rng.randint(0, self.options.statuses_depth))
+        ]
+
+    def _platforms_summary(self, recommendation_id: int) -> dict[str, PlatformState]:
+        """The latest state of every platform, like kept by consumer of platform statuses"""
+        summary = {}
+        for platform, data in self._platform_statuses(recommendation_id):
+            state = PlatformStatus(id=0, recommendation_id=recommendation_id, platform=platform, data=data).state
+            if state is not None:
+                summary[platform] = state
+        return summary
+
+    def generate_platform_statuses(self) -> Iterator[tuple]:
+        """Generate platform statuses for recommendations, that was sent to platforms"""
+        platform_status_id = 0
+        for recommendation_id, status in enumerate(self._statuses, start=1):
+            if status in NOT_SENT_STATUSES:
+                continue
+
+            for platform, data in self._platform_statuses(recommendation_id):
+                platform_status_id += 1
+                yield platform_status_id, recommendation_id, platform, to_json(data), _data_hash(data)
+
+    def generate_recommendations(self) -> Iterator[tuple]:
+        options = self.options
+        rng = self.rng
+        window = (options.end_date - options.start_date).total_seconds()
+
+        journeys_count = options.accounts * options.journeys_per_account
+        journeys_sizes = _split_by_weights(rng, total=options.recommendations, size=journeys_count)
+        decided_statuses = list(DECIDED_STATUSES_WEIGHTS)
+        decided_weights = list(DECIDED_STATUSES_WEIGHTS.values())
+
+        recommendation_id = 0
+        for journey_index, journey_size in enumerate(journeys_sizes):
+            account_id = 1000 + journey_index // options.journeys_per_account
+            journey_id = 10_000 + journey_index
+            self._journey_ids.append(journey_id)
+            journey_name = f"Journey {journey_id}"
+            taxonomy_hash = self.taxonomy_hashes.get(journey_id)
+            currency = CURRENCIES[journey_id % len(CURRENCIES)]
+
+            offsets = sorted(rng.random() * window for _ in range(journey_size))
+            for index, offset in enumerate(offsets):
+                recommendation_id += 1
+                creation_date = options.start_date + timedelta(seconds=offset)
+                is_latest = index == journey_size - 1
+
+                if is_latest and rng.random() < 0.7:
+                    status = RecommendationStatus.ACTIVE
+                else:
+                    status = rng.choices(decided_statuses, weights=decided_weights)[0]
+
+                is_decided = status in (
+                    RecommendationStatus.REJECTED,
+                    RecommendationStatus.ACCEPTING,
+                    RecommendationStatus.ACCEPTED,
+                )
+                decision_time = creation_date + timedelta(minutes=rng.randint(1, 60 * 24)) if is_decided else None
+
+                self._statuses.append(status)
+                summary = self._platforms_summary(recommendation_id) if status not in NOT_SENT_STATUSES else {}
+                platforms_state = get_platforms_state(summary)
+
+                yield (
+                    recommendation_id,
+                    _uuid(rng),
+                    creation_date.isoformat(),
+                    "budget",
+                    True,
+                    account_id,
+                    journey_id,
+                    journey_id * 10,
+                    journey_name,
+                    1,
+                    taxonomy_hash,
+                    to_json(summary),
+                    platforms_state.value if platforms_state else None,
+                    rng.randint(1, 500) if is_decided else None,
+                    currency,
+                    status.value,
+                    decision_time.isoformat() if decision_time else None,
+                    "Synthetic reason" if status == RecommendationStatus.REJECTED else None,
+                )
+
+    def generate_goal_updates(self) -> Iterator[tuple]:
+        window = (self.options.end_date - self.options.start_date).total_seconds()
+        for goal_id in range(1, self.options.goal_updates + 1):
+            updated_at = self.options.start_date + timedelta(seconds=self.rng.random() * window)
+            yield goal_id, self.rng.choice(self._journey_ids), updated_at.isoformat()
+
+
+def _copy(cursor: Any, table: str, columns: Iterable[str], rows: Iterable[tuple], chunk_size: int) -> int:
+    """Load rows into table using COPY, rows are sent by chunks to limit memory usage"""
+
+    statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+
+    count = 0
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        # `None` is written as empty unquoted value, which is NULL for CSV format
+        writer.writerow(row)
+        count += 1
+        if count % chunk_size == 0:
+            buffer.seek(0)
+            cursor.copy_expert(statement, buffer)
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        buffer.seek(0)
+        cursor.copy_expert(statement, buffer)
+
+    logger.info(f"Copied {count} rows into {table}")
+    return count
+
+
+def _intern_taxonomies(cursor: Any, generator: SeedGenerator, chunk_size: int) -> int:
+    """Taxonomies are keyed by hash computed by database, hashes are given to generator for recommendations"""
+    cursor.execute("CREATE TEMPORARY TABLE seed_taxonomies (journey_id bigint, data jsonb) ON COMMIT DROP;")
+    _copy(
+        cursor,
+        table="seed_taxonomies",
+        columns=TAXONOMY_COLUMNS,
+        rows=generator.generate_taxonomies(),
+        chunk_size=chunk_size,
+    )
+    cursor.execute(
+        """
+        INSERT INTO taxonomies (hash, data)
+        SELECT DISTINCT md5(data::text), data FROM seed_taxonomies
+        ON CONFLICT DO NOTHING;
+        """
+    )
+    count = cursor.rowcount
+    cursor.execute("SELECT journey_id, md5(data::text) FROM seed_taxonomies;")
+    generator.taxonomy_hashes = dict(cursor.fetchall())
+    return count
+
+
+def _reset_sequence(cursor: Any, table: str) -> None:
+    cursor.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), coalesce(MAX(id), 1)) FROM {table};")
+
+
+def seed(options: SeedOptions, truncate: bool, chunk_size: int = 50_000) -> dict[str, int]:
+    """Fill database with synthetic data, returns number of inserted rows per table"""
+    from app.recommendations import services
+
+    # ids of recommendations start from 1, statuses are copied into existing partitions only
+    services.create_partitions(max_id=options.recommendations)
+
+    generator = SeedGenerator(options)
+    tables = ("recommendations", "platform_statuses", "goal_updates")
+
+    connection = db.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        if truncate:
+            cursor.execute(f"TRUNCATE {', '.join(tables)}, taxonomies RESTART IDENTITY CASCADE;")
+
+        counts = {
+            "taxonomies": _intern_taxonomies(cursor, generator=generator, chunk_size=chunk_size),
+            "recommendations": _copy(
+                cursor,
+                table="recommendations",
+                columns=RECOMMENDATION_COLUMNS,
+                rows=generator.generate_recommendations(),
+                chunk_size=chunk_size,
+            ),
+            "platform_statuses": _copy(
+                cursor,
+                table="platform_statuses",
+                columns=PLATFORM_STATUS_COLUMNS,
+                rows=generator.generate_platform_statuses(),
+                chunk_size=chunk_size,
+            ),
+            "goal_updates": _copy(
+                cursor,
+                table="goal_updates",
+                columns=GOAL_UPDATE_COLUMNS,
+                rows=generator.generate_goal_updates(),
+                chunk_size=chunk_size,
+            ),
+        }
+        for table in tables:
+            _reset_sequence(cursor, table=table)
+        cursor.execute("ANALYZE;")
+        connection.commit()
+    finally:
+        connection.close()
+
+    return counts
+
+
+def rebuild_rollups() -> int:
+    """Rollups are not maintained by COPY, they are rebuilt from seeded data"""
+    from app.recommendations import services
+
+    with db.begin():
+        return services.rebuild_decision_rollups()
+
+
+def count_rows() -> dict[str, int]:
+    with db.connect():
+        return {
+            table: db.select_scalar(sa.text(f"SELECT count(*) FROM {table}"))
+            for table in ("recommendations", "platform_statuses", "goal_updates")
+        }
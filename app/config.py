@@ -19,6 +19,66 @@ class Config(BaseSettings):
     REDIS_DB: int = Field(13)
     JWT_SECRET_KEY: str = Field(...)
 
+    # Web server, by default number of workers is number of available CPUs
+    WEB_CONCURRENCY: int | None = Field(None)
+    WEB_BIND: str = Field("0.0.0.0:8000")
+    WEB_TIMEOUT_SECONDS: int = Field(60)
+
+    # Celery worker, concurrency by default is number of CPUs
+    WORKER_CONCURRENCY: int | None = Field(None)
+    WORKER_PREFETCH_MULTIPLIER: int = Field(1)
+    WORKER_BATCH_SIZE: int = Field(500)
+
+    # Requests instrumentation, in strict mode request fails when it executes
+    # more SQL statements than budget (used by tests to catch N+1 queries)
+    QUERY_BUDGET: int = Field(10)
+    QUERY_BUDGET_STRICT: bool = Field(False)
+
+    # Slow query log, set threshold to empty value to disable it
+    SLOW_QUERY_THRESHOLD_MS: float | None = Field(200)
+    SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS: float = Field(600)
+    SLOW_QUERY_MAX_FINGERPRINTS: int = Field(500)
+
+    # Precomputed OpenAPI schema, see command `export-openapi`
+    OPENAPI_SCHEMA_FILE: str | None = Field(None)
+
+    # Readiness probe, every dependency is checked in background with own interval
+    HEALTH_DATABASE_INTERVAL_SECONDS: float = Field(5)
+    HEALTH_REDIS_INTERVAL_SECONDS: float = Field(5)
+    HEALTH_KAFKA_INTERVAL_SECONDS: float = Field(30)
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = Field(5)
+
+    # List page is rendered to JSON by database instead of response model
+    PAGE_JSON_RENDERING: bool = Field(True)
+
+    # Cache of list pages in Redis, invalidated by version of account
+    PAGE_CACHE_ENABLED: bool = Field(False)
+    PAGE_CACHE_TTL_SECONDS: int = Field(300)
+    PAGE_CACHE_TIMEOUT_SECONDS: float = Field(0.1)
+
+    # Coalescing of identical concurrent reads, result is shared for a window after read
+    SINGLE_FLIGHT_ENABLED: bool = Field(True)
+    SINGLE_FLIGHT_WINDOW_SECONDS: float = Field(0.05)
+
+    # Archival of expired and decided recommendations older than given age
+    # with their platform statuses, every batch is moved in own transaction
+    ARCHIVE_AFTER_DAYS: int = Field(90)
+    ARCHIVE_BATCH_SIZE: int = Field(1000)
+    ARCHIVE_INTERVAL_SECONDS: float = Field(3600)
+
+    # Platform statuses are partitioned by ranges of recommendation id, partitions
+    # are created ahead and dropped after retention (empty value keeps them forever)
+    PLATFORM_STATUSES_PARTITION_SIZE: int = Field(1_000_000)
+    PLATFORM_STATUSES_PARTITIONS_AHEAD: int = Field(2)
+    PLATFORM_STATUSES_RETENTION_DAYS: int | None = Field(None)
+    PARTITIONS_INTERVAL_SECONDS: float = Field(3600)
+
+    # Server-sent events of recommendations changes (Postgres LISTEN/NOTIFY)
+    EVENTS_CHANNEL: str = Field("recommendation_events")
+    EVENTS_QUEUE_SIZE: int = Field(100)
+    EVENTS_KEEPALIVE_SECONDS: float = Field(15)
+    EVENTS_RECONNECT_SECONDS: float = Field(5)
+
     # Kafka topics
     # Please, use `KAFKA_{}_TOPIC` format for consistency
     KAFKA_URL_SCHEMA_TOPIC: str = Field(
@@ -13,13 +13,17 @@ setup.setup_logging()
 
 logger = logging.getLogger(__name__)
 
-consumer = KafkaConsumer(
-    bootstrap_servers=config.KAFKA_SERVERS_LIST,
-    group_id=config.KAFKA_CONSUMER_GROUP_ID,
-    # autocommit is disabled for preventing data loss, every job have to handle duplicated message
-    enable_auto_commit=False,
-    max_poll_records=1,
-)
+
+def create_consumer() -> KafkaConsumer:
+    # consumer connects to brokers in constructor, so it is created on start
+    # of consuming instead of import time
+    return KafkaConsumer(
+        bootstrap_servers=config.KAFKA_SERVERS_LIST,
+        group_id=config.KAFKA_CONSUMER_GROUP_ID,
+        # autocommit is disabled for preventing data loss, every job have to handle duplicated message
+        enable_auto_commit=False,
+        max_poll_records=1,
+    )
 
 
 def get_topic_handler(record: ConsumerRecord) -> TaskHandler:
@@ -40,6 +44,7 @@ def get_topic_handler(record: ConsumerRecord) -> TaskHandler:
 
 def start_consuming() -> None:
 
+    consumer = create_consumer()
     consumer.subscribe(TASKS_TOPICS)
 
     logger.info(
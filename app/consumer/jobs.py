@@ -1,8 +1,7 @@
 from __future__ import annotations
 
 import logging
-
-from kafka.consumer.fetcher import ConsumerRecord
+from typing import TYPE_CHECKING
 
 from app import db
 from app.recommendations import services as recommendations
@@ -13,6 +12,9 @@ from app.recommendations.models import (
     RecommendationInput,
 )
 
+if TYPE_CHECKING:
+    from kafka.consumer.fetcher import ConsumerRecord
+
 logger = logging.getLogger(__name__)
 
 
@@ -1,5 +1,6 @@
-from typing import Callable
+from typing import TYPE_CHECKING, Callable
 
-from kafka.consumer.fetcher import ConsumerRecord
+if TYPE_CHECKING:
+    from kafka.consumer.fetcher import ConsumerRecord
 
-TaskHandler = Callable[[ConsumerRecord], None]
+TaskHandler = Callable[["ConsumerRecord"], None]
@@ -6,6 +6,7 @@ from sqlalchemy import create_engine, orm
 from sqlalchemy.engine import Connection, Row
 
 from app.config import config
+from app.slow_queries import slow_query_log
 from app.utils import set_context_var, to_json
 
 
@@ -21,6 +22,7 @@ engine = create_engine(
     json_serializer=to_json,
     future=True,
 )
+slow_query_log.setup(engine)
 
 Base = orm.declarative_base()
 
@@ -20,3 +20,7 @@ class BaseError(Exception):
 class DoesNotExistsError(BaseError):
     MESSAGE = "Object does not exist"
     HTTP_STATUS = 404
+
+
+class MissingFiltersError(BaseError):
+    MESSAGE = "Provide at least one filter"
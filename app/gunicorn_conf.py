@@ -0,0 +1,35 @@
+"""
+Gunicorn configuration for running service with several uvicorn workers.
+Application is loaded once in master process and workers are forked from it,
+so memory with loaded modules is shared between workers (copy-on-write).
+
+    gunicorn --config app/gunicorn_conf.py "app.main:create_app()"
+"""
+import os
+from typing import Any
+
+from app import setup
+from app.config import config as service_config
+
+# NOTE: module variables are read as gunicorn settings, so service config is
+# imported as `service_config`, because `config` is one of gunicorn settings
+
+
+def _workers_count() -> int:
+    if service_config.WEB_CONCURRENCY:
+        return service_config.WEB_CONCURRENCY
+    # CPUs available for the process, could be less than CPUs of the machine
+    return len(os.sched_getaffinity(0))
+
+
+bind = service_config.WEB_BIND
+workers = _workers_count()
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = service_config.WEB_TIMEOUT_SECONDS
+graceful_timeout = service_config.WEB_TIMEOUT_SECONDS
+accesslog = "-"
+
+
+def post_fork(server: Any, worker: Any) -> None:
+    setup.reset_after_fork()
@@ -1,35 +1,38 @@
-import sqlalchemy as sa
+from http import HTTPStatus
+
 from fastapi import APIRouter
-from kafka import KafkaAdminClient
-from redis.client import Redis
+from fastapi.responses import JSONResponse
 
-from app import db
-from app.config import config
+from app.health.responses import ReadinessState
+from app.health.services import health as health_service
+from app.instrumentation import InstrumentedRoute
 from app.types import StrDict
 
-router = APIRouter(tags=["system"])
-
+router = APIRouter(tags=["system"], route_class=InstrumentedRoute)
 
-@router.get(path="/health/")
-def health() -> StrDict:
-
-    # check database
-    with db.connect() as conn:
-        conn.execute(sa.text("SELECT 1 = 1;"))
-
-    # check redis
-    redis = Redis(
-        host=config.REDIS_HOST,
-        port=config.REDIS_PORT,
-        db=config.REDIS_DB,
-        socket_timeout=5,
-    )
-    redis.ping()
-    redis.close()
-
-    # check kafka
-    consumer = KafkaAdminClient(bootstrap_servers=config.KAFKA_SERVERS_LIST)
-    consumer.list_topics()
-    consumer.close()
 
+@router.get(path="/livez")
+def livez() -> StrDict:
+    """Liveness probe, doesn't touch any dependency"""
     return {"status": "alive"}
+
+
+@router.get(
+    path="/readyz",
+    response_model=ReadinessState,
+    responses={HTTPStatus.SERVICE_UNAVAILABLE.value: {"model": ReadinessState}},
+)
+def readyz() -> JSONResponse:
+    """Readiness probe, returns cached results of background dependency checks"""
+    state = health_service.get_readiness()
+    status_code = HTTPStatus.OK if state.ready else HTTPStatus.SERVICE_UNAVAILABLE
+    return JSONResponse(status_code=status_code, content=state.dict())
+
+
+@router.get(path="/health/")
+def health() -> JSONResponse:
+    # kept for backward compatibility, use `/livez` and `/readyz` instead
+    state = health_service.get_readiness()
+    if not state.ready:
+        return JSONResponse(status_code=HTTPStatus.SERVICE_UNAVAILABLE, content=state.dict())
+    return JSONResponse(content={"status": "alive"})
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+
+
+class DependencyState(BaseModel):
+    ok: bool
+    latency_ms: float
+    age_seconds: float
+    error: str | None = None
+
+
+class ReadinessState(BaseModel):
+    ready: bool
+    dependencies: dict[str, DependencyState]
@@ -0,0 +1,166 @@
+import logging
+import threading
+import time
+from contextlib import suppress
+from typing import TYPE_CHECKING, Callable
+
+import sqlalchemy as sa
+
+from app import db
+from app.config import config
+from app.health.responses import DependencyState, ReadinessState
+
+if TYPE_CHECKING:
+    from kafka import KafkaAdminClient
+    from redis.client import Redis
+
+logger = logging.getLogger(__name__)
+
+
+class CheckResult:
+    def __init__(self, ok: bool, latency_ms: float, checked_at: float, error: str | None = None) -> None:
+        self.ok = ok
+        self.latency_ms = latency_ms
+        # value of `time.monotonic()` when check was finished
+        self.checked_at = checked_at
+        self.error = error
+
+
+class DependencyChecker:
+    """
+    Run check of one dependency in background thread with given interval
+    and keep result of the last check in memory
+    """
+
+    def __init__(self, name: str, check: Callable[[], None], interval_seconds: float) -> None:
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self._check = check
+        self._result: CheckResult | None = None
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name=f"health-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=config.HEALTH_CHECK_TIMEOUT_SECONDS)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self.refresh()
+            self._stopped.wait(self.interval_seconds)
+
+    def refresh(self) -> CheckResult:
+        error = None
+        started = time.monotonic()
+        try:
+            self._check()
+        except Exception as exc:
+            error = repr(exc)
+            logger.warning(msg=f"Health check failed: {self.name}", extra={"error": error})
+        finished = time.monotonic()
+
+        self._result = CheckResult(
+            ok=error is None,
+            latency_ms=(finished - started) * 1000,
+            checked_at=finished,
+            error=error,
+        )
+        return self._result
+
+    def get_state(self, now: float) -> DependencyState:
+        result = self._result
+        if result is None:
+            return DependencyState(ok=False, latency_ms=0, age_seconds=0, error="Not checked yet")
+
+        age = now - result.checked_at
+        # checker thread can hang on a dead dependency, so old result is not trusted
+        if result.ok and age > self.interval_seconds + config.HEALTH_CHECK_TIMEOUT_SECONDS * 2:
+            return DependencyState(ok=False, latency_ms=result.latency_ms, age_seconds=age, error="Result is stale")
+
+        return DependencyState(ok=result.ok, latency_ms=result.latency_ms, age_seconds=age, error=result.error)
+
+
+class HealthService:
+    """
+    Readiness checks of service dependencies. Clients are long-lived and
+    shared between checks, so probes never open new connections.
+    """
+
+    def __init__(self) -> None:
+        self._redis: "Redis | None" = None
+        self._kafka: "KafkaAdminClient | None" = None
+        self._checkers: list[DependencyChecker] = []
+
+    def start(self) -> None:
+        from redis.client import Redis
+
+        self._redis = Redis(
+            host=config.REDIS_HOST,
+            port=config.REDIS_PORT,
+            db=config.REDIS_DB,
+            socket_timeout=config.HEALTH_CHECK_TIMEOUT_SECONDS,
+            socket_connect_timeout=config.HEALTH_CHECK_TIMEOUT_SECONDS,
+        )
+        self._checkers = [
+            DependencyChecker("database", self._check_database, config.HEALTH_DATABASE_INTERVAL_SECONDS),
+            DependencyChecker("redis", self._check_redis, config.HEALTH_REDIS_INTERVAL_SECONDS),
+            DependencyChecker("kafka", self._check_kafka, config.HEALTH_KAFKA_INTERVAL_SECONDS),
+        ]
+        for checker in self._checkers:
+            checker.start()
+
+    def stop(self) -> None:
+        for checker in self._checkers:
+            checker.stop()
+        self._checkers = []
+
+        if self._redis is not None:
+            with suppress(BaseException):
+                self._redis.close()
+            self._redis = None
+
+        if self._kafka is not None:
+            with suppress(BaseException):
+                self._kafka.close()
+            self._kafka = None
+
+    @staticmethod
+    def _check_database() -> None:
+        with db.connect() as conn:
+            conn.execute(sa.text("SELECT 1 = 1;"))
+
+    def _check_redis(self) -> None:
+        if self._redis is None:
+            raise ValueError("Health service is not started, use .start method")
+        self._redis.ping()
+
+    def _check_kafka(self) -> None:
+        # admin client connects to the brokers in constructor, so it is created
+        # on first check to not fail startup when Kafka is not available yet
+        if self._kafka is None:
+            from kafka import KafkaAdminClient
+
+            self._kafka = KafkaAdminClient(
+                bootstrap_servers=config.KAFKA_SERVERS_LIST,
+                request_timeout_ms=int(config.HEALTH_CHECK_TIMEOUT_SECONDS * 1000),
+            )
+        # metadata of brokers only, public `describe_cluster` and `list_topics`
+        # request metadata of all topics, which is heavy for big clusters
+        self._kafka._get_cluster_metadata(topics=[])
+
+    def get_readiness(self) -> ReadinessState:
+        now = time.monotonic()
+        dependencies = {checker.name: checker.get_state(now=now) for checker in self._checkers}
+        return ReadinessState(
+            ready=bool(dependencies) and all(state.ok for state in dependencies.values()),
+            dependencies=dependencies,
+        )
+
+
+health = HealthService()
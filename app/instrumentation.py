@@ -0,0 +1,183 @@
+"""
+Per-request instrumentation: number of SQL statements, time spent in database,
+in endpoint and in response serialization. Results are sent in `Server-Timing`
+header and logged.
+"""
+import asyncio
+import functools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator
+
+from fastapi.requests import Request
+from fastapi.responses import Response
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import config
+from app.errors import BaseError
+from app.utils import AnyCallable, set_context_var
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(BaseError):
+    MESSAGE = "Query budget exceeded"
+    HTTP_STATUS = 500
+
+
+class RequestMetrics:
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.endpoint_seconds = 0.0
+        self.endpoint_finished: float | None = None
+
+    @property
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    @property
+    def db_ms(self) -> float:
+        return self.db_seconds * 1000
+
+    def serialization_ms(self, response_ready: float) -> float:
+        if self.endpoint_finished is None:
+            return 0.0
+        return (response_ready - self.endpoint_finished) * 1000
+
+
+_metrics_ctx: ContextVar[RequestMetrics | None] = ContextVar("_metrics_ctx", default=None)
+
+
+def get_metrics() -> RequestMetrics | None:
+    return _metrics_ctx.get()
+
+
+@contextmanager
+def count_queries() -> Iterator[RequestMetrics]:
+    """Count SQL statements executed inside the block, useful for tests and jobs"""
+    metrics = RequestMetrics()
+    with set_context_var(var=_metrics_ctx, value=metrics):
+        yield metrics
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[RequestMetrics]:
+    with count_queries() as metrics:
+        yield metrics
+    if metrics.statements > limit:
+        raise QueryBudgetExceeded(
+            message=f"Executed {metrics.statements} SQL statements, budget is {limit}",
+            extra={"statements": metrics.statements, "limit": limit},
+        )
+
+
+def _before_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, *_: Any) -> None:
+    # start is kept by context of statement, so failed statement doesn't leave it on pooled connection
+    if _metrics_ctx.get() is not None and context is not None:
+        context.query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, *_: Any) -> None:
+    metrics = _metrics_ctx.get()
+    started = getattr(context, "query_started", None)
+    if metrics is None or started is None:
+        return
+    metrics.statements += 1
+    metrics.db_seconds += time.perf_counter() - started
+
+
+def setup_query_counter(engine: Engine) -> None:
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _timed_endpoint(endpoint: AnyCallable) -> AnyCallable:
+    """Measure time of endpoint function, the rest of request is validation and serialization"""
+
+    def _finish(started: float) -> None:
+        if metrics := _metrics_ctx.get():
+            metrics.endpoint_finished = time.perf_counter()
+            metrics.endpoint_seconds += metrics.endpoint_finished - started
+
+    if asyncio.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                _finish(started)
+
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            _finish(started)
+
+    return wrapper
+
+
+class InstrumentedRoute(APIRoute):
+    """Route that measures time of endpoint function"""
+
+    def __init__(self, path: str, endpoint: AnyCallable, **kwargs: Any) -> None:
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+
+def _server_timing(metrics: RequestMetrics, serialization_ms: float) -> str:
+    return ", ".join(
+        [
+            f'db;dur={metrics.db_ms:.2f};desc="{metrics.statements} queries"',
+            f"endpoint;dur={metrics.endpoint_seconds * 1000:.2f}",
+            f"serialize;dur={serialization_ms:.2f}",
+            f"total;dur={metrics.total_ms:.2f}",
+        ]
+    )
+
+
+async def instrument_request(request: Request, call_next: Callable) -> Response:
+    metrics = RequestMetrics()
+    with set_context_var(var=_metrics_ctx, value=metrics):
+        response = await call_next(request)
+    serialization_ms = metrics.serialization_ms(response_ready=time.perf_counter())
+
+    response.headers["Server-Timing"] = _server_timing(metrics, serialization_ms=serialization_ms)
+    logger.info(
+        msg=f"Request timing: {request.method} {request.url.path}",
+        extra={
+            "timing": {
+                "method": request.method,
+                "path": request.url.path,
+                "status_code": response.status_code,
+                "statements": metrics.statements,
+                "db_ms": round(metrics.db_ms, 2),
+                "endpoint_ms": round(metrics.endpoint_seconds * 1000, 2),
+                "serialization_ms": round(serialization_ms, 2),
+                "total_ms": round(metrics.total_ms, 2),
+            }
+        },
+    )
+
+    if config.QUERY_BUDGET_STRICT and metrics.statements > config.QUERY_BUDGET:
+        raise QueryBudgetExceeded(
+            message=(
+                f"{request.method} {request.url.path} executed {metrics.statements} SQL statements, "
+                f"budget is {config.QUERY_BUDGET}"
+            ),
+            extra={"statements": metrics.statements, "limit": config.QUERY_BUDGET},
+        )
+
+    return response
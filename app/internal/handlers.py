@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends
+
+from app.auth.dependencies import get_user
+from app.instrumentation import InstrumentedRoute
+from app.recommendations.cache import page_cache
+from app.slow_queries import slow_query_log
+from app.types import StrDict
+
+# Internal endpoints are not under `BASE_API_PATH`, so they are not
+# published through the gateway URL schema. They expose statements with
+# parameters, so internal token is required like by other endpoints.
+router = APIRouter(
+    prefix="/internal",
+    tags=["system"],
+    route_class=InstrumentedRoute,
+    dependencies=[Depends(get_user)],
+)
+
+
+@router.get(path="/slow-queries")
+def get_slow_queries() -> list[StrDict]:
+    """Statistics of slow SQL statements of this process, the slowest in total on top"""
+    return slow_query_log.get_stats()
+
+
+@router.delete(path="/slow-queries")
+def reset_slow_queries() -> StrDict:
+    slow_query_log.reset()
+    return {"status": "ok"}
+
+
+@router.get(path="/page-cache")
+def get_page_cache_stats() -> StrDict:
+    """Hits and misses of list pages cache of this process"""
+    return page_cache.get_stats()
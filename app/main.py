@@ -13,6 +13,7 @@ def create_app() -> FastAPI:
 
     setup.setup_logging()
     setup.setup_error_handler(app)
+    setup.setup_instrumentation(app)
     setup.setup_routes(app)
     setup.setup_openapi(app)
     setup.setup_events(app)
@@ -0,0 +1,93 @@
+"""Recommendation platforms state
+
+Revision ID: 3f1d2a6b9c47
+Revises: c856d47342da
+Create Date: 2026-10-19 00:40:12.418203
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "3f1d2a6b9c47"
+down_revision = "c856d47342da"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "recommendations",
+        sa.Column(
+            "platforms_summary",
+            postgresql.JSONB(astext_type=sa.Text()),
+            server_default="{}",
+            nullable=False,
+        ),
+    )
+    op.add_column("recommendations", sa.Column("platforms_state", sa.Text(), nullable=True))
+    op.create_index(
+        "ix_recommendations_account_id_platforms_state",
+        "recommendations",
+        ["account_id", "platforms_state"],
+        unique=False,
+    )
+
+    # fill summary from the latest not empty status of every platform and move
+    # accepting recommendations, the same rules as `PlatformStatus.state`,
+    # `get_platforms_state` and `get_recommendation_status`
+    op.execute(
+        """
+        WITH latest AS (
+            SELECT DISTINCT ON (recommendation_id, platform) recommendation_id, platform, data
+            FROM platform_statuses
+            WHERE jsonb_array_length(data) > 0
+            ORDER BY recommendation_id, platform, id DESC
+        ),
+        states AS (
+            SELECT
+                recommendation_id,
+                platform,
+                CASE
+                    WHEN data @> '[{"status": "pending"}]' THEN 'pending'
+                    WHEN data @> '[{"status": "error"}]' AND data @> '[{"status": "success"}]' THEN 'partial'
+                    WHEN data @> '[{"status": "error"}]' THEN 'error'
+                    ELSE 'applied'
+                END AS state
+            FROM latest
+        ),
+        summaries AS (
+            SELECT
+                recommendation_id,
+                jsonb_object_agg(platform, state) AS summary,
+                CASE
+                    WHEN 'pending' = ANY(array_agg(state)) THEN 'pending'
+                    WHEN 'applied' = ALL(array_agg(state)) THEN 'applied'
+                    WHEN 'error' = ALL(array_agg(state)) THEN 'error'
+                    ELSE 'partial'
+                END AS platforms_state
+            FROM states
+            GROUP BY recommendation_id
+        )
+        UPDATE recommendations
+        SET
+            platforms_summary = summaries.summary,
+            platforms_state = summaries.platforms_state,
+            -- the same as `get_recommendation_status`
+            status = CASE
+                WHEN recommendations.status != 'ACCEPTING' THEN recommendations.status
+                WHEN summaries.platforms_state IN ('applied', 'partial') THEN 'ACCEPTED'
+                WHEN summaries.platforms_state = 'error' THEN 'ERROR'
+                ELSE recommendations.status
+            END
+        FROM summaries
+        WHERE recommendations.id = summaries.recommendation_id;
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_recommendations_account_id_platforms_state", table_name="recommendations")
+    op.drop_column("recommendations", "platforms_state")
+    op.drop_column("recommendations", "platforms_summary")
@@ -0,0 +1,89 @@
+"""Decision rollups
+
+Revision ID: 5b7e9d1c3a28
+Revises: 8a4e5c7d2b13
+Create Date: 2026-10-19 02:14:36.520914
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5b7e9d1c3a28"
+down_revision = "8a4e5c7d2b13"
+branch_labels = None
+depends_on = None
+
+COUNTERS = (
+    "active_count",
+    "accepting_count",
+    "accepted_count",
+    "rejected_count",
+    "expired_count",
+    "error_count",
+    "accepts",
+    "rejects",
+    "decision_seconds",
+    "decisions_1h",
+    "decisions_1d",
+    "decisions_7d",
+    "decisions_later",
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "decision_rollups",
+        sa.Column("account_id", sa.BigInteger(), autoincrement=False, nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("type", sa.Text(), nullable=False),
+        *(
+            sa.Column(
+                name,
+                sa.BigInteger() if name == "decision_seconds" else sa.Integer(),
+                server_default="0",
+                nullable=False,
+            )
+            for name in COUNTERS
+        ),
+        sa.PrimaryKeyConstraint("account_id", "day", "type"),
+    )
+    # the same aggregate as `rebuild-decision-rollups` command
+    op.execute(
+        f"""
+        WITH decisions AS (
+            SELECT
+                account_id,
+                creation_date::date AS day,
+                type,
+                status,
+                decision_time IS NOT NULL AS is_decided,
+                greatest(floor(extract(epoch FROM decision_time::timestamp - creation_date)), 0)::bigint AS seconds
+            FROM recommendations
+        )
+        INSERT INTO decision_rollups (account_id, day, type, {", ".join(COUNTERS)})
+        SELECT
+            account_id,
+            day,
+            type,
+            count(*) FILTER (WHERE status = 'ACTIVE'),
+            count(*) FILTER (WHERE status = 'ACCEPTING'),
+            count(*) FILTER (WHERE status = 'ACCEPTED'),
+            count(*) FILTER (WHERE status = 'REJECTED'),
+            count(*) FILTER (WHERE status = 'EXPIRED'),
+            count(*) FILTER (WHERE status = 'ERROR'),
+            count(*) FILTER (WHERE is_decided AND status != 'REJECTED'),
+            count(*) FILTER (WHERE is_decided AND status = 'REJECTED'),
+            coalesce(sum(seconds), 0),
+            count(*) FILTER (WHERE seconds < 3600),
+            count(*) FILTER (WHERE seconds >= 3600 AND seconds < 86400),
+            count(*) FILTER (WHERE seconds >= 86400 AND seconds < 604800),
+            count(*) FILTER (WHERE seconds >= 604800)
+        FROM decisions
+        GROUP BY account_id, day, type;
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("decision_rollups")
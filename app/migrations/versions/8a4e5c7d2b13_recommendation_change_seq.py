@@ -0,0 +1,56 @@
+"""Recommendation change sequence
+
+Revision ID: 8a4e5c7d2b13
+Revises: 3f1d2a6b9c47
+Create Date: 2026-10-19 01:02:47.106518
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8a4e5c7d2b13"
+down_revision = "3f1d2a6b9c47"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence("recommendation_change_seq")))
+    # volatile default rewrites table and gives every existing row own number
+    op.add_column(
+        "recommendations",
+        sa.Column(
+            "change_seq",
+            sa.BigInteger(),
+            server_default=sa.text("nextval('recommendation_change_seq')"),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_recommendations_account_id_change_seq",
+        "recommendations",
+        ["account_id", "change_seq"],
+        unique=False,
+    )
+    op.create_table(
+        "account_versions",
+        sa.Column("account_id", sa.BigInteger(), autoincrement=False, nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("account_id"),
+    )
+    op.execute(
+        """
+        INSERT INTO account_versions (account_id, version)
+        SELECT account_id, MAX(change_seq)
+        FROM recommendations
+        GROUP BY account_id;
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("account_versions")
+    op.drop_index("ix_recommendations_account_id_change_seq", table_name="recommendations")
+    op.drop_column("recommendations", "change_seq")
+    op.execute(sa.schema.DropSequence(sa.Sequence("recommendation_change_seq")))
@@ -0,0 +1,47 @@
+"""Recommendations archive
+
+Revision ID: 9c2f4a6e8b51
+Revises: 5b7e9d1c3a28
+Create Date: 2026-10-19 03:05:12.774019
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "9c2f4a6e8b51"
+down_revision = "5b7e9d1c3a28"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # the same columns in the same order, rows are moved by `INSERT ... SELECT`
+    op.execute("CREATE TABLE recommendations_archive (LIKE recommendations)")
+    op.create_primary_key("recommendations_archive_pkey", "recommendations_archive", ["id"])
+    op.create_index(
+        "ix_recommendations_archive_account_id_order",
+        "recommendations_archive",
+        ["account_id", sa.text("(status = 'ACTIVE') DESC"), sa.text("creation_date DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+    op.create_index(
+        "ix_recommendations_archive_account_id_date_order",
+        "recommendations_archive",
+        ["account_id", sa.text("creation_date DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+
+    op.execute("CREATE TABLE platform_statuses_archive (LIKE platform_statuses)")
+    op.create_primary_key("platform_statuses_archive_pkey", "platform_statuses_archive", ["id"])
+    op.create_index(
+        "ix_platform_statuses_archive_recommendation_id",
+        "platform_statuses_archive",
+        ["recommendation_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("platform_statuses_archive")
+    op.drop_table("recommendations_archive")
@@ -0,0 +1,64 @@
+"""JSONB lookup indexes
+
+Revision ID: a3d9e5b7c821
+Revises: f2c6a8d4b137
+Create Date: 2026-10-19 05:37:52.604118
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a3d9e5b7c821"
+down_revision = "f2c6a8d4b137"
+branch_labels = None
+depends_on = None
+
+PARTITIONED_TABLES = ("platform_statuses", "platform_statuses_archive")
+
+
+def _get_partitions(table: str) -> list[str]:
+    query = sa.text(
+        """
+        SELECT child.relname FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = :table
+        """
+    ).bindparams(table=table)
+    return list(op.get_bind().execute(query).scalars())
+
+
+def upgrade() -> None:
+    # only a few distinct taxonomies
+    op.create_index("ix_taxonomies_data", "taxonomies", ["data"], unique=False, postgresql_using="gin")
+
+    # indexes of big tables are built without blocking writes
+    with op.get_context().autocommit_block():
+        for table in ("recommendations", "recommendations_archive"):
+            op.create_index(
+                f"ix_{table}_account_id_taxonomy_hash",
+                table,
+                ["account_id", "taxonomy_hash"],
+                unique=False,
+                postgresql_concurrently=True,
+            )
+
+        # index of partitioned table can't be built concurrently, so it's built
+        # for every partition and attached, new partitions get it on creation
+        for table in PARTITIONED_TABLES:
+            op.execute(f"CREATE INDEX ix_{table}_data ON ONLY {table} USING gin (data jsonb_path_ops)")
+            for partition in _get_partitions(table):
+                op.execute(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{partition}_data "
+                    f"ON {partition} USING gin (data jsonb_path_ops)"
+                )
+                op.execute(f"ALTER INDEX ix_{table}_data ATTACH PARTITION ix_{partition}_data")
+
+
+def downgrade() -> None:
+    for table in PARTITIONED_TABLES:
+        op.drop_index(f"ix_{table}_data", table_name=table)
+    for table in ("recommendations", "recommendations_archive"):
+        op.drop_index(f"ix_{table}_account_id_taxonomy_hash", table_name=table)
+    op.drop_index("ix_taxonomies_data", table_name="taxonomies")
@@ -0,0 +1,38 @@
+"""Journey name trigram index
+
+Revision ID: b6e2c4f8a093
+Revises: a3d9e5b7c821
+Create Date: 2026-10-19 06:05:17.882431
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b6e2c4f8a093"
+down_revision = "a3d9e5b7c821"
+branch_labels = None
+depends_on = None
+
+TABLES = ("recommendations", "recommendations_archive")
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # search of list by substring (`ILIKE`) and similar word (`%>`) of journey name
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.create_index(
+                f"ix_{table}_journey_name_trgm",
+                table,
+                ["journey_name"],
+                unique=False,
+                postgresql_using="gin",
+                postgresql_ops={"journey_name": "gin_trgm_ops"},
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_index(f"ix_{table}_journey_name_trgm", table_name=table)
@@ -0,0 +1,95 @@
+"""Partition platform statuses
+
+Revision ID: d4a8c2e6f913
+Revises: 9c2f4a6e8b51
+Create Date: 2026-10-19 03:48:27.305162
+
+Platform statuses are partitioned by ranges of recommendation id. Existing
+table is not copied: it's attached as the first partition, its range check
+is validated before without blocking writes, so the switch takes only a
+short lock. Old partitions are dropped by retention, see `maintain-partitions`.
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d4a8c2e6f913"
+down_revision = "9c2f4a6e8b51"
+branch_labels = None
+depends_on = None
+
+# the same as default `PLATFORM_STATUSES_PARTITION_SIZE`
+PARTITION_SIZE = 1_000_000
+PARTITIONS_AHEAD = 2
+
+TABLES = ("platform_statuses", "platform_statuses_archive")
+
+
+def _get_boundary() -> int:
+    """Upper bound of legacy partition, with room for recommendations created during migration"""
+    max_id = op.get_bind().execute(sa.text("SELECT coalesce(max(id), 0) FROM recommendations")).scalar_one()
+    return (max_id // PARTITION_SIZE + 2) * PARTITION_SIZE
+
+
+def _partition(table: str, boundary: int) -> None:
+    legacy = f"{table}_legacy"
+    bind = op.get_bind()
+
+    op.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+    op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+    op.execute(f"ALTER INDEX ix_{table}_recommendation_id RENAME TO ix_{legacy}_recommendation_id")
+    op.execute(f"CREATE TABLE {table} (LIKE {legacy}) PARTITION BY RANGE (recommendation_id)")
+
+    # identity is moved to partitioned table, partition can't have own one
+    is_identity = bind.execute(
+        sa.text(
+            "SELECT attidentity != '' FROM pg_attribute WHERE attrelid = CAST(:table AS regclass) AND attname = 'id'"
+        ).bindparams(table=legacy)
+    ).scalar_one()
+    if is_identity:
+        next_id = bind.execute(sa.text(f"SELECT coalesce(max(id), 0) + 1 FROM {legacy}")).scalar_one()
+        op.execute(f"ALTER TABLE {legacy} ALTER COLUMN id DROP IDENTITY")
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY (START WITH {next_id})")
+
+    # index of legacy table is attached to this one, it's not built again
+    op.execute(f"CREATE INDEX ix_{table}_recommendation_id ON {table} (recommendation_id)")
+    op.execute(f"ALTER TABLE {table} ATTACH PARTITION {legacy} FOR VALUES FROM (MINVALUE) TO ({boundary})")
+    op.execute(f"ALTER TABLE {legacy} DROP CONSTRAINT {legacy}_range")
+
+    for lower in range(boundary, boundary + PARTITION_SIZE * PARTITIONS_AHEAD, PARTITION_SIZE):
+        op.execute(
+            f"CREATE TABLE {table}_p{lower} PARTITION OF {table} "
+            f"FOR VALUES FROM ({lower}) TO ({lower + PARTITION_SIZE})"
+        )
+
+
+def upgrade() -> None:
+    boundary = _get_boundary()
+
+    # check of range is validated without blocking writes, so attaching doesn't scan table
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.execute(
+                f"ALTER TABLE {table} ADD CONSTRAINT {table}_legacy_range "
+                f"CHECK (recommendation_id < {boundary}) NOT VALID"
+            )
+            op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {table}_legacy_range")
+
+    for table in TABLES:
+        _partition(table, boundary=boundary)
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        partitioned = f"{table}_partitioned"
+        op.execute(f"ALTER TABLE {table} RENAME TO {partitioned}")
+        op.execute(f"ALTER INDEX ix_{table}_recommendation_id RENAME TO ix_{partitioned}_recommendation_id")
+        op.execute(f"CREATE TABLE {table} (LIKE {partitioned} INCLUDING IDENTITY)")
+        op.execute(f"INSERT INTO {table} SELECT * FROM {partitioned}")
+        op.execute(f"DROP TABLE {partitioned}")
+        op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id)")
+        op.execute(f"CREATE INDEX ix_{table}_recommendation_id ON {table} (recommendation_id)")
+        if table == "platform_statuses":
+            op.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT coalesce(max(id), 1) FROM {table}))"
+            )
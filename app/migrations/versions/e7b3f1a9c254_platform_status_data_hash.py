@@ -0,0 +1,26 @@
+"""Platform status data hash
+
+Revision ID: e7b3f1a9c254
+Revises: d4a8c2e6f913
+Create Date: 2026-10-19 04:31:09.418257
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e7b3f1a9c254"
+down_revision = "d4a8c2e6f913"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # existing statuses are not hashed, the next status of platform is always inserted
+    op.add_column("platform_statuses", sa.Column("data_hash", sa.Text(), nullable=True))
+    op.add_column("platform_statuses_archive", sa.Column("data_hash", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("platform_statuses_archive", "data_hash")
+    op.drop_column("platform_statuses", "data_hash")
@@ -0,0 +1,78 @@
+"""Taxonomies
+
+Revision ID: f2c6a8d4b137
+Revises: e7b3f1a9c254
+Create Date: 2026-10-19 05:02:44.193620
+
+Taxonomies are moved to own table by hash. Hashes are backfilled by batches
+of ids, every batch is committed, so rows are not locked for the whole
+migration and space of updated rows is reused by vacuum between batches.
+Dropped column is only hidden, existing rows keep its values until they are
+rewritten, so space is reclaimed after migration without blocking writes by
+`pg_repack --table=recommendations --table=recommendations_archive`, or by
+`VACUUM FULL` of both tables during maintenance window, as it locks them.
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "f2c6a8d4b137"
+down_revision = "e7b3f1a9c254"
+branch_labels = None
+depends_on = None
+
+TABLES = ("recommendations", "recommendations_archive")
+BATCH_SIZE = 50_000
+
+
+def _backfill(table: str, condition: str) -> None:
+    # the same hash as computed by `insert_recommendation`
+    op.execute(
+        f"""
+        INSERT INTO taxonomies (hash, data)
+        SELECT DISTINCT md5(taxonomy::text), taxonomy FROM {table} WHERE {condition}
+        ON CONFLICT DO NOTHING
+        """
+    )
+    op.execute(f"UPDATE {table} SET taxonomy_hash = md5(taxonomy::text) WHERE {condition}")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "taxonomies",
+        sa.Column("hash", sa.Text(), nullable=False),
+        sa.Column("data", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.PrimaryKeyConstraint("hash"),
+    )
+    for table in TABLES:
+        op.add_column(table, sa.Column("taxonomy_hash", sa.Text(), nullable=True))
+
+    bind = op.get_bind()
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            min_id, max_id = bind.execute(sa.text(f"SELECT min(id), max(id) FROM {table}")).one()
+            if min_id is None:
+                continue
+            for lower in range(min_id, max_id + 1, BATCH_SIZE):
+                _backfill(table, condition=f"id >= {lower} AND id < {lower + BATCH_SIZE} AND taxonomy_hash IS NULL")
+
+    for table in TABLES:
+        # recommendations inserted during backfill
+        _backfill(table, condition="taxonomy_hash IS NULL")
+        op.drop_column(table, "taxonomy")
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.add_column(table, sa.Column("taxonomy", postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+        op.execute(
+            f"""
+            UPDATE {table} SET taxonomy = coalesce(
+                (SELECT data FROM taxonomies WHERE taxonomies.hash = {table}.taxonomy_hash), '{{}}'
+            )
+            """
+        )
+        op.alter_column(table, "taxonomy", nullable=False)
+        op.drop_column(table, "taxonomy_hash")
+    op.drop_table("taxonomies")
@@ -1,7 +1,4 @@
-from typing import Any
-
-from kafka import KafkaProducer
-from kafka.producer.future import FutureRecordMetadata
+from typing import TYPE_CHECKING, Any
 
 from app.config import config
 from app.producer.exceptions import ProducerNotStarted
@@ -9,6 +6,10 @@ from app.producer.models import URLSchema
 from app.producer.topics import Topics
 from app.utils import to_json
 
+if TYPE_CHECKING:
+    from kafka import KafkaProducer
+    from kafka.producer.future import FutureRecordMetadata
+
 
 class BaseProducerService:
     """
@@ -18,9 +19,12 @@ class BaseProducerService:
 
     def __init__(self) -> None:
         self.debug_name = f"recommendation_service-{config.ENVIRONMENT}"
-        self._producer: KafkaProducer | None = None
+        self._producer: "KafkaProducer | None" = None
 
     def start(self) -> None:
+        # kafka is imported on first use to not slow down start of processes that don't use it
+        from kafka import KafkaProducer
+
         self._producer = KafkaProducer(
             bootstrap_servers=config.KAFKA_SERVERS_LIST,
             client_id=self.debug_name,
@@ -31,15 +35,19 @@ class BaseProducerService:
             return
         return self._producer.close()
 
+    def reset(self) -> None:
+        """Forget producer inherited from parent process without closing its sockets"""
+        self._producer = None
+
     @property
-    def producer(self) -> KafkaProducer:
+    def producer(self) -> "KafkaProducer":
         if self._producer is None:
             raise ProducerNotStarted(
                 "Kafka producer is not started. " "Use function `producer.start()` to start producer"
             )
         return self._producer
 
-    def send_message(self, topic: Topics, value: Any) -> FutureRecordMetadata:
+    def send_message(self, topic: Topics, value: Any) -> "FutureRecordMetadata":
         metadata = self.producer.send(
             topic=topic.value,
             value=to_json(value).encode(),
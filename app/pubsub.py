@@ -0,0 +1,129 @@
+"""
+Postgres LISTEN/NOTIFY based publish/subscribe. Every process keeps one
+dedicated LISTEN connection and fans out notifications to in-process
+subscribers (asyncio queues).
+"""
+import asyncio
+import logging
+import select
+import threading
+from typing import Any, Callable
+
+import psycopg2
+import sqlalchemy as sa
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+from app import db
+from app.config import config
+from app.types import StrDict
+from app.utils import from_json, to_json
+
+logger = logging.getLogger(__name__)
+
+# event sent to subscriber when it's too slow and events were dropped
+RESYNC_EVENT = {"type": "resync"}
+
+
+def notify(channel: str, payload: StrDict) -> None:
+    """Send notification in current transaction, it's delivered after commit"""
+    db.execute(sa.select(sa.func.pg_notify(channel, to_json(payload))))
+
+
+class Subscription:
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        predicate: Callable[[StrDict], bool],
+        max_size: int,
+    ) -> None:
+        self.queue: asyncio.Queue[StrDict] = asyncio.Queue(maxsize=max_size)
+        self.predicate = predicate
+        self._loop = loop
+
+    def put_threadsafe(self, event: StrDict) -> None:
+        self._loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event: StrDict) -> None:
+        if self.queue.full():
+            # subscriber can't keep up, so it has to refetch state
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = RESYNC_EVENT
+        self.queue.put_nowait(event)
+
+
+class Listener:
+    """Listen channel in background thread and dispatch notifications to subscribers"""
+
+    def __init__(self, channel: str) -> None:
+        self.channel = channel
+        self._subscriptions: set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name=f"listener-{self.channel}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def subscribe(self, predicate: Callable[[StrDict], bool]) -> Subscription:
+        subscription = Subscription(
+            loop=asyncio.get_running_loop(),
+            predicate=predicate,
+            max_size=config.EVENTS_QUEUE_SIZE,
+        )
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def dispatch(self, payload: str) -> None:
+        try:
+            event = from_json(payload)
+        except ValueError:
+            logger.warning(msg="Invalid notification payload", extra={"payload": payload})
+            return
+
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            if subscription.predicate(event):
+                subscription.put_threadsafe(event)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self._listen()
+            except Exception as exc:
+                logger.warning(msg=f"Listener of {self.channel} failed", extra={"error": repr(exc)})
+                # notifications sent while reconnecting are lost, so subscribers have to refetch
+                self.dispatch(to_json(RESYNC_EVENT))
+                self._stopped.wait(config.EVENTS_RECONNECT_SECONDS)
+
+    def _listen(self) -> None:
+        # dedicated connection, that is not returned to the pool of engine
+        connection: Any = psycopg2.connect(config.DATABASE_URL)
+        try:
+            connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {self.channel};")
+
+            while not self._stopped.is_set():
+                # wake up periodically to check if listener is stopped
+                if select.select([connection], [], [], 1) == ([], [], []):
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    notification = connection.notifies.pop(0)
+                    self.dispatch(notification.payload)
+        finally:
+            connection.close()
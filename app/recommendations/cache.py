@@ -0,0 +1,115 @@
+"""
+Read-through cache of list pages in Redis. Key of page contains version of
+account, so every change of account recommendations invalidates its pages
+without scanning keys, old pages just expire by TTL.
+"""
+import hashlib
+import logging
+import threading
+from typing import TYPE_CHECKING, Any, Callable
+
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from app.config import config
+from app.types import StrDict
+from app.utils import to_json
+
+if TYPE_CHECKING:
+    from redis.client import Redis
+
+logger = logging.getLogger(__name__)
+
+
+class PageCache:
+    def __init__(self) -> None:
+        self._redis: "Redis | None" = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return config.PAGE_CACHE_ENABLED and self._redis is not None
+
+    def start(self) -> None:
+        if not config.PAGE_CACHE_ENABLED:
+            return
+
+        from redis.client import Redis
+
+        self._redis = Redis(
+            host=config.REDIS_HOST,
+            port=config.REDIS_PORT,
+            db=config.REDIS_DB,
+            socket_timeout=config.PAGE_CACHE_TIMEOUT_SECONDS,
+            socket_connect_timeout=config.PAGE_CACHE_TIMEOUT_SECONDS,
+        )
+
+    def stop(self) -> None:
+        if self._redis is not None:
+            self._redis.close()
+            self._redis = None
+
+    @staticmethod
+    def make_key(name: str, account_id: int, version: int, filters: StrDict) -> str:
+        digest = hashlib.blake2b(to_json(filters).encode(), digest_size=16).hexdigest()
+        return f"recommendations:{name}:{account_id}:{version}:{digest}"
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, key: str) -> bytes | None:
+        if self._redis is None:
+            return None
+        try:
+            payload = self._redis.get(key)
+        except Exception as exc:
+            self._count("errors")
+            logger.warning(msg="Failed to get page from cache", extra={"error": repr(exc)})
+            return None
+
+        self._count("hits" if payload is not None else "misses")
+        return payload
+
+    def set(self, key: str, payload: str) -> None:
+        if self._redis is None:
+            return
+        try:
+            self._redis.set(key, payload, ex=config.PAGE_CACHE_TTL_SECONDS)
+        except Exception as exc:
+            self._count("errors")
+            logger.warning(msg="Failed to save page to cache", extra={"error": repr(exc)})
+
+    def get_or_build(
+        self,
+        key: str,
+        build: Callable[[], BaseModel | str],
+        headers: dict[str, str] | None = None,
+    ) -> Response:
+        """
+        Get serialized page from cache or build and save it, Redis errors only
+        slow down request. Page is built as model or already serialized JSON.
+        """
+        payload: Any = self.get(key)
+        if payload is None:
+            page = build()
+            payload = page if isinstance(page, str) else page.json()
+            self.set(key, payload)
+        return Response(content=payload, media_type="application/json", headers=headers)
+
+    def get_stats(self) -> StrDict:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "errors": self.errors,
+                "hit_ratio": round(self.hits / requests, 4) if requests else None,
+            }
+
+
+page_cache = PageCache()
@@ -1,14 +1,36 @@
+import re
 from contextlib import contextmanager
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, time, timedelta
 from typing import Any, Iterator
 
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.engine import Connection
 
-from app import db
+from app import db, pubsub
+from app.config import config
 from app.recommendations import models as models
 from app.recommendations.enums import RecommendationPageSortBy, RecommendationStatus
-from app.recommendations.tables import GoalUpdate, PlatformStatus, Recommendation
+from app.recommendations.rollups import (
+    COUNTERS,
+    DECISION_BUCKETS,
+    STATUS_COUNTERS,
+    Counters,
+    RollupKey,
+)
+from app.recommendations.states import PlatformState
+from app.recommendations.tables import (
+    AccountVersion,
+    DecisionRollup,
+    GoalUpdate,
+    PlatformStatus,
+    Recommendation,
+    Taxonomy,
+    platform_statuses_archive,
+    recommendation_change_seq,
+    recommendations_archive,
+)
 from app.types import StrDict
 
 
@@ -18,9 +40,46 @@ def begin() -> Iterator[Connection]:
         yield connection
 
 
+# recommendations in these statuses are not changed by consumers, so they are archived
+ARCHIVED_STATUSES = (RecommendationStatus.EXPIRED, RecommendationStatus.REJECTED, RecommendationStatus.ACCEPTED)
+
+
+def get_archive_horizon() -> datetime:
+    """Recommendations created before horizon may be archived"""
+    return datetime.utcnow() - timedelta(days=config.ARCHIVE_AFTER_DAYS)
+
+
+def _reads_archive(date_from: date | None, status: RecommendationStatus | None) -> bool:
+    """
+    Archive is read only when `date_from` reaches back to archived recommendations,
+    so the default list reads indexes of hot table only
+    """
+    if status is not None and status not in ARCHIVED_STATUSES:
+        return False
+    return date_from is not None and datetime.combine(date_from, time()) < get_archive_horizon()
+
+
+def _recommendations(with_archive: bool) -> Any:
+    if not with_archive:
+        return Recommendation.__table__
+    # filters of outer query are pushed down into both tables by Postgres
+    return sa.union_all(sa.select(Recommendation), sa.select(recommendations_archive)).subquery("recommendations_all")
+
+
+def _platform_statuses(with_archive: bool) -> Any:
+    if not with_archive:
+        return PlatformStatus.__table__
+    return sa.union_all(sa.select(PlatformStatus), sa.select(platform_statuses_archive)).subquery(
+        "platform_statuses_all"
+    )
+
+
 def select_recommendation(id_: int) -> models.Recommendation | None:
     query = sa.select(Recommendation).where(Recommendation.id == id_)
     row = db.select_one(query)
+    if row is None:
+        # archive is read only for not found recommendation
+        row = db.select_one(sa.select(recommendations_archive).where(recommendations_archive.c.id == id_))
     return models.Recommendation.from_orm(row) if row else None
 
 
@@ -37,14 +96,25 @@ def select_recommendation_by_uuid(uuid: str) -> models.Recommendation | None:
     return models.Recommendation.from_orm(row) if row else None
 
 
+def _archived_ids(ids: list[int]) -> Any:
+    """
+    Ids not found in hot table, statuses are moved with their recommendations,
+    so only statuses of these ids are looked up in archive
+    """
+    hot_ids = sa.select(Recommendation.id).where(Recommendation.id.in_(ids))
+    return sa.select(sa.func.unnest(sa.literal(ids, postgresql.ARRAY(sa.BigInteger)))).except_(hot_ids)
+
+
 def select_platform_statuses(
     recommendation_id: int | None = None,
     recommendations_ids: list[int] | None = None,
     platform_name: str | None = None,
 ) -> list[models.PlatformStatus]:
     filters = []
+    ids = recommendations_ids
     if recommendation_id is not None:
         filters.append(PlatformStatus.recommendation_id == recommendation_id)
+        ids = [recommendation_id] if ids is None or recommendation_id in ids else []
     if recommendations_ids is not None:
         filters.append(PlatformStatus.recommendation_id.in_(recommendations_ids))
     if platform_name is not None:
@@ -52,46 +122,131 @@ def select_platform_statuses(
     if not filters:
         raise ValueError("Provide at least one filter")
 
-    rows = db.select_all(sa.select(PlatformStatus).select_from(PlatformStatus).where(*filters))
+    # archive is looked up by ids of recommendations not found in hot table only
+    archive = platform_statuses_archive
+    archive_filters = [archive.c.platform == platform_name] if platform_name is not None else []
+    if ids is not None:
+        archive_filters.append(archive.c.recommendation_id.in_(_archived_ids(ids)))
+
+    query = sa.union_all(
+        sa.select(PlatformStatus.__table__).where(*filters),
+        sa.select(archive).where(*archive_filters),
+    )
+    rows = db.select_all(query)
     return [models.PlatformStatus.from_orm(row) for row in rows]
 
 
+def select_recommendations_with_platform_statuses(
+    ids_: list[int],
+) -> list[tuple[models.Recommendation, list[models.PlatformStatus]]]:
+    """
+    Select recommendations with their not empty platform statuses in one query.
+    Platform statuses are sorted by id, the newest statuses will be on top of the list
+    """
+    statuses = sa.func.coalesce(
+        sa.func.json_agg(
+            aggregate_order_by(
+                sa.func.json_build_object(
+                    "id",
+                    PlatformStatus.id,
+                    "recommendation_id",
+                    PlatformStatus.recommendation_id,
+                    "platform",
+                    PlatformStatus.platform,
+                    "data",
+                    PlatformStatus.data,
+                ),
+                PlatformStatus.id.desc(),
+            )
+        ).filter(PlatformStatus.id.isnot(None)),
+        sa.literal_column("'[]'::json"),
+    ).label("platform_statuses")
+
+    query = (
+        sa.select(Recommendation, statuses)
+        .outerjoin(
+            PlatformStatus,
+            sa.and_(
+                PlatformStatus.recommendation_id == Recommendation.id,
+                sa.func.jsonb_array_length(PlatformStatus.data) > 0,
+            ),
+        )
+        .where(Recommendation.id.in_(ids_))
+        .group_by(Recommendation.id)
+        .order_by(Recommendation.id)
+    )
+    rows = db.select_all(query)
+    return [
+        (
+            models.Recommendation.from_orm(row),
+            [models.PlatformStatus.parse_obj(status) for status in row["platform_statuses"]],
+        )
+        for row in rows
+    ]
+
+
 def _get_recommendation_list_query(
     account_id: int,
     journey_id: int | None,
     date_from: date | None,
     date_to: date | None,
     status: RecommendationStatus | None,
+    platforms_state: PlatformState | None = None,
+    q: str | None = None,
 ) -> Any:
-    filters = [Recommendation.account_id == account_id]
+    """Columns of recommendations are available as `query.selected_columns`"""
+    recommendations = _recommendations(with_archive=_reads_archive(date_from=date_from, status=status))
+    filters = [recommendations.c.account_id == account_id]
     if date_from is not None:
-        filters.append(Recommendation.creation_date >= date_from)
+        filters.append(recommendations.c.creation_date >= date_from)
     if date_to is not None:
-        filters.append(Recommendation.creation_date < date_to + timedelta(days=1))
+        filters.append(recommendations.c.creation_date < date_to + timedelta(days=1))
     if status is not None:
-        filters.append(Recommendation.status == status)
+        filters.append(recommendations.c.status == status)
     if journey_id is not None:
-        filters.append(Recommendation.journey_id == journey_id)
+        filters.append(recommendations.c.journey_id == journey_id)
+    if platforms_state is not None:
+        filters.append(recommendations.c.platforms_state == platforms_state)
+    if q is not None:
+        # substring or similar word, both are answered by trigram index of journey name
+        filters.append(
+            sa.or_(
+                recommendations.c.journey_name.ilike(f"%{_escape_like(q)}%"),
+                recommendations.c.journey_name.op("%>")(q),
+            )
+        )
 
-    query = sa.select(Recommendation).where(sa.and_(*filters))
+    query = sa.select(recommendations).where(sa.and_(*filters))
     return query
 
 
-def _get_recommendation_list_order_by(sort_by: RecommendationPageSortBy) -> list[Any]:
-    """Get list of column for ordering recommendation list page"""
+def _escape_like(value: str) -> str:
+    """Escape wildcards of `LIKE` pattern by default escape character"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _get_recommendation_list_order_by(
+    sort_by: RecommendationPageSortBy,
+    columns: Any,
+    q: str | None = None,
+) -> list[Any]:
+    """Get list of column for ordering recommendation list page, found by search are ranked first"""
+    if q is not None:
+        rank = sa.desc(sa.func.word_similarity(q, columns.journey_name))
+        return [rank, *_get_recommendation_list_order_by(sort_by, columns=columns)]
 
     if sort_by == RecommendationPageSortBy.status_date:
         return [
             # recommendation with status active will be on top
-            sa.desc(Recommendation.status == RecommendationStatus.ACTIVE),
-            sa.desc(Recommendation.creation_date),
-            sa.desc(Recommendation.id),
+            sa.desc(columns.status == RecommendationStatus.ACTIVE),
+            sa.desc(columns.creation_date),
+            sa.desc(columns.id),
         ]
 
     elif sort_by == RecommendationPageSortBy.date:
         return [
-            sa.desc(Recommendation.creation_date),
-            sa.desc(Recommendation.id),
+            sa.desc(columns.creation_date),
+            sa.desc(columns.id),
         ]
 
     else:
@@ -107,6 +262,8 @@ def select_recommendation_list(
     limit: int,
     offset: int,
     sort_by: RecommendationPageSortBy,
+    platforms_state: PlatformState | None = None,
+    q: str | None = None,
 ) -> list[models.Recommendation]:
     query = _get_recommendation_list_query(
         account_id=account_id,
@@ -114,14 +271,165 @@ def select_recommendation_list(
         date_from=date_from,
         date_to=date_to,
         status=status,
+        platforms_state=platforms_state,
+        q=q,
     )
 
-    order_by = _get_recommendation_list_order_by(sort_by)
+    order_by = _get_recommendation_list_order_by(sort_by, columns=query.selected_columns, q=q)
     query = query.limit(limit).offset(offset).order_by(*order_by)
     rows = db.select_all(query)
     return [models.Recommendation.from_orm(row) for row in rows]
 
 
+def select_recommendation_list_fields(
+    fields: tuple[str, ...],
+    account_id: int,
+    journey_id: int | None,
+    date_from: date | None,
+    date_to: date | None,
+    status: RecommendationStatus | None,
+    limit: int,
+    offset: int,
+    sort_by: RecommendationPageSortBy,
+    platforms_state: PlatformState | None = None,
+    q: str | None = None,
+) -> list[StrDict]:
+    """Select only given columns of recommendations list"""
+    query = _get_recommendation_list_query(
+        account_id=account_id,
+        journey_id=journey_id,
+        date_from=date_from,
+        date_to=date_to,
+        status=status,
+        platforms_state=platforms_state,
+        q=q,
+    )
+
+    order_by = _get_recommendation_list_order_by(sort_by, columns=query.selected_columns, q=q)
+    query = query.with_only_columns(*[query.selected_columns[field] for field in fields])
+    query = query.limit(limit).offset(offset).order_by(*order_by)
+    rows = db.select_all(query)
+    return [dict(row._mapping) for row in rows]
+
+
+def _json_datetime(column: Any) -> Any:
+    """Format timestamp like `datetime.isoformat`: fraction of second only when it's not zero"""
+    column = sa.cast(column, sa.DateTime)
+    return sa.case(
+        (sa.func.date_trunc("second", column) == column, sa.func.to_char(column, 'YYYY-MM-DD"T"HH24:MI:SS')),
+        else_=sa.func.to_char(column, 'YYYY-MM-DD"T"HH24:MI:SS.US'),
+    )
+
+
+def _platform_statuses_json(recommendation_id: Any, statuses: Any) -> Any:
+    """Not empty platform statuses of recommendation as JSON, the newest on top"""
+    item = (
+        sa.func.jsonb_array_elements(statuses.c.data)
+        .table_valued("value", with_ordinality="ordinality")
+        .render_derived(name="item")
+    )
+    # string fields of `PlatformStatusData` are always present and converted to string
+    item_json = item.c.value.op("||")(
+        sa.func.jsonb_build_object(
+            "object_id",
+            item.c.value.op("->>")("object_id"),
+            "object_type",
+            item.c.value.op("->>")("object_type"),
+            "details",
+            item.c.value.op("->>")("details"),
+        )
+    )
+    data = sa.select(sa.func.jsonb_agg(aggregate_order_by(item_json, item.c.ordinality))).scalar_subquery()
+
+    status_json = sa.func.json_build_object(
+        "id",
+        statuses.c.id,
+        "recommendation_id",
+        statuses.c.recommendation_id,
+        "platform",
+        statuses.c.platform,
+        "data",
+        data,
+    )
+    return (
+        sa.select(
+            sa.func.coalesce(
+                sa.func.json_agg(aggregate_order_by(status_json, statuses.c.id.desc())),
+                sa.literal_column("'[]'::json"),
+            )
+        )
+        .where(
+            statuses.c.recommendation_id == recommendation_id,
+            sa.func.jsonb_array_length(statuses.c.data) > 0,
+        )
+        .scalar_subquery()
+    )
+
+
+def select_recommendation_page_json(
+    account_id: int,
+    journey_id: int | None,
+    date_from: date | None,
+    date_to: date | None,
+    status: RecommendationStatus | None,
+    page_num: int,
+    page_size: int,
+    sort_by: RecommendationPageSortBy,
+    platforms_state: PlatformState | None = None,
+    q: str | None = None,
+) -> str:
+    """
+    Render the whole `RecommendationPage` to JSON in one statement, output is
+    the same as serialized response model (checked by tests)
+    """
+    query = _get_recommendation_list_query(
+        account_id=account_id,
+        journey_id=journey_id,
+        date_from=date_from,
+        date_to=date_to,
+        status=status,
+        platforms_state=platforms_state,
+        q=q,
+    )
+    total_count = query.with_only_columns(sa.func.count(query.selected_columns.id)).scalar_subquery()
+
+    order_by = _get_recommendation_list_order_by(sort_by, columns=query.selected_columns, q=q)
+    page = (
+        query.add_columns(sa.func.row_number().over(order_by=order_by).label("position"))
+        .order_by(*order_by)
+        .limit(page_size)
+        .offset((page_num - 1) * page_size)
+        .subquery("page")
+    )
+
+    item_args: list[Any] = []
+    for name, field in models.Recommendation.__fields__.items():
+        column = page.c[name]
+        item_args += [name, _json_datetime(column) if field.type_ is datetime else column]
+    # statuses are archived with their recommendations
+    statuses = _platform_statuses(with_archive=_reads_archive(date_from=date_from, status=status))
+    item_args += ["platform_statuses", _platform_statuses_json(recommendation_id=page.c.id, statuses=statuses)]
+
+    items = sa.select(
+        sa.func.coalesce(
+            sa.func.json_agg(aggregate_order_by(sa.func.json_build_object(*item_args), page.c.position)),
+            sa.literal_column("'[]'::json"),
+        )
+    ).scalar_subquery()
+
+    page_json = sa.func.json_build_object(
+        "page",
+        page_num,
+        "pages",
+        # the same as `count_total_pages`
+        sa.func.greatest((total_count + page_size - 1) / page_size, 1),
+        "items",
+        items,
+    )
+    # cast to text, so driver doesn't parse JSON
+    return db.select_scalar(sa.select(sa.cast(page_json, sa.Text)))
+
+
 def exists_active_recommendations(account_id: int, journey_id: int | None) -> bool:
     """Check if active recommendations exists in database"""
     filters = [Recommendation.account_id == account_id, Recommendation.status == RecommendationStatus.ACTIVE]
@@ -132,12 +440,34 @@ def exists_active_recommendations(account_id: int, journey_id: int | None) -> bo
     return db.select_scalar(query)
 
 
+def select_recommendation_status_counts(account_id: int, journey_id: int | None, by_journey: bool) -> list[StrDict]:
+    """
+    Count recommendations by status (and journey) in one grouped query. Like the
+    default list without `date_from`, archive is not counted, so counts match
+    pages of their tabs and are answered by index of account and status.
+    """
+    recommendations = _recommendations(with_archive=_reads_archive(date_from=None, status=None))
+    columns = [recommendations.c.status, sa.func.count().label("count")]
+    if by_journey:
+        columns.insert(0, recommendations.c.journey_id)
+
+    filters = [recommendations.c.account_id == account_id]
+    if journey_id is not None:
+        filters.append(recommendations.c.journey_id == journey_id)
+
+    query = sa.select(*columns).where(*filters).group_by(*columns[:-1])
+    rows = db.select_all(query)
+    return [dict(row._mapping) for row in rows]
+
+
 def select_recommendation_count(
     account_id: int,
     journey_id: int | None,
     date_from: date | None,
     date_to: date | None,
     status: RecommendationStatus | None,
+    platforms_state: PlatformState | None = None,
+    q: str | None = None,
 ) -> int:
     query = _get_recommendation_list_query(
         account_id=account_id,
@@ -145,16 +475,56 @@ def select_recommendation_count(
         date_from=date_from,
         date_to=date_to,
         status=status,
+        platforms_state=platforms_state,
+        q=q,
     )
-    count_query = query.with_only_columns(sa.func.count(Recommendation.id))
+    count_query = query.with_only_columns(sa.func.count(query.selected_columns.id))
     return db.select_scalar(count_query)
 
 
+def select_recommendation_ids_by_lookup(
+    account_id: int,
+    object_id: str | None,
+    object_type: str | None,
+    taxonomy_key: str | None,
+    limit: int,
+) -> list[int]:
+    """
+    Ids of recommendations of account, which platform statuses contain the
+    object or taxonomy has the key. Filters are answered by GIN indexes.
+    """
+    recommendations = _recommendations(with_archive=True)
+    filters = [recommendations.c.account_id == account_id]
+    platform_object = {
+        name: value for name, value in (("object_id", object_id), ("object_type", object_type)) if value is not None
+    }
+    if platform_object:
+        statuses = _platform_statuses(with_archive=True)
+        statuses_ids = sa.select(statuses.c.recommendation_id).where(statuses.c.data.contains([platform_object]))
+        filters.append(recommendations.c.id.in_(statuses_ids))
+    if taxonomy_key is not None:
+        taxonomies = sa.select(Taxonomy.hash).where(Taxonomy.data.has_key(taxonomy_key))  # noqa: W601
+        filters.append(recommendations.c.taxonomy_hash.in_(taxonomies))
+
+    query = sa.select(recommendations.c.id).where(*filters).order_by(recommendations.c.id.desc()).limit(limit)
+    return [row["id"] for row in db.select_all(query)]
+
+
 def insert_recommendation(
     recommendation: models.RecommendationInput,
 ) -> models.Recommendation:
+    # taxonomy is inserted by the same statement, existing one is not written again
+    taxonomy = sa.cast(sa.literal(recommendation.taxonomy.dict(), Taxonomy.data.type), postgresql.JSONB)
+    taxonomy_hash = sa.func.md5(sa.cast(taxonomy, sa.Text))
+    interned = (
+        postgresql.insert(Taxonomy)
+        .from_select(["hash", "data"], sa.select(taxonomy_hash, taxonomy))
+        .on_conflict_do_nothing()
+        .cte("interned")
+    )
     row = db.select_one(
         sa.insert(Recommendation)
+        .add_cte(interned)
         .values(
             uuid=recommendation.uuid,
             creation_date=recommendation.creation_date,
@@ -165,7 +535,7 @@ def insert_recommendation(
             media_plan_id=recommendation.media_plan_id,
             journey_name=recommendation.journey_name,
             version=recommendation.version,
-            taxonomy=recommendation.taxonomy.dict(),
+            taxonomy_hash=taxonomy_hash,
             user_id=None,
             currency=recommendation.budget_info.currency,
             status=RecommendationStatus.ACTIVE.value,
@@ -177,17 +547,35 @@ def insert_recommendation(
     return models.Recommendation.from_orm(row)
 
 
-def insert_platform_status(status: models.PlatformStatusInput) -> models.PlatformStatus:
+def insert_platform_status(status: models.PlatformStatusInput) -> models.PlatformStatus | None:
+    """
+    Insert platform status, unless the newest status of the same platform has
+    the same data. Data is normalized by `jsonb`, so order of keys doesn't matter.
+    """
+    data = sa.cast(sa.literal(status.data, PlatformStatus.data.type), postgresql.JSONB)
+    data_hash = sa.func.md5(sa.cast(data, sa.Text))
+    # repeated status of archived recommendation is skipped too, so it's not restored
+    archive = platform_statuses_archive
+    statuses = sa.union_all(
+        sa.select(PlatformStatus.id, PlatformStatus.data_hash).where(
+            PlatformStatus.recommendation_id == status.id, PlatformStatus.platform == status.platform
+        ),
+        sa.select(archive.c.id, archive.c.data_hash).where(
+            archive.c.recommendation_id.in_(_archived_ids([status.id])), archive.c.platform == status.platform
+        ),
+    ).subquery()
+    newest_hash = sa.select(statuses.c.data_hash).order_by(statuses.c.id.desc()).limit(1).scalar_subquery()
     row = db.select_one(
         sa.insert(PlatformStatus)
-        .values(
-            recommendation_id=status.id,
-            platform=status.platform,
-            data=status.data,
+        .from_select(
+            ["recommendation_id", "platform", "data", "data_hash"],
+            sa.select(sa.literal(status.id), sa.literal(status.platform), data, data_hash).where(
+                newest_hash.is_distinct_from(data_hash)
+            ),
         )
         .returning(PlatformStatus)
     )
-    return models.PlatformStatus.from_orm(row)
+    return models.PlatformStatus.from_orm(row) if row else None
 
 
 def insert_goal_update(update: models.GoalUpdateInput) -> models.GoalUpdate:
@@ -220,11 +608,37 @@ def delete_goal_update(goal_id: int):
     return models.GoalUpdate.from_orm(row) if row else None
 
 
+def _update_or_restore(query: Any, recommendation_id: int) -> Any:
+    """
+    Update recommendation in hot table, archived recommendation is restored
+    only when it's not found there. Version of account must be locked.
+    """
+    row = db.select_one(query)
+    if row is None:
+        restore_recommendation(id_=recommendation_id)
+        row = db.select_one(query)
+    return row
+
+
 def update_recommendation(recommendation_id: int, data: StrDict) -> models.Recommendation:
-    row = db.select_one(
-        sa.update(Recommendation).values(data).where(Recommendation.id == recommendation_id).returning(Recommendation)
+    query = (
+        sa.update(Recommendation)
+        .values({**data, "change_seq": recommendation_change_seq.next_value()})
+        .where(Recommendation.id == recommendation_id)
+        .returning(Recommendation)
     )
-    return models.Recommendation.from_orm(row)
+    return models.Recommendation.from_orm(_update_or_restore(query, recommendation_id=recommendation_id))
+
+
+def touch_recommendation(recommendation_id: int) -> None:
+    """Mark recommendation as changed"""
+    query = (
+        sa.update(Recommendation)
+        .values(change_seq=recommendation_change_seq.next_value())
+        .where(Recommendation.id == recommendation_id)
+        .returning(Recommendation.id)
+    )
+    _update_or_restore(query, recommendation_id=recommendation_id)
 
 
 def update_recommendation_decision(
@@ -255,13 +669,387 @@ def update_recommendation_status(
     return update_recommendation(recommendation_id=recommendation_id, data=update)
 
 
-def expire_recommendations(account_id: int, journey_id: int) -> None:
-    db.execute(
-        sa.update(Recommendation)
-        .values(status=RecommendationStatus.EXPIRED)
+def update_recommendation_platforms_state(
+    recommendation_id: int,
+    status: RecommendationStatus,
+    platforms_summary: dict[str, PlatformState],
+    platforms_state: PlatformState | None,
+) -> models.Recommendation:
+
+    update = {
+        "status": status.value,
+        "platforms_summary": platforms_summary,
+        "platforms_state": platforms_state,
+    }
+    return update_recommendation(recommendation_id=recommendation_id, data=update)
+
+
+def expire_recommendations(account_id: int, journey_id: int) -> list[models.Recommendation]:
+    """Expire active recommendations of journey, returns them as they were before expiration"""
+    previous = (
+        sa.select(Recommendation)
         .where(
             Recommendation.account_id == account_id,
             Recommendation.journey_id == journey_id,
             Recommendation.status.in_([RecommendationStatus.ACTIVE, RecommendationStatus.ACCEPTING]),
         )
+        .with_for_update()
+        .subquery()
+    )
+    rows = db.select_all(
+        sa.update(Recommendation)
+        .values(status=RecommendationStatus.EXPIRED, change_seq=recommendation_change_seq.next_value())
+        .where(Recommendation.id == previous.c.id)
+        .returning(*previous.c)
+    )
+    return [models.Recommendation.from_orm(row) for row in rows]
+
+
+def update_decision_rollups(deltas: dict[RollupKey, Counters]) -> None:
+    """Add deltas to daily rollups, rows are upserted in order of keys to avoid deadlocks"""
+    if not deltas:
+        return
+
+    values = [
+        {"account_id": account_id, "day": day, "type": type_, **counters}
+        for (account_id, day, type_), counters in sorted(deltas.items())
+    ]
+    query = postgresql.insert(DecisionRollup).values(values)
+    query = query.on_conflict_do_update(
+        index_elements=[DecisionRollup.account_id, DecisionRollup.day, DecisionRollup.type],
+        set_={name: getattr(DecisionRollup, name) + getattr(query.excluded, name) for name in COUNTERS},
+    )
+    db.execute(query)
+
+
+def _get_decision_rollup_aggregates(recommendations: Any) -> list[Any]:
+    """The same counters as `rollups.get_counters`, but aggregated by database"""
+    is_decided = recommendations.c.decision_time.is_not(None)
+    is_rejected = recommendations.c.status == RecommendationStatus.REJECTED
+    decision_time = sa.cast(recommendations.c.decision_time, sa.DateTime)
+    seconds = sa.cast(
+        sa.func.greatest(sa.func.floor(sa.extract("epoch", decision_time - recommendations.c.creation_date)), 0),
+        sa.BigInteger,
+    )
+
+    aggregates = [sa.func.count().filter(recommendations.c.status == status) for status in STATUS_COUNTERS]
+    aggregates += [
+        sa.func.count().filter(is_decided, sa.not_(is_rejected)),
+        sa.func.count().filter(is_decided, is_rejected),
+        sa.func.coalesce(sa.func.sum(seconds), 0),
+    ]
+    lower_bound = 0
+    for _, upper_bound in DECISION_BUCKETS:
+        aggregates.append(sa.func.count().filter(seconds >= lower_bound, seconds < upper_bound))
+        lower_bound = upper_bound
+    aggregates.append(sa.func.count().filter(seconds >= lower_bound))
+    return aggregates
+
+
+def rebuild_decision_rollups(account_id: int | None = None) -> int:
+    """
+    Rebuild daily rollups from recommendations, returns number of rollups.
+    Table is locked for writes, so changes made during rebuild are applied
+    on top of rebuilt rollups.
+    """
+    db.execute(sa.text(f"LOCK TABLE {DecisionRollup.__tablename__} IN EXCLUSIVE MODE"))
+
+    recommendations = _recommendations(with_archive=True)
+    rollup_filters = []
+    filters = []
+    if account_id is not None:
+        rollup_filters.append(DecisionRollup.account_id == account_id)
+        filters.append(recommendations.c.account_id == account_id)
+    db.execute(sa.delete(DecisionRollup).where(*rollup_filters))
+
+    day = sa.cast(recommendations.c.creation_date, sa.Date)
+    query = (
+        sa.select(
+            recommendations.c.account_id,
+            day,
+            recommendations.c.type,
+            *_get_decision_rollup_aggregates(recommendations),
+        )
+        .where(*filters)
+        .group_by(recommendations.c.account_id, day, recommendations.c.type)
+    )
+    rows = db.select_all(
+        sa.insert(DecisionRollup)
+        .from_select(["account_id", "day", "type", *COUNTERS], query)
+        .returning(DecisionRollup.account_id)
+    )
+    return len(rows)
+
+
+def select_decision_rollups(
+    account_id: int,
+    date_from: date | None,
+    date_to: date | None,
+    type_: str | None,
+) -> list[StrDict]:
+    filters = [DecisionRollup.account_id == account_id]
+    if date_from is not None:
+        filters.append(DecisionRollup.day >= date_from)
+    if date_to is not None:
+        filters.append(DecisionRollup.day <= date_to)
+    if type_ is not None:
+        filters.append(DecisionRollup.type == type_)
+
+    query = sa.select(DecisionRollup).where(*filters).order_by(DecisionRollup.day, DecisionRollup.type)
+    rows = db.select_all(query)
+    return [dict(row._mapping) for row in rows]
+
+
+def _get_bump_account_version_query(accounts: Any) -> Any:
+    """Insert or bump versions of accounts, selected by `accounts` query"""
+    return (
+        postgresql.insert(AccountVersion)
+        .from_select(["account_id", "version"], accounts)
+        .on_conflict_do_update(
+            index_elements=[AccountVersion.account_id],
+            set_={"version": recommendation_change_seq.next_value()},
+        )
+        .returning(AccountVersion.version)
+    )
+
+
+def bump_account_version(account_id: int) -> int:
+    """
+    Bump version of account before changing its recommendations. Version is
+    locked until the end of transaction, so concurrent changes of the same
+    account wait for each other and are committed in order of `change_seq`.
+    """
+    accounts = sa.select(sa.literal(account_id, sa.BigInteger), recommendation_change_seq.next_value())
+    return db.select_scalar(_get_bump_account_version_query(accounts))
+
+
+def bump_recommendation_account_version(recommendation_id: int) -> int | None:
+    """Bump version of recommendation account, returns None for unknown recommendation"""
+    recommendations = _recommendations(with_archive=True)
+    accounts = sa.select(recommendations.c.account_id, recommendation_change_seq.next_value()).where(
+        recommendations.c.id == recommendation_id
+    )
+    row = db.select_one(_get_bump_account_version_query(accounts))
+    return row["version"] if row else None
+
+
+def select_account_version(account_id: int) -> int:
+    """Get version of account, it's 0 until the first change of account"""
+    row = db.select_one(sa.select(AccountVersion.version).where(AccountVersion.account_id == account_id))
+    return row["version"] if row else 0
+
+
+def select_recommendation_changes(account_id: int, since: int, limit: int) -> list[models.Recommendation]:
+    """Select recommendations changed after given sequence number, in order of changes"""
+    query = (
+        sa.select(Recommendation)
+        .where(Recommendation.account_id == account_id, Recommendation.change_seq > since)
+        .order_by(Recommendation.change_seq)
+        .limit(limit)
+    )
+    rows = db.select_all(query)
+    return [models.Recommendation.from_orm(row) for row in rows]
+
+
+def notify_event(event: StrDict) -> None:
+    pubsub.notify(channel=config.EVENTS_CHANNEL, payload=event)
+
+
+def notify_platform_status_event(recommendation_id: int, platform: str) -> None:
+    """Build event from recommendation row, so it doesn't need to be selected first"""
+    event = sa.func.json_build_object(
+        "type",
+        "platform_status",
+        "recommendation_id",
+        Recommendation.id,
+        "account_id",
+        Recommendation.account_id,
+        "journey_id",
+        Recommendation.journey_id,
+        "status",
+        Recommendation.status,
+        "platform",
+        platform,
+    )
+    db.execute(
+        sa.select(sa.func.pg_notify(config.EVENTS_CHANNEL, sa.cast(event, sa.Text))).where(
+            Recommendation.id == recommendation_id
+        )
+    )
+
+
+def _move_recommendations(condition: Any, source: tuple[Any, Any], target: tuple[Any, Any]) -> tuple[int, int]:
+    """
+    Move recommendations matching condition with their platform statuses
+    between hot and archive tables in one statement, returns numbers of moved rows
+    """
+    recommendations, statuses = source
+    recommendations_target, statuses_target = target
+
+    moved = sa.delete(recommendations).where(condition).returning(*recommendations.c).cte("moved")
+    inserted = (
+        sa.insert(recommendations_target)
+        .from_select([column.name for column in moved.c], sa.select(moved))
+        .returning(recommendations_target.c.id)
+        .cte("inserted")
+    )
+    moved_statuses = (
+        sa.delete(statuses)
+        .where(statuses.c.recommendation_id.in_(sa.select(moved.c.id)))
+        .returning(*statuses.c)
+        .cte("moved_statuses")
+    )
+    inserted_statuses = (
+        sa.insert(statuses_target)
+        .from_select([column.name for column in moved_statuses.c], sa.select(moved_statuses))
+        .returning(statuses_target.c.id)
+        .cte("inserted_statuses")
+    )
+    row = db.select_one(
+        sa.select(
+            sa.select(sa.func.count()).select_from(inserted).scalar_subquery().label("recommendations"),
+            sa.select(sa.func.count()).select_from(inserted_statuses).scalar_subquery().label("platform_statuses"),
+        )
+    )
+    return row["recommendations"], row["platform_statuses"]
+
+
+def insert_missing_account_versions(before: datetime) -> None:
+    """
+    Archival locks versions of accounts, accounts loaded without changes
+    (e.g. by `seed-data`) get the initial version, so they are archived too
+    """
+    accounts = (
+        sa.select(Recommendation.account_id, sa.literal(0, sa.BigInteger))
+        .where(Recommendation.status.in_(ARCHIVED_STATUSES), Recommendation.creation_date < before)
+        .distinct()
+    )
+    db.execute(
+        postgresql.insert(AccountVersion)
+        .from_select(["account_id", "version"], accounts)
+        .on_conflict_do_nothing(index_elements=[AccountVersion.account_id])
+    )
+
+
+def archive_recommendations(before: datetime, batch_size: int) -> tuple[int, int]:
+    """
+    Archive batch of recommendations created before given time. Versions of
+    their accounts are locked like by writers, recommendations of accounts
+    changed right now are skipped and archived by the next run. Versions are
+    bumped, as archived recommendations leave pages cached by version.
+    """
+    batch = (
+        sa.select(Recommendation.id)
+        .join(AccountVersion, AccountVersion.account_id == Recommendation.account_id)
+        .where(Recommendation.status.in_(ARCHIVED_STATUSES), Recommendation.creation_date < before)
+        .order_by(Recommendation.id)
+        .limit(batch_size)
+        .with_for_update(of=[Recommendation, AccountVersion], skip_locked=True)
+    )
+    ids = [row["id"] for row in db.select_all(batch)]
+    if not ids:
+        return 0, 0
+
+    batch_accounts = sa.select(Recommendation.account_id).where(Recommendation.id.in_(ids)).distinct().subquery()
+    db.execute(
+        _get_bump_account_version_query(sa.select(batch_accounts.c.account_id, recommendation_change_seq.next_value()))
+    )
+    return _move_recommendations(
+        condition=Recommendation.id.in_(ids),
+        source=(Recommendation.__table__, PlatformStatus.__table__),
+        target=(recommendations_archive, platform_statuses_archive),
+    )
+
+
+def restore_recommendation(id_: int) -> None:
+    """Move archived recommendation back to be changed, not archived one is not touched"""
+    _move_recommendations(
+        condition=recommendations_archive.c.id == id_,
+        source=(recommendations_archive, platform_statuses_archive),
+        target=(Recommendation.__table__, PlatformStatus.__table__),
+    )
+
+
+# tables partitioned by ranges of recommendation id
+PARTITIONED_TABLES = (PlatformStatus.__tablename__, platform_statuses_archive.name)
+
+_PARTITION_BOUND_RE = re.compile(r"FOR VALUES FROM \((?P<lower>[^)]+)\) TO \((?P<upper>[^)]+)\)")
+
+
+def _parse_partition_bound(value: str) -> int | None:
+    value = value.strip("'")
+    return None if value in ("MINVALUE", "MAXVALUE") else int(value)
+
+
+def _partition_order(partition: StrDict) -> tuple[bool, int]:
+    # partition unbounded from above is the last one
+    return partition["upper"] is None, partition["upper"] or 0
+
+
+def select_partitions(table: str) -> list[StrDict]:
+    """
+    Partitions of table ordered by range of recommendation id, unbounded side
+    is None. Default partition is not supported, as creation of every range
+    partition would have to scan and move its rows.
+    """
+    query = sa.text(
+        """
+        SELECT child.relname AS name, pg_get_expr(child.relpartbound, child.oid) AS bound
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = :table
+        """
+    ).bindparams(table=table)
+
+    partitions = []
+    for row in db.select_all(query):
+        if row["bound"] == "DEFAULT":
+            raise ValueError(f"Default partition {row['name']} of {table} is not supported")
+        match = _PARTITION_BOUND_RE.match(row["bound"])
+        if match is None:
+            raise ValueError(f"Unexpected bound of partition {row['name']}: {row['bound']}")
+        partitions.append(
+            {
+                "name": row["name"],
+                "lower": _parse_partition_bound(match["lower"]),
+                "upper": _parse_partition_bound(match["upper"]),
+            }
+        )
+    return sorted(partitions, key=_partition_order)
+
+
+def _lock_partitions() -> None:
+    """Partitions are maintained by beat of every worker, changes wait for each other until end of transaction"""
+    db.execute(sa.select(sa.func.pg_advisory_xact_lock(sa.func.hashtext("partitions"))))
+
+
+def create_partition(table: str, lower: int, upper: int) -> str | None:
+    """Create partition, returns None when it's already created by concurrent worker"""
+    name = f"{table}_p{lower}"
+    _lock_partitions()
+    if db.select_scalar(sa.select(sa.func.to_regclass(name))) is not None:
+        return None
+    db.execute(sa.text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM ({lower}) TO ({upper})"))
+    return name
+
+
+def drop_partition(name: str) -> None:
+    _lock_partitions()
+    db.execute(sa.text(f"DROP TABLE IF EXISTS {name}"))
+
+
+def select_max_recommendation_id() -> int:
+    return db.select_scalar(sa.select(sa.func.coalesce(sa.func.max(Recommendation.id), 0)))
+
+
+def select_last_creation_date(before_id: int) -> datetime | None:
+    """Creation date of the last recommendation with id less than given one"""
+    recommendations = _recommendations(with_archive=True)
+    row = db.select_one(
+        sa.select(recommendations.c.creation_date)
+        .where(recommendations.c.id < before_id)
+        .order_by(recommendations.c.id.desc())
+        .limit(1)
     )
+    return row["creation_date"] if row else None
@@ -0,0 +1,79 @@
+"""
+Events of recommendations changes. Events are sent with NOTIFY in the
+transaction of change and streamed to clients as server-sent events.
+"""
+import asyncio
+from enum import Enum
+from typing import AsyncIterator
+
+from starlette.requests import Request
+
+from app.config import config
+from app.pubsub import Listener
+from app.recommendations import db
+from app.recommendations.models import PlatformStatus, Recommendation
+from app.types import StrDict
+from app.utils import to_json
+
+
+class EventType(str, Enum):
+    recommendation = "recommendation"
+    platform_status = "platform_status"
+    expired = "expired"
+    # events could be lost, client has to reload recommendations
+    resync = "resync"
+
+
+listener = Listener(channel=config.EVENTS_CHANNEL)
+
+
+def recommendation_changed(recommendation: Recommendation) -> None:
+    db.notify_event(
+        {
+            "type": EventType.recommendation,
+            "recommendation_id": recommendation.id,
+            "account_id": recommendation.account_id,
+            "journey_id": recommendation.journey_id,
+            "status": recommendation.status,
+        }
+    )
+
+
+def recommendations_expired(account_id: int, journey_id: int) -> None:
+    db.notify_event(
+        {
+            "type": EventType.expired,
+            "account_id": account_id,
+            "journey_id": journey_id,
+        }
+    )
+
+
+def platform_status_changed(status: PlatformStatus) -> None:
+    db.notify_platform_status_event(recommendation_id=status.recommendation_id, platform=status.platform)
+
+
+def format_event(event: StrDict) -> str:
+    return f"event: {event['type']}\ndata: {to_json(event)}\n\n"
+
+
+async def stream_events(request: Request, account_id: int, journey_id: int | None) -> AsyncIterator[str]:
+    """Stream events of account (and journey) until client is disconnected"""
+
+    def is_visible(event: StrDict) -> bool:
+        if event.get("type") == EventType.resync:
+            return True
+        return event.get("account_id") == account_id and (journey_id is None or event.get("journey_id") == journey_id)
+
+    subscription = listener.subscribe(predicate=is_visible)
+    try:
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=config.EVENTS_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                # comment line keeps connection open through proxies
+                yield ": keepalive\n\n"
+                continue
+            yield format_event(event)
+    finally:
+        listener.unsubscribe(subscription)
@@ -0,0 +1,43 @@
+"""
+Sparse fieldsets of recommendations: `fields=id,status` selects only given
+columns and `include=platform_statuses` enriches items by platform statuses.
+"""
+from app.errors import BaseError
+from app.recommendations.models import Recommendation
+
+PLATFORM_STATUSES = "platform_statuses"
+
+RECOMMENDATION_FIELDS = tuple(Recommendation.__fields__)
+INCLUDES = (PLATFORM_STATUSES,)
+
+
+class UnknownFieldsError(BaseError):
+    MESSAGE = "Unknown fields"
+    HTTP_STATUS = 400
+
+
+def _parse_list(raw: str, allowed: tuple[str, ...]) -> tuple[str, ...]:
+    items = [item.strip() for item in raw.split(",") if item.strip()]
+    unknown = sorted(set(items) - set(allowed))
+    if unknown:
+        raise UnknownFieldsError(message=f"Unknown fields: {', '.join(unknown)}")
+    # remove duplicates, but keep order
+    return tuple(dict.fromkeys(items))
+
+
+def parse_fields(raw: str | None) -> tuple[str, ...] | None:
+    if raw is None:
+        return None
+    # id is always returned, it identifies item
+    return _parse_list(f"id,{raw}", allowed=RECOMMENDATION_FIELDS)
+
+
+def parse_include(raw: str | None) -> tuple[str, ...] | None:
+    if raw is None:
+        return None
+    return _parse_list(raw, allowed=INCLUDES)
+
+
+def is_sparse(fields: tuple[str, ...] | None, include: tuple[str, ...] | None) -> bool:
+    """Full response (all fields with platform statuses) is returned when nothing is requested"""
+    return fields is not None or include is not None
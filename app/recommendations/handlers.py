@@ -1,21 +1,44 @@
 from datetime import date
+from functools import partial
+from http import HTTPStatus
+from typing import Callable
 
-from fastapi import APIRouter, Body, Depends, Path, Query
+from fastapi import APIRouter, Body, Depends, Header, Path, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
 from app import db
 from app.auth.dependencies import get_user
 from app.auth.types import User
 from app.config import config
-from app.recommendations import services
-from app.recommendations.enums import RecommendationPageSortBy, RecommendationStatus
+from app.instrumentation import InstrumentedRoute
+from app.recommendations import events, services
+from app.recommendations.cache import page_cache
+from app.recommendations.enums import (
+    RecommendationPageSortBy,
+    RecommendationStatus,
+    RecommendationType,
+)
+from app.recommendations.fields import is_sparse, parse_fields, parse_include
 from app.recommendations.models import RejectRecommendationBody
 from app.recommendations.responses import (
+    DecisionAnalytics,
+    RecommendationChanges,
+    RecommendationLookup,
     RecommendationPage,
     RecommendationPageState,
     RecommendationResponse,
+    RecommendationSummary,
+    SparseRecommendationPage,
+)
+from app.recommendations.states import PlatformState
+from app.utils import is_etag_matched, to_json
+
+FIELDS_DESCRIPTION = "Comma separated fields of recommendation, `id` is always returned"
+INCLUDE_DESCRIPTION = (
+    "Comma separated relations: `platform_statuses`. By default all fields are returned with relations"
 )
 
-router = APIRouter(prefix=config.BASE_API_PATH, tags=["recommendations"])
+router = APIRouter(prefix=config.BASE_API_PATH, tags=["recommendations"], route_class=InstrumentedRoute)
 
 
 @router.get(
@@ -23,64 +46,258 @@ router = APIRouter(prefix=config.BASE_API_PATH, tags=["recommendations"])
     response_model=RecommendationPage,
 )
 def get_recommendation_page(
+    response: Response,
     journey_id: int | None = Query(None),
     page_num: int = Query(1, ge=1, alias="page"),
     page_size: int = Query(20, ge=1, le=100),
     status: RecommendationStatus | None = Query(None),
-    date_from: date | None = Query(None),
+    date_from: date | None = Query(None, description="Archived recommendations are listed only with earlier date"),
     date_to: date | None = Query(None),
     sort_by: RecommendationPageSortBy = Query(RecommendationPageSortBy.status_date),
+    platforms_state: PlatformState | None = Query(None),
+    q: str | None = Query(None, min_length=1, max_length=100, description="Search by journey name, best matches first"),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    include: str | None = Query(None, description=INCLUDE_DESCRIPTION),
+    if_none_match: str | None = Header(None),
+    user: User = Depends(get_user),
+) -> RecommendationPage | Response:
+    account_id = user.company_id
+    fields_ = parse_fields(fields)
+    include_ = parse_include(include)
+    filters = dict(
+        journey_id=journey_id,
+        page_num=page_num,
+        page_size=page_size,
+        status=status,
+        date_from=date_from,
+        date_to=date_to,
+        sort_by=sort_by,
+        platforms_state=platforms_state,
+        q=q,
+    )
+    with db.connect():
+        version = services.get_account_version(account_id=account_id)
+        etag = services.get_recommendation_page_etag(
+            account_id=account_id,
+            version=version,
+            fields=fields_,
+            include=include_,
+            **filters,
+        )
+        if is_etag_matched(if_none_match, etag):
+            return Response(status_code=HTTPStatus.NOT_MODIFIED, headers={"ETag": etag})
+
+        build_page: Callable[[], RecommendationPage | SparseRecommendationPage | str]
+        if is_sparse(fields=fields_, include=include_):
+            build_page = partial(
+                services.get_recommendation_page,
+                account_id=account_id,
+                version=version,
+                fields=fields_,
+                include=include_,
+                **filters,
+            )
+        elif config.PAGE_JSON_RENDERING:
+            build_page = partial(services.render_recommendation_page, account_id=account_id, version=version, **filters)
+        else:
+            build_page = partial(services.get_recommendation_page, account_id=account_id, version=version, **filters)
+
+        if page_cache.enabled:
+            key = page_cache.make_key(
+                "list",
+                account_id=account_id,
+                version=version,
+                filters={**filters, "fields": fields_, "include": include_},
+            )
+            return page_cache.get_or_build(key, build=build_page, headers={"ETag": etag})
+
+        page = build_page()
+
+    if isinstance(page, RecommendationPage):
+        response.headers["ETag"] = etag
+        return page
+
+    # sparse page or page rendered by database is returned as is
+    content = page if isinstance(page, str) else page.json()
+    return Response(content=content, media_type="application/json", headers={"ETag": etag})
+
+
+@router.get(
+    path="/list/summary",
+    response_model=RecommendationSummary,
+)
+def get_recommendation_summary(
+    journey_id: int | None = Query(None),
+    by_journey: bool = Query(False, description="Add counts of every journey"),
     user: User = Depends(get_user),
-) -> RecommendationPage:
+) -> RecommendationSummary | Response:
+    """Counts of recommendations by status, replaces `/list/state`"""
     account_id = user.company_id
     with db.connect():
-        page = services.get_recommendation_page(
+        version = services.get_account_version(account_id=account_id)
+        build_summary = partial(
+            services.get_recommendation_summary,
             account_id=account_id,
             journey_id=journey_id,
-            page_num=page_num,
-            page_size=page_size,
-            status=status,
-            date_from=date_from,
-            date_to=date_to,
-            sort_by=sort_by,
+            by_journey=by_journey,
+            version=version,
         )
+        if page_cache.enabled:
+            key = page_cache.make_key(
+                "summary",
+                account_id=account_id,
+                version=version,
+                filters={"journey_id": journey_id, "by_journey": by_journey},
+            )
+            return page_cache.get_or_build(key, build=build_summary)
+
+        summary = build_summary()
 
-    return page
+    return summary
 
 
 @router.get(
     path="/list/state",
     response_model=RecommendationPageState,
+    deprecated=True,
 )
 def get_recommendation_page_state(
     user: User = Depends(get_user),
     journey_id: int | None = Query(None),
-) -> RecommendationPageState:
+) -> RecommendationPageState | Response:
 
     account_id = user.company_id
     with db.connect():
-        state = services.get_recommendation_page_state(
-            account_id=account_id,
-            journey_id=journey_id,
-        )
+        if page_cache.enabled:
+            version = services.get_account_version(account_id=account_id)
+            build_state = partial(
+                services.get_recommendation_page_state,
+                account_id=account_id,
+                journey_id=journey_id,
+                version=version,
+            )
+            key = page_cache.make_key(
+                "state", account_id=account_id, version=version, filters={"journey_id": journey_id}
+            )
+            return page_cache.get_or_build(key, build=build_state)
+
+        # without page cache the version would only key single-flight, so it is not read
+        state = services.get_recommendation_page_state(account_id=account_id, journey_id=journey_id)
 
     return state
 
 
+@router.get(
+    path="/changes",
+    response_model=RecommendationChanges,
+)
+def get_recommendation_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    user: User = Depends(get_user),
+) -> RecommendationChanges:
+
+    with db.connect():
+        changes = services.get_recommendation_changes(
+            account_id=user.company_id,
+            since=since,
+            limit=limit,
+        )
+
+    return changes
+
+
+@router.get(
+    path="/analytics/decisions",
+    response_model=DecisionAnalytics,
+)
+def get_decision_analytics(
+    date_from: date | None = Query(None),
+    date_to: date | None = Query(None),
+    type_: RecommendationType | None = Query(None, alias="type"),
+    user: User = Depends(get_user),
+) -> DecisionAnalytics:
+    """Daily acceptance and rejection of recommendations by day of creation"""
+    with db.connect():
+        analytics = services.get_decision_analytics(
+            account_id=user.company_id,
+            date_from=date_from,
+            date_to=date_to,
+            type_=type_,
+        )
+
+    return analytics
+
+
+@router.get(
+    path="/lookup",
+    response_model=RecommendationLookup,
+)
+def lookup_recommendations(
+    object_id: str | None = Query(None, description="Object on platform from platform statuses"),
+    object_type: str | None = Query(None),
+    taxonomy_key: str | None = Query(None, description="Top level key of taxonomy"),
+    limit: int = Query(100, ge=1, le=1000),
+    user: User = Depends(get_user),
+) -> RecommendationLookup:
+    """Find recommendations for support, archived recommendations are included"""
+    with db.connect():
+        lookup = services.lookup_recommendations(
+            account_id=user.company_id,
+            object_id=object_id,
+            object_type=object_type,
+            taxonomy_key=taxonomy_key,
+            limit=limit,
+        )
+
+    return lookup
+
+
+@router.get(path="/events", response_class=StreamingResponse)
+async def stream_recommendation_events(
+    request: Request,
+    journey_id: int | None = Query(None),
+    user: User = Depends(get_user),
+) -> StreamingResponse:
+    """Server-sent events of recommendations and platform statuses changes"""
+    return StreamingResponse(
+        events.stream_events(request=request, account_id=user.company_id, journey_id=journey_id),
+        media_type="text/event-stream",
+        # disable buffering of proxies
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get(
     path="/{id}",
     response_model=RecommendationResponse,
 )
 def get_recommendation(
+    response: Response,
     id_: int = Path(..., alias="id"),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    include: str | None = Query(None, description=INCLUDE_DESCRIPTION),
+    if_none_match: str | None = Header(None),
     user: User = Depends(get_user),
-) -> RecommendationResponse:
+) -> RecommendationResponse | Response:
+    fields_ = parse_fields(fields)
+    include_ = parse_include(include)
 
     with db.begin():
         recommendation = services.get_user_recommendation(id_=id_, user=user)
-        response = services.prepare_recommendation_response(recommendation)
+        etag = services.get_recommendation_etag(recommendation, fields=fields_, include=include_)
+        # platform statuses are not loaded for not modified recommendation
+        if is_etag_matched(if_none_match, etag):
+            return Response(status_code=HTTPStatus.NOT_MODIFIED, headers={"ETag": etag})
 
-    return response
+        if is_sparse(fields=fields_, include=include_):
+            item = services.get_sparse_recommendation(recommendation, fields=fields_, include=include_)
+            return Response(content=to_json(item), media_type="application/json", headers={"ETag": etag})
+
+        recommendation_response = services.prepare_recommendation_response(recommendation)
+
+    response.headers["ETag"] = etag
+    return recommendation_response
 
 
 @router.post(
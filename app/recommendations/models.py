@@ -12,6 +12,7 @@ from app.recommendations.enums import (
     RecommendationStatus,
     RecommendationType,
 )
+from app.recommendations.states import PlatformState
 from app.types import StrDict
 from app.utils import to_json
 
@@ -77,6 +78,11 @@ class Recommendation(RecommendationBase):
     status: RecommendationStatus
     decision_time: datetime | None
     reason: str | None
+    # latest state of every platform and overall state derived from them
+    platforms_summary: dict[str, PlatformState] = Field(default_factory=dict)
+    platforms_state: PlatformState | None = None
+    # sequence number of the last change, see endpoint `/changes`
+    change_seq: int
 
     class Config:
         orm_mode = True
@@ -143,6 +149,17 @@ class PlatformStatus(BaseModel):
     def has_success(self) -> bool:
         return any(item.is_success for item in self.data)
 
+    @property
+    def state(self) -> PlatformState | None:
+        """State of recommendation on platform, empty status doesn't change it"""
+        if self.is_empty:
+            return None
+        if any(item.is_pending for item in self.data):
+            return PlatformState.pending
+        if self.has_error:
+            return PlatformState.partial if self.has_success else PlatformState.error
+        return PlatformState.applied
+
 
 class GoalUpdateInput(BaseModel):
     journey_id: int = Field(..., alias="campaign_collection_id")
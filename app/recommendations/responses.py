@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 import copy
+from datetime import date
 from decimal import Decimal
 
 from pydantic import BaseModel, Field, root_validator, validators
 
 from app.recommendations import models
+from app.recommendations.enums import RecommendationStatus
 from app.types import StrDict
 
 
@@ -22,5 +24,61 @@ class RecommendationPage(BaseModel):
     items: list[RecommendationResponse]
 
 
+class SparseRecommendationPage(BaseModel):
+    """Page with requested fields of recommendations only, see `fields` module"""
+
+    page: int
+    pages: int
+    items: list[StrDict]
+
+
+class RecommendationChanges(BaseModel):
+    items: list[RecommendationResponse]
+    # cursor for the next request
+    next_since: int
+    has_more: bool
+
+
 class RecommendationPageState(BaseModel):
     active_exists: bool
+
+
+class JourneySummary(BaseModel):
+    journey_id: int
+    total: int
+    counts: dict[RecommendationStatus, int]
+
+
+class RecommendationSummary(BaseModel):
+    total: int
+    # every status is present, zero if there are no recommendations in status
+    counts: dict[RecommendationStatus, int]
+    active_exists: bool
+    # only if grouping by journey is requested
+    journeys: list[JourneySummary] | None = None
+
+
+class DailyDecisions(BaseModel):
+    """Decisions on recommendations created in the day, see `rollups` module"""
+
+    day: date
+    type: str
+    total: int
+    counts: dict[RecommendationStatus, int]
+    accepts: int
+    rejects: int
+    # shares of recommendations created in the day, None without recommendations
+    acceptance_rate: float | None
+    rejection_rate: float | None
+    avg_decision_seconds: float | None
+    # number of decisions by time to decision: 1h, 1d, 7d and later
+    decision_buckets: dict[str, int]
+
+
+class DecisionAnalytics(BaseModel):
+    items: list[DailyDecisions]
+
+
+class RecommendationLookup(BaseModel):
+    # ids of recommendations, the newest first
+    ids: list[int]
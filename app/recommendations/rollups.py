@@ -0,0 +1,75 @@
+"""
+Daily rollups of decisions: counters of recommendations per account, day of
+creation and type. Counters are changed by deltas between previous and new
+state of recommendation in the same transaction, so rollup is always equal
+to the aggregate over `recommendations`, which is used to rebuild it.
+"""
+from collections import defaultdict
+from datetime import date
+from typing import Iterable
+
+from app.recommendations.enums import RecommendationStatus
+from app.recommendations.models import Recommendation
+
+RollupKey = tuple[int, date, str]
+Counters = dict[str, int]
+
+# histogram of time to decision, the last bucket is unbounded
+DECISION_BUCKETS = (
+    ("decisions_1h", 60 * 60),
+    ("decisions_1d", 24 * 60 * 60),
+    ("decisions_7d", 7 * 24 * 60 * 60),
+)
+DECISIONS_LATER = "decisions_later"
+
+STATUS_COUNTERS = {status: f"{status.value.lower()}_count" for status in RecommendationStatus}
+COUNTERS = (
+    *STATUS_COUNTERS.values(),
+    "accepts",
+    "rejects",
+    "decision_seconds",
+    *(name for name, _ in DECISION_BUCKETS),
+    DECISIONS_LATER,
+)
+
+
+def get_decision_bucket(seconds: int) -> str:
+    for name, upper_bound in DECISION_BUCKETS:
+        if seconds < upper_bound:
+            return name
+    return DECISIONS_LATER
+
+
+def get_rollup_key(recommendation: Recommendation) -> RollupKey:
+    return recommendation.account_id, recommendation.creation_date.date(), recommendation.type
+
+
+def get_counters(recommendation: Recommendation) -> Counters:
+    """Contribution of recommendation to its rollup"""
+    counters = {STATUS_COUNTERS[recommendation.status]: 1}
+    if recommendation.decision_time is not None:
+        # decision can't be made before creation, clock skew is ignored
+        seconds = max(int((recommendation.decision_time - recommendation.creation_date).total_seconds()), 0)
+        decision = "rejects" if recommendation.status == RecommendationStatus.REJECTED else "accepts"
+        counters[decision] = 1
+        counters["decision_seconds"] = seconds
+        counters[get_decision_bucket(seconds)] = 1
+    return counters
+
+
+def get_rollup_deltas(
+    changes: Iterable[tuple[Recommendation | None, Recommendation | None]],
+) -> dict[RollupKey, Counters]:
+    """Deltas of rollups by changes of recommendations: pairs of previous and new state"""
+    deltas: defaultdict[RollupKey, Counters] = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    for previous, current in changes:
+        if previous is not None:
+            delta = deltas[get_rollup_key(previous)]
+            for name, value in get_counters(previous).items():
+                delta[name] -= value
+        if current is not None:
+            delta = deltas[get_rollup_key(current)]
+            for name, value in get_counters(current).items():
+                delta[name] += value
+
+    return {key: delta for key, delta in deltas.items() if any(delta.values())}
@@ -1,11 +1,21 @@
 import logging
-from datetime import date, datetime
-from typing import DefaultDict
+from datetime import date, datetime, timedelta
+from typing import Any, DefaultDict
 
 from app.auth.types import User
-from app.errors import DoesNotExistsError
-from app.recommendations import db
-from app.recommendations.enums import RecommendationPageSortBy, RecommendationStatus
+from app.config import config
+from app.errors import DoesNotExistsError, MissingFiltersError
+from app.recommendations import db, events, rollups, states
+from app.recommendations.enums import (
+    RecommendationPageSortBy,
+    RecommendationStatus,
+    RecommendationType,
+)
+from app.recommendations.fields import (
+    PLATFORM_STATUSES,
+    RECOMMENDATION_FIELDS,
+    is_sparse,
+)
 from app.recommendations.models import (
     GoalUpdate,
     GoalUpdateInput,
@@ -15,11 +25,21 @@ from app.recommendations.models import (
     RecommendationInput,
 )
 from app.recommendations.responses import (
+    DailyDecisions,
+    DecisionAnalytics,
+    JourneySummary,
+    RecommendationChanges,
+    RecommendationLookup,
     RecommendationPage,
     RecommendationPageState,
     RecommendationResponse,
+    RecommendationSummary,
+    SparseRecommendationPage,
 )
-from app.utils import count_total_pages, group_by
+from app.recommendations.states import PlatformState
+from app.singleflight import single_flight
+from app.types import StrDict
+from app.utils import count_total_pages, group_by, make_etag
 
 logger = logging.getLogger(__name__)
 
@@ -83,6 +103,15 @@ def prepare_recommendation_response(
     return responses[0]
 
 
+def get_recommendations_responses(ids_: list[int]) -> list[RecommendationResponse]:
+    """Get recommendations enriched by platform statuses using one query"""
+    rows = db.select_recommendations_with_platform_statuses(ids_=ids_)
+    return [
+        RecommendationResponse(**recommendation.dict(), platform_statuses=statuses) for recommendation, statuses in rows
+    ]
+
+
+@single_flight
 def get_recommendation_page(
     account_id: int,
     journey_id: int | None,
@@ -92,31 +121,63 @@ def get_recommendation_page(
     date_from: date | None,
     date_to: date | None,
     sort_by: RecommendationPageSortBy,
-) -> RecommendationPage:
-    """Get recommendations list with pagination"""
+    platforms_state: PlatformState | None = None,
+    q: str | None = None,
+    fields: tuple[str, ...] | None = None,
+    include: tuple[str, ...] | None = None,
+    version: int | None = None,
+) -> RecommendationPage | SparseRecommendationPage:
+    """
+    Get recommendations list with pagination. Concurrent calls with the same
+    arguments share the result, pass version of account to not share it
+    between different versions.
+    """
     offset = (page_num - 1) * page_size
 
-    # get list of recommendations
-    recommendations = db.select_recommendation_list(
+    # get total count
+    total_count = db.select_recommendation_count(
         account_id=account_id,
         journey_id=journey_id,
         date_from=date_from,
         date_to=date_to,
         status=status,
-        offset=offset,
-        limit=page_size,
-        sort_by=sort_by,
+        platforms_state=platforms_state,
+        q=q,
     )
+    pages = count_total_pages(page_size=page_size, total_count=total_count)
 
-    # get total count
-    total_count = db.select_recommendation_count(
+    if is_sparse(fields=fields, include=include):
+        # get only requested columns of recommendations
+        rows = db.select_recommendation_list_fields(
+            fields=fields or RECOMMENDATION_FIELDS,
+            account_id=account_id,
+            journey_id=journey_id,
+            date_from=date_from,
+            date_to=date_to,
+            status=status,
+            offset=offset,
+            limit=page_size,
+            sort_by=sort_by,
+            platforms_state=platforms_state,
+            q=q,
+        )
+        if include and PLATFORM_STATUSES in include:
+            add_platform_statuses(rows)
+        return SparseRecommendationPage(page=page_num, pages=pages, items=rows)
+
+    # get list of recommendations
+    recommendations = db.select_recommendation_list(
         account_id=account_id,
         journey_id=journey_id,
         date_from=date_from,
         date_to=date_to,
         status=status,
+        offset=offset,
+        limit=page_size,
+        sort_by=sort_by,
+        platforms_state=platforms_state,
+        q=q,
     )
-    pages = count_total_pages(page_size=page_size, total_count=total_count)
 
     items = prepare_recommendations_responses(recommendations)
     return RecommendationPage(
@@ -126,9 +187,118 @@ def get_recommendation_page(
     )
 
 
+@single_flight
+def render_recommendation_page(
+    account_id: int,
+    journey_id: int | None,
+    page_num: int,
+    page_size: int,
+    status: RecommendationStatus | None,
+    date_from: date | None,
+    date_to: date | None,
+    sort_by: RecommendationPageSortBy,
+    platforms_state: PlatformState | None = None,
+    q: str | None = None,
+    version: int | None = None,
+) -> str:
+    """The same page as `get_recommendation_page`, but rendered to JSON by database"""
+    return db.select_recommendation_page_json(
+        account_id=account_id,
+        journey_id=journey_id,
+        date_from=date_from,
+        date_to=date_to,
+        status=status,
+        page_num=page_num,
+        page_size=page_size,
+        sort_by=sort_by,
+        platforms_state=platforms_state,
+        q=q,
+    )
+
+
+def add_platform_statuses(items: list[StrDict]) -> None:
+    """Enrich sparse recommendations by platform statuses"""
+    statuses = get_platform_statuses(recommendations_ids=[item["id"] for item in items]) if items else []
+
+    statuses_map: DefaultDict[int, list[PlatformStatus]]
+    statuses_map = group_by(statuses, lambda s: s.recommendation_id)
+
+    for item in items:
+        item[PLATFORM_STATUSES] = [status.dict() for status in statuses_map[item["id"]]]
+
+
+def get_sparse_recommendation(
+    recommendation: Recommendation,
+    fields: tuple[str, ...] | None,
+    include: tuple[str, ...] | None,
+) -> StrDict:
+    item = recommendation.dict(include=set(fields or RECOMMENDATION_FIELDS))
+    if include and PLATFORM_STATUSES in include:
+        add_platform_statuses([item])
+    return item
+
+
+def get_account_version(account_id: int) -> int:
+    """
+    Every change of recommendations bumps version of account, so pages of
+    account are the same while the version is the same
+    """
+    return db.select_account_version(account_id=account_id)
+
+
+def get_recommendation_page_etag(account_id: int, version: int, **filters: Any) -> str:
+    return make_etag(account_id, version, filters)
+
+
+def get_recommendation_etag(
+    recommendation: Recommendation,
+    fields: tuple[str, ...] | None = None,
+    include: tuple[str, ...] | None = None,
+) -> str:
+    """Sparse and full representations of recommendation have different tags"""
+    return make_etag(recommendation.id, recommendation.change_seq, {"fields": fields, "include": include})
+
+
+def get_recommendation_changes(account_id: int, since: int, limit: int) -> RecommendationChanges:
+    """Get recommendations changed after given sequence number with their platform statuses"""
+    # one extra row to find out if there are more changes
+    recommendations = db.select_recommendation_changes(account_id=account_id, since=since, limit=limit + 1)
+    has_more = len(recommendations) > limit
+    recommendations = recommendations[:limit]
+
+    return RecommendationChanges(
+        items=prepare_recommendations_responses(recommendations) if recommendations else [],
+        next_since=recommendations[-1].change_seq if recommendations else since,
+        has_more=has_more,
+    )
+
+
+def lookup_recommendations(
+    account_id: int,
+    object_id: str | None,
+    object_type: str | None,
+    taxonomy_key: str | None,
+    limit: int,
+) -> RecommendationLookup:
+    """Find recommendations by platform object or taxonomy key"""
+    if object_id is None and object_type is None and taxonomy_key is None:
+        raise MissingFiltersError(message="Provide object_id, object_type or taxonomy_key")
+
+    ids_ = db.select_recommendation_ids_by_lookup(
+        account_id=account_id,
+        object_id=object_id,
+        object_type=object_type,
+        taxonomy_key=taxonomy_key,
+        limit=limit,
+    )
+    return RecommendationLookup(ids=ids_)
+
+
+@single_flight
 def get_recommendation_page_state(
     account_id: int,
     journey_id: int | None,
+    version: int | None = None,
 ) -> RecommendationPageState:
     """Get recommendation state for account or journey"""
     active_exists = db.exists_active_recommendations(
@@ -138,6 +308,42 @@ def get_recommendation_page_state(
     return RecommendationPageState(active_exists=active_exists)
 
 
+def _count_by_status(rows: list[StrDict]) -> dict[RecommendationStatus, int]:
+    counts = dict.fromkeys(RecommendationStatus, 0)
+    for row in rows:
+        counts[RecommendationStatus(row["status"])] += row["count"]
+    return counts
+
+
+@single_flight
+def get_recommendation_summary(
+    account_id: int,
+    journey_id: int | None,
+    by_journey: bool = False,
+    version: int | None = None,
+) -> RecommendationSummary:
+    """Get counts of recommendations by status for account or journey"""
+    rows = db.select_recommendation_status_counts(
+        account_id=account_id,
+        journey_id=journey_id,
+        by_journey=by_journey,
+    )
+    counts = _count_by_status(rows)
+    summary = RecommendationSummary(
+        total=sum(counts.values()),
+        counts=counts,
+        active_exists=counts[RecommendationStatus.ACTIVE] > 0,
+    )
+    if by_journey:
+        summary.journeys = []
+        for journey_id_, journey_rows in sorted(group_by(rows, key=lambda row: row["journey_id"]).items()):
+            journey_counts = _count_by_status(journey_rows)
+            summary.journeys.append(
+                JourneySummary(journey_id=journey_id_, total=sum(journey_counts.values()), counts=journey_counts)
+            )
+    return summary
+
+
 def get_user_recommendation(id_: int, user: User) -> Recommendation:
     """Get recommendation and check access"""
 
@@ -182,12 +388,17 @@ def accept_recommendation(*, id_: int, user: User) -> Recommendation:
     ):
         return recommendation
 
+    # account is locked, so recommendation can't be archived concurrently
+    db.bump_account_version(account_id=recommendation.account_id)
+    previous = recommendation
     recommendation = db.update_recommendation_decision(
         recommendation_id=id_,
         status=RecommendationStatus.ACCEPTING,
         user_id=user.id,
         decision_time=datetime.now(),
     )
+    update_decision_rollups((previous, recommendation))
+    events.recommendation_changed(recommendation)
     return recommendation
 
 
@@ -207,6 +418,9 @@ def reject_recommendation(
     ):
         return recommendation
 
+    # account is locked, so recommendation can't be archived concurrently
+    db.bump_account_version(account_id=recommendation.account_id)
+    previous = recommendation
     recommendation = db.update_recommendation_decision(
         recommendation_id=id_,
         status=RecommendationStatus.REJECTED,
@@ -214,6 +428,8 @@ def reject_recommendation(
         decision_time=datetime.now(),
         reason=reason,
     )
+    update_decision_rollups((previous, recommendation))
+    events.recommendation_changed(recommendation)
     return recommendation
 
 
@@ -223,7 +439,46 @@ def consume_platform_status(status_input: PlatformStatusInput) -> None:
     on platform statuses
     """
 
-    db.insert_platform_status(status_input)
+    status = db.insert_platform_status(status_input)
+    if status is None:
+        # platforms resend the same statuses, nothing is changed by them
+        logger.debug(f"Skip repeated platform status: {status_input.id}, {status_input.platform}")
+        return
+    update_platforms_state(status)
+    events.platform_status_changed(status)
+
+
+def update_platforms_state(status: PlatformStatus) -> None:
+    """
+    Update summary of platforms and status of recommendation by new platform
+    status. History of statuses is not read, only the summary is needed.
+    """
+    # version of account is locked, so recommendation can't be changed concurrently
+    if db.bump_recommendation_account_version(recommendation_id=status.recommendation_id) is None:
+        logger.warning(f"Platform status for unknown recommendation: {status.recommendation_id}")
+        return
+
+    platform_state = status.state
+    if platform_state is None:
+        db.touch_recommendation(recommendation_id=status.recommendation_id)
+        return
+
+    recommendation = get_recommendation(id_=status.recommendation_id)
+
+    summary = {**recommendation.platforms_summary, status.platform: platform_state}
+    platforms_state = states.get_platforms_state(summary)
+    updated = db.update_recommendation_platforms_state(
+        recommendation_id=recommendation.id,
+        status=states.get_recommendation_status(
+            recommendation.status,
+            platforms_state,
+            previous_platforms_state=recommendation.platforms_state,
+        ),
+        platforms_summary=summary,
+        platforms_state=platforms_state,
+    )
+    if updated.status != recommendation.status:
+        update_decision_rollups((recommendation, updated))
 
 
 def consume_goal_update(update: GoalUpdateInput) -> GoalUpdate:
@@ -264,12 +519,155 @@ def consume_recommendation(recommendation: RecommendationInput) -> None:
         return None
 
     with db.begin():
+        db.bump_account_version(account_id=recommendation.account_id)
 
         # expire all previous recommendations
-        db.expire_recommendations(
+        expired = db.expire_recommendations(
+            account_id=recommendation.account_id,
+            journey_id=recommendation.journey_id,
+        )
+        events.recommendations_expired(
             account_id=recommendation.account_id,
             journey_id=recommendation.journey_id,
         )
 
         # insert new recommendation
         _recommendation = db.insert_recommendation(recommendation=recommendation)
+        events.recommendation_changed(_recommendation)
+
+        update_decision_rollups(
+            (None, _recommendation),
+            *((previous, previous.copy(update={"status": RecommendationStatus.EXPIRED})) for previous in expired),
+        )
+
+
+def update_decision_rollups(*changes: tuple[Recommendation | None, Recommendation | None]) -> None:
+    """Apply changes of recommendations (previous and new state) to daily rollups of decisions"""
+    db.update_decision_rollups(rollups.get_rollup_deltas(changes))
+
+
+def rebuild_decision_rollups(account_id: int | None = None) -> int:
+    return db.rebuild_decision_rollups(account_id=account_id)
+
+
+def get_decision_analytics(
+    account_id: int,
+    date_from: date | None,
+    date_to: date | None,
+    type_: RecommendationType | None,
+) -> DecisionAnalytics:
+    """Get daily decisions of account, only rollups are read"""
+    rows = db.select_decision_rollups(account_id=account_id, date_from=date_from, date_to=date_to, type_=type_)
+
+    buckets = [name for name, _ in rollups.DECISION_BUCKETS] + [rollups.DECISIONS_LATER]
+    items = []
+    for row in rows:
+        counts = {status: row[name] for status, name in rollups.STATUS_COUNTERS.items()}
+        total = sum(counts.values())
+        decisions = row["accepts"] + row["rejects"]
+        items.append(
+            DailyDecisions(
+                day=row["day"],
+                type=row["type"],
+                total=total,
+                counts=counts,
+                accepts=row["accepts"],
+                rejects=row["rejects"],
+                acceptance_rate=row["accepts"] / total if total else None,
+                rejection_rate=row["rejects"] / total if total else None,
+                avg_decision_seconds=row["decision_seconds"] / decisions if decisions else None,
+                decision_buckets={name.removeprefix("decisions_"): row[name] for name in buckets},
+            )
+        )
+    return DecisionAnalytics(items=items)
+
+
+def archive_recommendations(batch_size: int | None = None, max_batches: int | None = None) -> tuple[int, int]:
+    """
+    Move old expired and decided recommendations with their platform statuses
+    to archive, every batch in own transaction. Returns numbers of moved rows.
+    """
+    before = db.get_archive_horizon()
+    batch_size = batch_size or config.ARCHIVE_BATCH_SIZE
+    with db.begin():
+        db.insert_missing_account_versions(before=before)
+
+    recommendations_count = statuses_count = batches = 0
+    while max_batches is None or batches < max_batches:
+        with db.begin():
+            moved, moved_statuses = db.archive_recommendations(before=before, batch_size=batch_size)
+        recommendations_count += moved
+        statuses_count += moved_statuses
+        batches += 1
+        # the rest is archived by the next run, if batch was not full because of locks
+        if moved < batch_size:
+            break
+
+    logger.info(f"Archived {recommendations_count} recommendations and {statuses_count} platform statuses")
+    return recommendations_count, statuses_count
+
+
+def _create_partitions(table: str, table_partitions: list[StrDict], max_id: int) -> list[str]:
+    if not table_partitions:
+        raise ValueError(f"Table {table} has no partitions, apply migrations first")
+
+    size = config.PLATFORM_STATUSES_PARTITION_SIZE
+    created = []
+    upper = table_partitions[-1]["upper"]
+    # partition unbounded from above already covers new recommendations
+    while upper is not None and upper <= max_id + size * config.PLATFORM_STATUSES_PARTITIONS_AHEAD:
+        with db.begin():
+            name = db.create_partition(table, lower=upper, upper=upper + size)
+        if name is not None:
+            created.append(name)
+        upper += size
+    return created
+
+
+def create_partitions(max_id: int) -> list[str]:
+    """
+    Create partitions of platform statuses for recommendations up to given id
+    and ahead of them, e.g. before loading of recommendations not inserted yet
+    """
+    with db.begin():
+        partitions = {table: db.select_partitions(table) for table in db.PARTITIONED_TABLES}
+
+    created = []
+    for table, table_partitions in partitions.items():
+        created.extend(_create_partitions(table, table_partitions=table_partitions, max_id=max_id))
+    return created
+
+
+def maintain_partitions() -> tuple[list[str], list[str]]:
+    """
+    Create partitions of platform statuses ahead of new recommendations and
+    drop partitions of recommendations older than retention. Returns names
+    of created and dropped partitions, every change is made in own transaction.
+    """
+    retention_days = config.PLATFORM_STATUSES_RETENTION_DAYS
+    expires_before = datetime.utcnow() - timedelta(days=retention_days) if retention_days is not None else None
+
+    created: list[str] = []
+    dropped: list[str] = []
+    with db.begin():
+        max_id = db.select_max_recommendation_id()
+        partitions = {table: db.select_partitions(table) for table in db.PARTITIONED_TABLES}
+
+    for table, table_partitions in partitions.items():
+        created.extend(_create_partitions(table, table_partitions=table_partitions, max_id=max_id))
+
+        if expires_before is None:
+            continue
+        # only completed ranges, ids of recommendations grow with creation date
+        for partition in table_partitions:
+            if partition["upper"] is None or partition["upper"] > max_id:
+                break
+            with db.begin():
+                last_creation_date = db.select_last_creation_date(before_id=partition["upper"])
+                if last_creation_date is None or last_creation_date >= expires_before:
+                    break
+                db.drop_partition(partition["name"])
+            dropped.append(partition["name"])
+
+    logger.info(f"Partitions of platform statuses are created: {created}, dropped: {dropped}")
+    return created, dropped
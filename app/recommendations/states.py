@@ -0,0 +1,50 @@
+"""
+State of recommendation on platforms. Consumer keeps the latest state of
+every platform in compact summary of recommendation, so the overall state
+is derived incrementally from a new platform status and the summary
+without reading history of statuses.
+"""
+from enum import Enum
+
+from app.recommendations.enums import RecommendationStatus
+
+
+class PlatformState(str, Enum):
+    pending = "pending"
+    applied = "applied"
+    partial = "partial"
+    error = "error"
+
+
+def get_platforms_state(summary: dict[str, PlatformState]) -> PlatformState | None:
+    """Overall state of recommendation from the latest states of platforms"""
+    states = set(summary.values())
+    if not states:
+        return None
+    if PlatformState.pending in states:
+        return PlatformState.pending
+    if states == {PlatformState.applied}:
+        return PlatformState.applied
+    if states == {PlatformState.error}:
+        return PlatformState.error
+    return PlatformState.partial
+
+
+def get_recommendation_status(
+    status: RecommendationStatus,
+    platforms_state: PlatformState | None,
+    previous_platforms_state: PlatformState | None = None,
+) -> RecommendationStatus:
+    """
+    Accepting recommendation and recommendation failed on platforms are moved
+    by the whole summary of platforms, so error of the first reported platform
+    is fixed by platforms reported later. Other statuses are kept.
+    """
+    failed_on_platforms = status == RecommendationStatus.ERROR and previous_platforms_state is not None
+    if status != RecommendationStatus.ACCEPTING and not failed_on_platforms:
+        return status
+    if platforms_state in (PlatformState.applied, PlatformState.partial):
+        return RecommendationStatus.ACCEPTED
+    if platforms_state == PlatformState.error:
+        return RecommendationStatus.ERROR
+    return RecommendationStatus.ACCEPTING
@@ -2,10 +2,13 @@ from sqlalchemy import (
     BigInteger,
     Boolean,
     Column,
+    Date,
     DateTime,
     Identity,
     Index,
     Integer,
+    Sequence,
+    Table,
     Text,
     desc,
 )
@@ -14,6 +17,9 @@ from sqlalchemy.dialects.postgresql import JSONB, UUID
 from app.db import Base
 from app.recommendations.enums import RecommendationStatus
 
+# sequence of changes of recommendations, shared by all accounts
+recommendation_change_seq = Sequence("recommendation_change_seq")
+
 
 class Recommendation(Base):
     __tablename__ = "recommendations"
@@ -25,6 +31,17 @@ class Recommendation(Base):
     enabled = Column(Boolean, nullable=False)
     account_id = Column(BigInteger, nullable=False)
     status = Column(Text, nullable=False)
+    # md5 of normalized taxonomy, see `Taxonomy`
+    taxonomy_hash = Column(Text, nullable=True)
+    platforms_summary = Column(JSONB, nullable=False, server_default="{}")
+    platforms_state = Column(Text, nullable=True)
+    # bumped on every change, see `AccountVersion`
+    change_seq = Column(
+        BigInteger,
+        recommendation_change_seq,
+        server_default=recommendation_change_seq.next_value(),
+        nullable=False,
+    )
 
     __table_args__ = (
         # index primary for pagination
@@ -44,11 +61,20 @@ class Recommendation(Base):
         ),
         # index to expire previous active recommendations
         Index("ix_recommendations_account_id_status", account_id, status),
+        # index to filter recommendations by state on platforms
+        Index("ix_recommendations_account_id_platforms_state", account_id, platforms_state),
+        # index to select changes of account
+        Index("ix_recommendations_account_id_change_seq", account_id, change_seq),
+        # index to lookup recommendations by taxonomy
+        Index("ix_recommendations_account_id_taxonomy_hash", account_id, taxonomy_hash),
     )
 
 
 class PlatformStatus(Base):
-    """Table in which we store platform status"""
+    """
+    Table in which we store platform status. It's partitioned by ranges of
+    recommendation id, so there is no primary key in database.
+    """
 
     __tablename__ = "platform_statuses"
 
@@ -56,6 +82,71 @@ class PlatformStatus(Base):
     recommendation_id = Column(BigInteger, nullable=False, index=True)
     platform = Column(Text, nullable=False)
     data = Column(JSONB, nullable=False)
+    # md5 of normalized data, repeated data of platform is not inserted
+    data_hash = Column(Text, nullable=True)
+
+    __table_args__ = (
+        # index to lookup statuses by platform object, only containment `@>` is supported
+        Index("ix_platform_statuses_data", data, postgresql_using="gin", postgresql_ops={"data": "jsonb_path_ops"}),
+    )
+
+
+class Taxonomy(Base):
+    """
+    Taxonomies of recommendations stored once by hash of content, recommendations
+    of the same journey usually have the same taxonomy
+    """
+
+    __tablename__ = "taxonomies"
+
+    hash = Column(Text, primary_key=True)
+    data = Column(JSONB, nullable=False)
+
+    __table_args__ = (
+        # index to lookup taxonomies by key or containment
+        Index("ix_taxonomies_data", data, postgresql_using="gin"),
+    )
+
+
+def _archive_table(table: Table, name: str) -> Table:
+    """Table with the same columns for archived rows, defaults are not needed, rows are moved as is"""
+    columns = [
+        Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable, autoincrement=False)
+        for c in table.columns
+    ]
+    return Table(name, Base.metadata, *columns)
+
+
+# expired and decided recommendations moved by archival job with their
+# platform statuses, so indexes of hot tables contain recent rows only
+recommendations_archive = _archive_table(Recommendation.__table__, "recommendations_archive")
+Index(
+    "ix_recommendations_archive_account_id_order",
+    recommendations_archive.c.account_id,
+    desc(recommendations_archive.c.status == RecommendationStatus.ACTIVE.value),
+    desc(recommendations_archive.c.creation_date),
+    desc(recommendations_archive.c.id),
+)
+Index(
+    "ix_recommendations_archive_account_id_date_order",
+    recommendations_archive.c.account_id,
+    desc(recommendations_archive.c.creation_date),
+    desc(recommendations_archive.c.id),
+)
+Index(
+    "ix_recommendations_archive_account_id_taxonomy_hash",
+    recommendations_archive.c.account_id,
+    recommendations_archive.c.taxonomy_hash,
+)
+
+platform_statuses_archive = _archive_table(PlatformStatus.__table__, "platform_statuses_archive")
+Index("ix_platform_statuses_archive_recommendation_id", platform_statuses_archive.c.recommendation_id)
+Index(
+    "ix_platform_statuses_archive_data",
+    platform_statuses_archive.c.data,
+    postgresql_using="gin",
+    postgresql_ops={"data": "jsonb_path_ops"},
+)
 
 
 class GoalUpdate(Base):
@@ -66,3 +157,41 @@ class GoalUpdate(Base):
     id = Column(BigInteger, Identity(), primary_key=True)
     journey_id = Column(BigInteger, nullable=False)
     updated_at = Column(DateTime, nullable=False)
+
+
+class AccountVersion(Base):
+    """
+    Version of account, bumped by every change of its recommendations. Row is
+    locked until the end of transaction, so changes of one account are
+    committed in order of their sequence numbers.
+    """
+
+    __tablename__ = "account_versions"
+
+    account_id = Column(BigInteger, primary_key=True, autoincrement=False)
+    version = Column(BigInteger, nullable=False)
+
+
+class DecisionRollup(Base):
+    """Daily counters of recommendations by day of creation, see `rollups` module"""
+
+    __tablename__ = "decision_rollups"
+
+    account_id = Column(BigInteger, primary_key=True, autoincrement=False)
+    day = Column(Date, primary_key=True)
+    type = Column(Text, primary_key=True)
+    # number of recommendations in every status
+    active_count = Column(Integer, nullable=False, server_default="0")
+    accepting_count = Column(Integer, nullable=False, server_default="0")
+    accepted_count = Column(Integer, nullable=False, server_default="0")
+    rejected_count = Column(Integer, nullable=False, server_default="0")
+    expired_count = Column(Integer, nullable=False, server_default="0")
+    error_count = Column(Integer, nullable=False, server_default="0")
+    # decided recommendations and time from creation to decision
+    accepts = Column(Integer, nullable=False, server_default="0")
+    rejects = Column(Integer, nullable=False, server_default="0")
+    decision_seconds = Column(BigInteger, nullable=False, server_default="0")
+    decisions_1h = Column(Integer, nullable=False, server_default="0")
+    decisions_1d = Column(Integer, nullable=False, server_default="0")
+    decisions_7d = Column(Integer, nullable=False, server_default="0")
+    decisions_later = Column(Integer, nullable=False, server_default="0")
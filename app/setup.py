@@ -1,16 +1,27 @@
 import logging
 from contextlib import contextmanager, suppress
+from pathlib import Path
 from typing import Iterator
 
 from fastapi import FastAPI
 from fastapi.requests import Request
 from fastapi.responses import JSONResponse, Response
 
+from app import db
+from app.auth import services as authentication_services
 from app.auth.services import authentication
+from app.config import config
 from app.errors import BaseError
 from app.health import handlers as health
+from app.health.services import health as health_service
+from app.instrumentation import instrument_request, setup_query_counter
+from app.internal import handlers as internal
 from app.producer.services import producer
+from app.recommendations import events as recommendations_events
 from app.recommendations import handlers as recommendations
+from app.recommendations.cache import page_cache
+from app.types import StrDict
+from app.utils import from_json
 
 
 def setup_logging() -> None:
@@ -30,14 +41,34 @@ def setup_error_handler(app: FastAPI) -> None:
         )
 
 
+def setup_instrumentation(app: FastAPI) -> None:
+    setup_query_counter(db.engine)
+    app.middleware("http")(instrument_request)
+
+
 def setup_routes(app: FastAPI) -> None:
     app.include_router(health.router)
+    app.include_router(internal.router)
     app.include_router(recommendations.router)
 
 
 def setup_openapi(app: FastAPI) -> None:
-    # NOTE: Remove for public
-    schema = app.openapi()
+    """
+    Schema is built on the first request instead of startup. Precomputed schema
+    (see command `export-openapi`) is served when `OPENAPI_SCHEMA_FILE` exists.
+    """
+    build_schema = app.openapi
+
+    def openapi() -> StrDict:
+        if app.openapi_schema is None:
+            path = Path(config.OPENAPI_SCHEMA_FILE) if config.OPENAPI_SCHEMA_FILE else None
+            if path is not None and path.exists():
+                app.openapi_schema = from_json(path.read_text())
+            else:
+                app.openapi_schema = build_schema()
+        return app.openapi_schema
+
+    app.openapi = openapi  # type: ignore
 
 
 def start_services() -> None:
@@ -53,6 +84,17 @@ def stop_services() -> None:
         authentication.stop()
 
 
+def reset_after_fork() -> None:
+    """
+    Drop database connections and clients inherited from parent process,
+    child process has to open own ones instead of sharing sockets with parent
+    """
+    db.engine.dispose(close=False)
+    producer.reset()
+    authentication.reset()
+    authentication_services.get_company.cache_clear()
+
+
 @contextmanager
 def with_services() -> Iterator[None]:
     try:
@@ -66,6 +108,12 @@ def setup_events(app: FastAPI) -> None:
 
     # startup events
     app.add_event_handler("startup", start_services)
+    app.add_event_handler("startup", health_service.start)
+    app.add_event_handler("startup", recommendations_events.listener.start)
+    app.add_event_handler("startup", page_cache.start)
 
     # shutdown events
+    app.add_event_handler("shutdown", page_cache.stop)
+    app.add_event_handler("shutdown", recommendations_events.listener.stop)
+    app.add_event_handler("shutdown", health_service.stop)
     app.add_event_handler("shutdown", stop_services)
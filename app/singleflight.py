@@ -0,0 +1,84 @@
+"""
+Coalescing of identical concurrent calls: the first caller computes result,
+callers with the same arguments wait for it instead of computing it again.
+Result (or error) is shared for a short window after the call is finished.
+"""
+import functools
+import inspect
+import threading
+import time
+from typing import Any, Hashable
+
+from app.config import config
+from app.utils import AnyCallable
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        # value of `time.monotonic()` until result is shared
+        self.expires_at: float | None = None
+
+    def get(self) -> Any:
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def _purge(self, now: float) -> None:
+        expired = [key for key, call in self._calls.items() if call.expires_at is not None and call.expires_at <= now]
+        for key in expired:
+            del self._calls[key]
+
+    def do(self, key: Hashable, func: AnyCallable) -> Any:
+        with self._lock:
+            self._purge(now=time.monotonic())
+            call = self._calls.get(key)
+            if call is not None:
+                is_leader = False
+            else:
+                call = self._calls[key] = _Call()
+                is_leader = True
+
+        if not is_leader:
+            return call.get()
+
+        try:
+            call.result = func()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                call.expires_at = time.monotonic() + config.SINGLE_FLIGHT_WINDOW_SECONDS
+            call.done.set()
+        return call.result
+
+
+def single_flight(func: AnyCallable) -> AnyCallable:
+    """
+    Coalesce concurrent calls of function with the same arguments. Arguments
+    must be hashable and describe result completely (like version of data).
+    """
+    flight = SingleFlight()
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not config.SINGLE_FLIGHT_ENABLED:
+            return func(*args, **kwargs)
+
+        arguments = signature.bind(*args, **kwargs)
+        arguments.apply_defaults()
+        key = tuple(arguments.arguments.items())
+        return flight.do(key, functools.partial(func, *args, **kwargs))
+
+    return wrapper
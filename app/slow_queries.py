@@ -0,0 +1,205 @@
+"""
+Detector of slow SQL statements. Statements slower than threshold are logged
+with normalized parameters and the calling function, aggregated by
+fingerprint and sampled for `EXPLAIN` in background thread.
+"""
+import logging
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import config
+from app.types import StrDict
+
+logger = logging.getLogger(__name__)
+
+# execution option to skip statements of the detector itself
+SKIP_OPTION = "skip_slow_query_log"
+
+# modules that are never reported as callers of statements
+_SKIP_MODULES = ("app.db", "app.slow_queries", "app.instrumentation")
+
+_WHITESPACES_RE = re.compile(r"\s+")
+# expanded IN parameters: `%(id_1_1)s, %(id_1_2)s, ...`
+_PARAMS_LIST_RE = re.compile(r"%\((\w+?)_\d+\)s(?:\s*,\s*%\(\1_\d+\)s)+")
+
+
+def fingerprint(statement: str) -> str:
+    """Normalize statement, so statements different only by parameters are the same"""
+    statement = _WHITESPACES_RE.sub(" ", statement).strip()
+    return _PARAMS_LIST_RE.sub(r"%(\1_N)s", statement)
+
+
+def _normalize_value(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple, set)):
+        return f"<{type(value).__name__} of {len(value)} items>"
+    value = str(value)
+    return value if len(value) <= 100 else f"{value[:100]}..."
+
+
+def normalize_parameters(parameters: Any) -> Any:
+    if isinstance(parameters, dict):
+        return {key: _normalize_value(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return f"<{len(parameters)} parameter sets>"
+    return _normalize_value(parameters)
+
+
+def find_caller() -> str | None:
+    """Find the closest service function (or any application function) in the call stack"""
+    frame = sys._getframe(1)
+    app_caller = None
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("app.") and module not in _SKIP_MODULES:
+            caller = f"{module}.{frame.f_code.co_name}"
+            if module.endswith(".services"):
+                return caller
+            app_caller = app_caller or caller
+        frame = frame.f_back
+    return app_caller
+
+
+class QueryStats:
+    def __init__(self, fingerprint: str) -> None:
+        self.fingerprint = fingerprint
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.callers: set[str] = set()
+        self.last_seen: datetime | None = None
+        self.last_parameters: Any = None
+        self.explain: Any = None
+        self.explained_at: float | None = None
+
+    def to_dict(self) -> StrDict:
+        return {
+            "fingerprint": self.fingerprint,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 2),
+            "mean_ms": round(self.total_ms / self.count, 2) if self.count else 0,
+            "max_ms": round(self.max_ms, 2),
+            "callers": sorted(self.callers),
+            "last_seen": self.last_seen,
+            "last_parameters": self.last_parameters,
+            "explain": self.explain,
+        }
+
+
+class SlowQueryLog:
+    def __init__(self) -> None:
+        self._stats: dict[str, QueryStats] = {}
+        self._lock = threading.Lock()
+        self._engine: Engine | None = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+
+    def setup(self, engine: Engine) -> None:
+        if config.SLOW_QUERY_THRESHOLD_MS is None or self._engine is not None:
+            return
+        self._engine = engine
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    @staticmethod
+    def _is_skipped(context: Any) -> bool:
+        return context is not None and context.execution_options.get(SKIP_OPTION, False)
+
+    def _before_cursor_execute(self, conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, *_) -> None:
+        # start is kept by context of statement, so failed statement doesn't leave it on pooled connection
+        if context is not None and not self._is_skipped(context):
+            context.slow_query_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, *_) -> None:
+        started = getattr(context, "slow_query_started", None)
+        if started is None:
+            return
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms >= config.SLOW_QUERY_THRESHOLD_MS:
+            self.record(statement=statement, parameters=parameters, duration_ms=duration_ms)
+
+    def record(self, statement: str, parameters: Any, duration_ms: float) -> None:
+        key = fingerprint(statement)
+        caller = find_caller()
+        normalized = normalize_parameters(parameters)
+
+        logger.warning(
+            msg=f"Slow query: {duration_ms:.2f} ms",
+            extra={
+                "slow_query": {
+                    "statement": key,
+                    "parameters": normalized,
+                    "duration_ms": round(duration_ms, 2),
+                    "caller": caller,
+                }
+            },
+        )
+
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= config.SLOW_QUERY_MAX_FINGERPRINTS:
+                    return
+                stats = self._stats[key] = QueryStats(fingerprint=key)
+
+            stats.count += 1
+            stats.total_ms += duration_ms
+            stats.max_ms = max(stats.max_ms, duration_ms)
+            stats.last_seen = datetime.utcnow()
+            stats.last_parameters = normalized
+            if caller:
+                stats.callers.add(caller)
+
+            now = time.monotonic()
+            need_explain = (
+                statement.lstrip().upper().startswith("SELECT")
+                and not isinstance(parameters, (list, tuple))
+                and (
+                    stats.explained_at is None or now - stats.explained_at > config.SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS
+                )
+            )
+            if need_explain:
+                stats.explained_at = now
+
+        if need_explain:
+            self._executor.submit(self._explain, key, statement, parameters)
+
+    def _explain(self, key: str, statement: str, parameters: Any) -> None:
+        if self._engine is None:
+            return
+        try:
+            with self._engine.connect() as connection:
+                result = connection.execution_options(**{SKIP_OPTION: True}).exec_driver_sql(
+                    f"EXPLAIN (FORMAT JSON) {statement}",
+                    parameters,
+                )
+                plan = result.scalar_one()
+        except Exception as exc:
+            logger.warning(msg="Failed to explain slow query", extra={"error": repr(exc)})
+            return
+
+        with self._lock:
+            if stats := self._stats.get(key):
+                stats.explain = plan
+
+    def get_stats(self) -> list[StrDict]:
+        with self._lock:
+            stats = [item.to_dict() for item in self._stats.values()]
+        return sorted(stats, key=lambda item: item["total_ms"], reverse=True)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats = {}
+
+
+slow_query_log = SlowQueryLog()
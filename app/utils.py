@@ -1,4 +1,5 @@
 import decimal
+import hashlib
 import json
 import uuid
 from collections import defaultdict
@@ -61,5 +62,28 @@ def group_by(items: list, key: Callable) -> DefaultDict:
     return mapping
 
 
+def chunked(items: list, size: int) -> Iterator[list]:
+    """Split items into lists with at most `size` items"""
+    for start in range(0, len(items), size):
+        end = start + size
+        yield items[start:end]
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong entity tag from version data of response"""
+    digest = hashlib.blake2b(to_json(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def is_etag_matched(if_none_match: str | None, etag: str) -> bool:
+    """Check `If-None-Match` header, weak comparison is used for this header"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in tags
+
+
 def generate_uuid() -> str:
     return str(uuid.uuid4())
@@ -1,3 +1,15 @@
-from app.worker.tasks import test_task
+from app.worker.tasks import (
+    archive_recommendations,
+    enqueue_send_recommendations,
+    maintain_partitions,
+    send_recommendations,
+    test_task,
+)
 
-__all__ = ["test_task"]
+__all__ = [
+    "archive_recommendations",
+    "enqueue_send_recommendations",
+    "maintain_partitions",
+    "send_recommendations",
+    "test_task",
+]
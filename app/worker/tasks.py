@@ -1,6 +1,14 @@
 import logging
 
+from celery import Task
+
+from app import db
+from app.auth import services as auth
 from app.auth.clients import HTTPError
+from app.config import config
+from app.recommendations import services as recommendations
+from app.recommendations.responses import RecommendationResponse
+from app.utils import chunked, group_by
 from app.worker.worker import celery_app as app
 
 logger = logging.getLogger(__name__)
@@ -9,3 +17,60 @@ logger = logging.getLogger(__name__)
 @app.task(autoretry_for=(HTTPError,), retry_kwargs={"max_retries": 5})
 def test_task(recommendation_id: int) -> None:
     logger.info(f"Send recommendation {recommendation_id}")
+
+
+@app.task
+def archive_recommendations() -> None:
+    """Scheduled by celery beat, see `ARCHIVE_INTERVAL_SECONDS`"""
+    recommendations.archive_recommendations()
+
+
+@app.task
+def maintain_partitions() -> None:
+    """Scheduled by celery beat, see `PARTITIONS_INTERVAL_SECONDS`"""
+    recommendations.maintain_partitions()
+
+
+def _send_account_recommendations(account_id: int, items: list[RecommendationResponse]) -> None:
+    # users are fetched once for all recommendations of the account in the batch
+    users = auth.get_users(company_id=account_id)
+    for recommendation in items:
+        logger.info(f"Send recommendation {recommendation.id} to {len(users)} users")
+
+
+@app.task(bind=True, max_retries=5)
+def send_recommendations(self: Task, recommendation_ids: list[int]) -> None:
+    """
+    Send batch of recommendations. In case of HTTP error only recommendations
+    of the failed accounts are retried.
+    """
+    with db.connect():
+        items = recommendations.get_recommendations_responses(ids_=recommendation_ids)
+
+    failed_ids: list[int] = []
+    error: HTTPError | None = None
+    for account_id, account_items in group_by(items, lambda r: r.account_id).items():
+        try:
+            _send_account_recommendations(account_id=account_id, items=account_items)
+        except HTTPError as exc:
+            logger.warning(
+                msg="Failed to send recommendations",
+                extra={"account_id": account_id, "error": repr(exc)},
+            )
+            failed_ids.extend(item.id for item in account_items)
+            error = exc
+
+    if failed_ids:
+        raise self.retry(args=(failed_ids,), exc=error)
+
+
+def enqueue_send_recommendations(recommendation_ids: list[int], batch_size: int | None = None) -> int:
+    """
+    Split recommendations into batches and publish them using one broker
+    connection. Returns number of published tasks.
+    """
+    batches = list(chunked(recommendation_ids, size=batch_size or config.WORKER_BATCH_SIZE))
+    with app.producer_or_acquire() as producer:
+        for batch in batches:
+            send_recommendations.apply_async(args=(batch,), producer=producer)
+    return len(batches)
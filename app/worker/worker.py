@@ -8,6 +8,8 @@ from app.config import config
 
 @signals.worker_process_init.connect()
 def start_worker_process(*args: Any, **kwargs: Any) -> None:
+    # worker processes are forked from main process
+    setup.reset_after_fork()
     setup.start_services()
 
 
@@ -17,4 +19,20 @@ def stop_worker_process(*args: Any, **kwargs: Any) -> None:
 
 
 celery_app = Celery(main="recommendations", broker=config.REDIS_URL)
+celery_app.conf.update(
+    # tasks are processing batches of recommendations, so a worker process
+    # shouldn't reserve more messages than it can start right now
+    worker_prefetch_multiplier=config.WORKER_PREFETCH_MULTIPLIER,
+    worker_concurrency=config.WORKER_CONCURRENCY,
+    beat_schedule={
+        "archive-recommendations": {
+            "task": "app.worker.tasks.archive_recommendations",
+            "schedule": config.ARCHIVE_INTERVAL_SECONDS,
+        },
+        "maintain-partitions": {
+            "task": "app.worker.tasks.maintain_partitions",
+            "schedule": config.PARTITIONS_INTERVAL_SECONDS,
+        },
+    },
+)
 celery_app.autodiscover_tasks()
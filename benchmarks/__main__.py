@@ -0,0 +1,105 @@
+import json
+import platform
+from datetime import datetime
+from pathlib import Path
+
+import typer
+
+from app import setup
+from app.commands import seed as seed_data
+from app.config import config
+from app.utils import to_json
+from benchmarks import cases
+from benchmarks.timing import compare, measure
+
+typer_app = typer.Typer()
+
+
+@typer_app.command(name="run")
+def run(
+    sizes: str = typer.Option("10000,100000,1000000", help="Comma separated numbers of seeded recommendations"),
+    repeats: int = typer.Option(20, min=1),
+    page_size: int = typer.Option(100, min=1, max=100),
+    seed: int = typer.Option(42),
+    skip_seed: bool = typer.Option(False, help="Run benchmarks on current data of the database"),
+    output: Path = typer.Option(Path("benchmarks/results/latest.json")),
+) -> None:
+    """Seed local database with data of every size and measure hot paths"""
+
+    # seeding removes all data from database
+    if not skip_seed and config.ENVIRONMENT != "local":
+        typer.echo("Benchmarks with seeding can be run only on local environment")
+        raise typer.Exit(code=1)
+
+    results = {}
+    explains = {}
+    targets = ["current"] if skip_seed else [size.strip() for size in sizes.split(",")]
+    for target in targets:
+        if not skip_seed:
+            typer.echo(f"Seeding {target} recommendations...")
+            options = seed_data.SeedOptions(
+                seed=seed,
+                accounts=100,
+                journeys_per_account=20,
+                recommendations=int(target),
+                statuses_depth=5,
+                goal_updates=int(target) // 100,
+                days=365,
+                end_date=datetime(2022, 12, 1),
+            )
+            seed_data.seed(options=options, truncate=True)
+
+        context = cases.BenchmarkContext(page_size=page_size)
+
+        results[target] = {}
+        for name, func in cases.get_cases(context).items():
+            results[target][name] = measure(func, repeats=repeats)
+            typer.echo(f"[{target}] {name}: {results[target][name]['median_ms']} ms")
+
+        explains[target] = {name: cases.explain(query) for name, query in cases.get_explain_queries(context).items()}
+
+    report = {
+        "meta": {
+            "created_at": datetime.utcnow(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "seed": seed,
+            "repeats": repeats,
+            "page_size": page_size,
+        },
+        "results": results,
+        "explain": explains,
+    }
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(to_json(report))
+    typer.echo(f"Results are saved to {output}")
+
+
+@typer_app.command(name="compare")
+def compare_results(
+    baseline: Path = typer.Argument(..., exists=True),
+    current: Path = typer.Argument(Path("benchmarks/results/latest.json"), exists=True),
+    threshold: float = typer.Option(0.2, help="Allowed slowdown of median time, 0.2 is 20%"),
+) -> None:
+    """Compare results with baseline, exit with error code if any case is regressed"""
+
+    rows = compare(
+        baseline=json.loads(baseline.read_text()),
+        current=json.loads(current.read_text()),
+        threshold=threshold,
+    )
+
+    for row in rows:
+        mark = "REGRESSION" if row["regression"] else ""
+        typer.echo(
+            f"[{row['size']}] {row['case']}: {row['baseline_ms']} ms -> {row['current_ms']} ms "
+            f"({row['change']:+.1%}) {mark}"
+        )
+
+    if any(row["regression"] for row in rows):
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    setup.setup_logging()
+    typer_app()
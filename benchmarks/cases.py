@@ -0,0 +1,203 @@
+"""
+Benchmark cases of service and database hot paths. Every case is measured
+end to end and split to parts: SQL time, model construction and serialization.
+"""
+from typing import Any, Callable
+
+import sqlalchemy as sa
+
+from app import db
+from app.recommendations import db as recommendations_db
+from app.recommendations import models, services
+from app.recommendations.enums import RecommendationPageSortBy, RecommendationStatus
+from app.recommendations.responses import RecommendationPage
+from app.recommendations.tables import PlatformStatus, Recommendation, Taxonomy
+from app.types import StrDict
+from app.utils import generate_uuid, to_json
+
+# account and journey, that don't exist in seeded data, consumed recommendations
+# are inserted into them to not change data of other benchmarks
+CONSUME_ACCOUNT_ID = 1
+CONSUME_JOURNEY_ID = 1
+
+
+class BenchmarkContext:
+    """Parameters of benchmarked calls, selected from seeded data"""
+
+    def __init__(self, page_size: int) -> None:
+        self.page_size = page_size
+
+        with db.connect():
+            # the biggest account and journey are the slowest ones
+            account = db.select_one(
+                sa.select(Recommendation.account_id, sa.func.count().label("count"))
+                .group_by(Recommendation.account_id)
+                .order_by(sa.desc("count"))
+                .limit(1)
+            )
+            if account is None:
+                raise ValueError("Database is empty, seed data before running benchmarks")
+            self.account_id: int = account["account_id"]
+
+            journey = db.select_one(
+                sa.select(Recommendation.journey_id, sa.func.count().label("count"))
+                .where(Recommendation.account_id == self.account_id)
+                .group_by(Recommendation.journey_id)
+                .order_by(sa.desc("count"))
+                .limit(1)
+            )
+            self.journey_id: int = journey["journey_id"]
+
+            self.rows = db.select_all(self.list_query())
+            self.recommendations = [models.Recommendation.from_orm(row) for row in self.rows]
+            self.page = services.get_recommendation_page(**self.page_kwargs())
+            self.message = self._consume_message()
+
+    def list_query(self, journey_id: int | None = None, sort_by: Any = RecommendationPageSortBy.status_date) -> Any:
+        query = recommendations_db._get_recommendation_list_query(
+            account_id=self.account_id,
+            journey_id=journey_id,
+            date_from=None,
+            date_to=None,
+            status=None,
+        )
+        order_by = recommendations_db._get_recommendation_list_order_by(sort_by, columns=query.selected_columns)
+        return query.limit(self.page_size).offset(0).order_by(*order_by)
+
+    def count_query(self, journey_id: int | None = None) -> Any:
+        query = recommendations_db._get_recommendation_list_query(
+            account_id=self.account_id,
+            journey_id=journey_id,
+            date_from=None,
+            date_to=None,
+            status=None,
+        )
+        return query.with_only_columns(sa.func.count(Recommendation.id))
+
+    def statuses_query(self) -> Any:
+        ids = [recommendation.id for recommendation in self.recommendations]
+        return sa.select(PlatformStatus).where(PlatformStatus.recommendation_id.in_(ids))
+
+    def page_kwargs(self, journey_id: int | None = None) -> StrDict:
+        return {
+            "account_id": self.account_id,
+            "journey_id": journey_id,
+            "page_num": 1,
+            "page_size": self.page_size,
+            "status": None,
+            "date_from": None,
+            "date_to": None,
+            "sort_by": RecommendationPageSortBy.status_date,
+        }
+
+    def _consume_message(self) -> StrDict:
+        recommendation = self.rows[0]
+        # taxonomies are stored once by hash, payload of message has the whole one
+        taxonomy = db.select_scalar(sa.select(Taxonomy.data).where(Taxonomy.hash == recommendation["taxonomy_hash"]))
+        return {
+            "uuid": recommendation["uuid"],
+            "account_id": CONSUME_ACCOUNT_ID,
+            "type": recommendation["type"],
+            "version": recommendation["version"],
+            "timestamp": int(recommendation["creation_date"].timestamp()),
+            "budget_info": {"currency": recommendation["currency"]},
+            "journey_id": CONSUME_JOURNEY_ID,
+            "media_plan_id": recommendation["media_plan_id"],
+            "journey_name": recommendation["journey_name"],
+            "taxonomy": taxonomy,
+        }
+
+
+def _get_page(context: BenchmarkContext, journey_id: int | None = None) -> Callable[[], Any]:
+    def func() -> Any:
+        with db.connect():
+            return services.get_recommendation_page(**context.page_kwargs(journey_id=journey_id))
+
+    return func
+
+
+def _select(query: Any) -> Callable[[], Any]:
+    def func() -> Any:
+        with db.connect():
+            return db.select_all(query)
+
+    return func
+
+
+def _prepare_responses(context: BenchmarkContext) -> Callable[[], Any]:
+    def func() -> Any:
+        with db.connect():
+            return services.prepare_recommendations_responses(context.recommendations)
+
+    return func
+
+
+def _consume_recommendation(context: BenchmarkContext) -> Callable[[], Any]:
+    def func() -> Any:
+        value = to_json({**context.message, "uuid": generate_uuid()})
+        recommendation = models.RecommendationInput.parse_raw(value)
+        with db.connect():
+            services.consume_recommendation(recommendation)
+
+    return func
+
+
+def get_cases(context: BenchmarkContext) -> dict[str, Callable[[], Any]]:
+    """Map of case name to function to measure"""
+    page_dict = context.page.dict()
+    return {
+        # end to end
+        "get_recommendation_page": _get_page(context),
+        "get_recommendation_page.journey": _get_page(context, journey_id=context.journey_id),
+        "prepare_recommendations_responses": _prepare_responses(context),
+        "consume_recommendation": _consume_recommendation(context),
+        # SQL time
+        "sql.recommendation_list": _select(context.list_query()),
+        "sql.recommendation_list.date": _select(context.list_query(sort_by=RecommendationPageSortBy.date)),
+        "sql.recommendation_count": _select(context.count_query()),
+        "sql.recommendation_count.journey": _select(context.count_query(journey_id=context.journey_id)),
+        "sql.platform_statuses": _select(context.statuses_query()),
+        # model construction
+        "models.recommendation_from_orm": lambda: [models.Recommendation.from_orm(row) for row in context.rows],
+        "models.recommendation_page": lambda: RecommendationPage(**page_dict),
+        # serialization
+        "serialization.page_json": context.page.json,
+        "serialization.to_json": lambda: to_json(page_dict),
+    }
+
+
+def get_explain_queries(context: BenchmarkContext) -> dict[str, Any]:
+    """Main queries to capture execution plans"""
+    active_filters = [
+        Recommendation.account_id == context.account_id,
+        Recommendation.status == RecommendationStatus.ACTIVE,
+    ]
+    return {
+        "recommendation_list": context.list_query(),
+        "recommendation_list.date": context.list_query(sort_by=RecommendationPageSortBy.date),
+        "recommendation_list.journey": context.list_query(journey_id=context.journey_id),
+        "recommendation_count": context.count_query(),
+        "platform_statuses": context.statuses_query(),
+        "exists_active_recommendations": sa.select(sa.exists().where(*active_filters)),
+    }
+
+
+def explain(query: Any) -> StrDict:
+    """Execute query with `EXPLAIN (ANALYZE, BUFFERS)` and return summary with plan"""
+
+    compiled = query.compile(dialect=db.engine.dialect, compile_kwargs={"render_postcompile": True})
+    with db.connect() as connection:
+        result = connection.exec_driver_sql(
+            f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {compiled}",
+            compiled.params,
+        )
+        explained = result.scalar_one()[0]
+
+    plan = explained["Plan"]
+    return {
+        "planning_ms": explained.get("Planning Time"),
+        "execution_ms": explained.get("Execution Time"),
+        "shared_hit_blocks": plan.get("Shared Hit Blocks"),
+        "shared_read_blocks": plan.get("Shared Read Blocks"),
+        "plan": plan,
+    }
@@ -0,0 +1,136 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+import httpx
+import sqlalchemy as sa
+import typer
+
+from app import db
+from app.auth.utils import create_jwt_token
+from app.recommendations.tables import Recommendation
+from app.utils import to_json
+from benchmarks.loadtest.runner import LoadTest, parse_mix
+from benchmarks.loadtest.server import start_authentication_stub
+
+typer_app = typer.Typer()
+
+
+def _select_account_id() -> int:
+    """Select account with the biggest number of recommendations"""
+    with db.connect():
+        row = db.select_one(
+            sa.select(Recommendation.account_id, sa.func.count().label("count"))
+            .group_by(Recommendation.account_id)
+            .order_by(sa.desc("count"))
+            .limit(1)
+        )
+    if row is None:
+        raise typer.BadParameter("Database is empty, use `python -m app.commands seed-data` to fill it")
+    return row["account_id"]
+
+
+def _select_ids(account_id: int, column: sa.Column, limit: int = 1000) -> list[int]:
+    with db.connect():
+        rows = db.select_all(
+            sa.select(column)
+            .where(Recommendation.account_id == account_id)
+            .distinct()
+            .order_by(sa.desc(column))
+            .limit(limit)
+        )
+    return [row[0] for row in rows]
+
+
+def _wait_for_server(base_url: str, timeout_seconds: float = 30) -> None:
+    deadline = time.monotonic() + timeout_seconds
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/livez").status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("Server didn't start")
+
+
+@typer_app.command()
+def run(
+    mix: str = typer.Option("list=40,list_state=20,detail=30,accept=5,reject=5", help="Endpoints with weights"),
+    concurrency: int = typer.Option(20, min=1),
+    duration: float = typer.Option(30, min=1, help="Duration of measuring in seconds"),
+    warmup: float = typer.Option(5, min=0, help="Duration of warmup in seconds"),
+    account_id: Optional[int] = typer.Option(None, help="By default account with the most recommendations is used"),
+    port: int = typer.Option(8019),
+    workers: int = typer.Option(1, min=1, help="Number of uvicorn workers"),
+    seed: int = typer.Option(42),
+    output: Optional[Path] = typer.Option(None, help="Save report to JSON file"),
+) -> None:
+    """Start service with uvicorn and measure throughput and latency of endpoints"""
+
+    weights = parse_mix(mix)
+    account_id = account_id or _select_account_id()
+    recommendations_ids = _select_ids(account_id, Recommendation.id)
+    journeys_ids = _select_ids(account_id, Recommendation.journey_id)
+
+    # `get_user` dependency decodes token signed by empty key
+    token = create_jwt_token(
+        payload={"id": 1, "company_id": account_id, "has_financial_access": True},
+        key="",
+    )
+
+    auth_stub = start_authentication_stub()
+    env = {
+        **os.environ,
+        "AUTHENTICATION_API_URL": f"http://127.0.0.1:{auth_stub.server_port}",
+    }
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "--factory",
+        "benchmarks.loadtest.server:create_app",
+        "--host=127.0.0.1",
+        f"--port={port}",
+        f"--workers={workers}",
+        "--log-level=warning",
+        "--no-access-log",
+    ]
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(command, env=env)
+    try:
+        _wait_for_server(base_url)
+        load_test = LoadTest(
+            base_url=base_url,
+            token=token,
+            mix=weights,
+            recommendations_ids=recommendations_ids,
+            journeys_ids=journeys_ids,
+            concurrency=concurrency,
+            duration_seconds=duration,
+            warmup_seconds=warmup,
+            seed=seed,
+        )
+        report = load_test.run()
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        auth_stub.shutdown()
+
+    typer.echo(f"Total: {report['requests']} requests, {report['rps']} req/s, {report['errors']} errors")
+    for endpoint, stats in report["endpoints"].items():
+        typer.echo(
+            f"{endpoint:<12} {stats['rps']:>9} req/s  p50 {stats['p50_ms']:>8} ms  "
+            f"p95 {stats['p95_ms']:>8} ms  p99 {stats['p99_ms']:>8} ms  errors {stats['errors']}"
+        )
+
+    if output:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(to_json(report))
+
+
+if __name__ == "__main__":
+    typer_app()
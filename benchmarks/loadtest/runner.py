@@ -0,0 +1,133 @@
+import asyncio
+import random
+import time
+from collections import defaultdict
+from typing import Any
+
+import httpx
+
+from app.config import config
+from app.types import StrDict
+
+ENDPOINTS = ("list", "list_state", "detail", "accept", "reject")
+
+
+def parse_mix(mix: str) -> dict[str, int]:
+    """Parse endpoints mix like `list=50,detail=30,accept=20`"""
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint {name}, available: {', '.join(ENDPOINTS)}")
+        weights[name] = int(weight or 1)
+    return weights
+
+
+def percentile(sorted_values: list[float], value: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * value))
+    return sorted_values[index]
+
+
+class LoadTest:
+    def __init__(
+        self,
+        base_url: str,
+        token: str,
+        mix: dict[str, int],
+        recommendations_ids: list[int],
+        journeys_ids: list[int],
+        concurrency: int,
+        duration_seconds: float,
+        warmup_seconds: float,
+        seed: int,
+    ) -> None:
+        self.base_url = base_url
+        self.token = token
+        self.mix = mix
+        self.recommendations_ids = recommendations_ids
+        self.journeys_ids = journeys_ids
+        self.concurrency = concurrency
+        self.duration_seconds = duration_seconds
+        self.warmup_seconds = warmup_seconds
+        self.rng = random.Random(seed)
+
+        self.latencies: defaultdict[str, list[float]] = defaultdict(list)
+        self.errors: defaultdict[str, int] = defaultdict(int)
+
+    def _build_request(self, endpoint: str) -> tuple[str, str, StrDict]:
+        path = config.BASE_API_PATH
+        recommendation_id = self.rng.choice(self.recommendations_ids)
+
+        if endpoint == "list":
+            params: StrDict = {"page": self.rng.randint(1, 5)}
+            if self.journeys_ids and self.rng.random() < 0.5:
+                params["journey_id"] = self.rng.choice(self.journeys_ids)
+            return "GET", f"{path}/list", {"params": params}
+        if endpoint == "list_state":
+            return "GET", f"{path}/list/state", {}
+        if endpoint == "detail":
+            return "GET", f"{path}/{recommendation_id}", {}
+        if endpoint == "accept":
+            return "POST", f"{path}/{recommendation_id}/accept", {}
+        return "POST", f"{path}/{recommendation_id}/reject", {"json": {"reason": "Load test"}}
+
+    async def _worker(self, client: httpx.AsyncClient, started: float, finish: float) -> None:
+        endpoints = list(self.mix)
+        weights = list(self.mix.values())
+
+        while (now := time.perf_counter()) < finish:
+            endpoint = self.rng.choices(endpoints, weights=weights)[0]
+            method, url, kwargs = self._build_request(endpoint)
+
+            request_started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latency = (time.perf_counter() - request_started) * 1000
+
+            # results of warmup period are not counted
+            if now - started < self.warmup_seconds:
+                continue
+            if failed:
+                self.errors[endpoint] += 1
+            self.latencies[endpoint].append(latency)
+
+    async def _run(self) -> None:
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        headers = {"X-Internal-Authorization": self.token}
+        async with httpx.AsyncClient(base_url=self.base_url, headers=headers, limits=limits, timeout=30) as client:
+            started = time.perf_counter()
+            finish = started + self.warmup_seconds + self.duration_seconds
+            await asyncio.gather(*(self._worker(client, started, finish) for _ in range(self.concurrency)))
+
+    def run(self) -> StrDict:
+        asyncio.run(self._run())
+        return self.report()
+
+    def report(self) -> StrDict:
+        endpoints: dict[str, Any] = {}
+        for endpoint, latencies in sorted(self.latencies.items()):
+            latencies = sorted(latencies)
+            endpoints[endpoint] = {
+                "requests": len(latencies),
+                "errors": self.errors[endpoint],
+                "rps": round(len(latencies) / self.duration_seconds, 2),
+                "p50_ms": round(percentile(latencies, 0.50), 2),
+                "p95_ms": round(percentile(latencies, 0.95), 2),
+                "p99_ms": round(percentile(latencies, 0.99), 2),
+            }
+
+        total = sum(len(latencies) for latencies in self.latencies.values())
+        return {
+            "concurrency": self.concurrency,
+            "duration_seconds": self.duration_seconds,
+            "requests": total,
+            "errors": sum(self.errors.values()),
+            "rps": round(total / self.duration_seconds, 2),
+            "endpoints": endpoints,
+        }
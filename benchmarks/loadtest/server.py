@@ -0,0 +1,73 @@
+"""
+Application factory and stub of authentication service for load testing
+without external services besides local database.
+"""
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+from fastapi import FastAPI
+
+from app.main import create_app as _create_app
+from app.producer.services import producer
+
+
+def create_app() -> FastAPI:
+    """Create application that doesn't connect to Kafka on startup"""
+
+    mock.patch.object(producer, "start", mock.Mock()).start()
+    mock.patch.object(producer, "stop", mock.Mock()).start()
+    return _create_app()
+
+
+class AuthenticationStubHandler(BaseHTTPRequestHandler):
+    """Minimal implementation of authentication service endpoints used by the service"""
+
+    company_pattern = re.compile(r"^/_api/authentication/v1/companies/(?P<id>\d+)/$")
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+
+        if url.path == "/_api/authentication/v1/users":
+            company_id = int(parse_qs(url.query)["company_id"][0])
+            users = [
+                {
+                    "id": user_id,
+                    "role": "admin",
+                    "email": f"user{user_id}@example.com",
+                    "first_name": "Load",
+                    "last_name": "Test",
+                    "company_id": company_id,
+                }
+                for user_id in range(1, 4)
+            ]
+            return self._send_json(users)
+
+        if match := self.company_pattern.match(url.path):
+            company_id = int(match["id"])
+            return self._send_json({"id": company_id, "name": f"Company {company_id}"})
+
+        self.send_error(404)
+
+    def _send_json(self, data: object) -> None:
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        # do not spam output by every request
+        return
+
+
+def start_authentication_stub(host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Start stub in background thread, use `server.server_port` to get port"""
+    server = ThreadingHTTPServer((host, port), AuthenticationStubHandler)
+    thread = threading.Thread(target=server.serve_forever, name="authentication-stub", daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,54 @@
+import statistics
+import time
+from typing import Any, Callable
+
+from app.types import StrDict
+
+
+def measure(func: Callable[[], Any], repeats: int, warmup: int = 2) -> StrDict:
+    """Call function several times and return timing statistics in milliseconds"""
+
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    return {
+        "runs": repeats,
+        "min_ms": round(timings[0], 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        "max_ms": round(timings[-1], 3),
+    }
+
+
+def compare(baseline: StrDict, current: StrDict, threshold: float) -> list[StrDict]:
+    """
+    Compare median timings of every case with baseline. Case is regressed when
+    it is slower than baseline more than by `threshold` fraction.
+    """
+    rows = []
+    for size, cases in current["results"].items():
+        baseline_cases = baseline["results"].get(size, {})
+        for name, stats in cases.items():
+            if name not in baseline_cases:
+                continue
+            before = baseline_cases[name]["median_ms"]
+            after = stats["median_ms"]
+            change = (after - before) / before if before else 0.0
+            rows.append(
+                {
+                    "size": size,
+                    "case": name,
+                    "baseline_ms": before,
+                    "current_ms": after,
+                    "change": round(change, 3),
+                    "regression": change > threshold,
+                }
+            )
+    return rows
@@ -9,7 +9,8 @@ if [[ $ENVIRONMENT == "local" ]]; then
     bash docker/init.sh
 
     # start worker with auto-reloading
-    watchfiles "celery --app=app.worker.worker worker --loglevel=INFO" .
+    watchfiles "celery --app=app.worker.worker worker --beat --loglevel=INFO" .
 else
-    celery --app app.worker.worker worker --loglevel=INFO
+    # embedded beat schedules archival, concurrent runs of it skip locked rows
+    celery --app app.worker.worker worker --beat --loglevel=INFO
 fi
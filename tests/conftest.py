@@ -1,5 +1,5 @@
 from collections import defaultdict
-from contextlib import ExitStack
+from contextlib import ExitStack, nullcontext
 from datetime import datetime
 from pathlib import Path
 from typing import Any, List
@@ -16,6 +16,8 @@ from starlette.testclient import TestClient
 
 from app import db
 from app.auth import services as auth
+from app.auth.utils import create_jwt_token
+from app.config import config
 from app.main import create_app
 from app.producer.services import producer
 from app.recommendations import models, tables
@@ -40,6 +42,13 @@ def client(app: FastAPI):
         yield client
 
 
+@pytest.fixture
+def headers():
+    """Headers of user of account 261, which is the default account of `MockRecommendation`"""
+    token = create_jwt_token(payload={"id": 1, "company_id": 261, "has_financial_access": True}, key="")
+    return {"X-Internal-Authorization": token}
+
+
 @pytest.fixture(scope="session", autouse=True)
 def auth_service_start():
     try:
@@ -49,6 +58,19 @@ def auth_service_start():
         auth.authentication.stop()
 
 
+@pytest.fixture(autouse=True)
+def query_budget(monkeypatch):
+    """Fail requests that execute more SQL statements than budget, to catch N+1 queries"""
+    monkeypatch.setattr(config, "QUERY_BUDGET_STRICT", True)
+    yield config.QUERY_BUDGET
+
+
+@pytest.fixture(autouse=True)
+def single_flight_window(monkeypatch):
+    """Tests change database directly, so results are not shared between sequential requests"""
+    monkeypatch.setattr(config, "SINGLE_FLIGHT_WINDOW_SECONDS", 0)
+
+
 @pytest.fixture(autouse=True)
 def db_cleanup():
     """Automatically cleanup database after every tests"""
@@ -281,7 +303,19 @@ def celery_mock(monkeypatch):
             kwargs=kwargs,
         )
 
+    def apply_async(self, args=None, kwargs=None, **options):
+        box.add_message(
+            name=self.name,
+            args=args,
+            kwargs=kwargs or {},
+        )
+
+    def producer_or_acquire(self, producer=None):
+        return nullcontext(producer)
+
     monkeypatch.setattr(celery.Task, "delay", delay)
+    monkeypatch.setattr(celery.Task, "apply_async", apply_async)
+    monkeypatch.setattr(celery.Celery, "producer_or_acquire", producer_or_acquire)
 
     yield box
 
@@ -0,0 +1,119 @@
+from datetime import date, datetime
+from unittest.mock import Mock
+
+import pytest
+import sqlalchemy as sa
+
+from app import db
+from app.recommendations import db as recommendations_db
+from app.recommendations import services, tables
+from app.recommendations.enums import RecommendationStatus
+from tests.conftest import MockRecommendation
+
+OLD_DATE = datetime(2020, 1, 1)
+
+
+@pytest.fixture
+def archived():
+    """Old expired recommendation with platform status, account has no version like seeded one"""
+    MockRecommendation.create(id=1, journey_id=1, status=RecommendationStatus.EXPIRED, creation_date=OLD_DATE)
+    MockRecommendation.create(id=2, journey_id=2, status=RecommendationStatus.ACTIVE, creation_date=OLD_DATE)
+    MockRecommendation.create(id=3, journey_id=3, status=RecommendationStatus.REJECTED, creation_date=datetime.now())
+    with db.begin():
+        db.execute(
+            sa.insert(tables.PlatformStatus).values(
+                recommendation_id=1,
+                platform="facebook",
+                data=[{"object_id": "1", "object_type": "campaign", "status": "success"}],
+            )
+        )
+
+    assert services.archive_recommendations(batch_size=1) == (1, 1)
+
+
+def _count(table) -> int:
+    with db.connect():
+        return db.select_scalar(sa.select(sa.func.count()).select_from(table))
+
+
+def test_archive_old_expired_and_decided(archived):
+    # active and recent recommendations are kept
+    assert sorted(item.id for item in MockRecommendation.get_all()) == [2, 3]
+    assert _count(tables.recommendations_archive) == 1
+    assert _count(tables.PlatformStatus) == 0
+    assert _count(tables.platform_statuses_archive) == 1
+
+
+def test_archive_changes_list_etag(client, headers):
+    MockRecommendation.create(id=1, status=RecommendationStatus.EXPIRED, creation_date=OLD_DATE)
+    etag = client.get("/api/recommendations/list", headers=headers).headers["ETag"]
+
+    assert services.archive_recommendations() == (1, 0)
+
+    response = client.get("/api/recommendations/list", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["items"] == []
+
+
+def test_read_archived_recommendation(client, headers, archived):
+    response = client.get("/api/recommendations/1", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["status"] == RecommendationStatus.EXPIRED
+    assert len(response.json()["platform_statuses"]) == 1
+
+
+def test_statuses_of_hot_recommendation_are_not_read_from_archive(client, headers, archived):
+    # stale copy in archive is not read, as recommendation is found in hot table
+    with db.begin():
+        db.execute(
+            sa.insert(tables.platform_statuses_archive).values(
+                id=100,
+                recommendation_id=2,
+                platform="google",
+                data=[{"object_id": "2", "object_type": "campaign", "status": "error"}],
+            )
+        )
+
+    with db.connect():
+        statuses = services.get_platform_statuses(recommendations_ids=[1, 2])
+    assert [status.recommendation_id for status in statuses] == [1]
+    response = client.get("/api/recommendations/2", headers=headers)
+    assert response.json()["platform_statuses"] == []
+
+
+def test_list_reads_archive_by_date_from(client, headers, archived):
+    # archive is not read by default
+    response = client.get("/api/recommendations/list", params={"sort_by": "date"}, headers=headers)
+    assert [item["id"] for item in response.json()["items"]] == [3, 2]
+
+    params = {"sort_by": "date", "date_from": str(OLD_DATE.date())}
+    response = client.get("/api/recommendations/list", params=params, headers=headers)
+    assert [item["id"] for item in response.json()["items"]] == [3, 2, 1]
+
+    response = client.get("/api/recommendations/list", params={"date_from": str(date.today())}, headers=headers)
+    assert [item["id"] for item in response.json()["items"]] == [3]
+
+
+def test_accept_archived_recommendation(client, headers, archived):
+    response = client.post("/api/recommendations/1/accept", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["status"] == RecommendationStatus.ACCEPTING
+    assert _count(tables.recommendations_archive) == 0
+    assert _count(tables.PlatformStatus) == 1
+
+
+def test_change_not_archived_recommendation(client, headers, archived, monkeypatch):
+    restore = Mock(wraps=recommendations_db.restore_recommendation)
+    monkeypatch.setattr(recommendations_db, "restore_recommendation", restore)
+
+    response = client.post("/api/recommendations/2/accept", headers=headers)
+    assert response.status_code == 200
+    # archive is touched only for recommendation not found in hot table
+    restore.assert_not_called()
+
+    response = client.post("/api/recommendations/1/accept", headers=headers)
+    assert response.status_code == 200
+    restore.assert_called_once_with(id_=1)
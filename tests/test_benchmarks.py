@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.recommendations.enums import RecommendationPageSortBy
+from benchmarks.cases import BenchmarkContext
+from benchmarks.timing import compare
+
+
+def test_compare_marks_cases_slower_than_threshold():
+    baseline = {"results": {"1000": {"list": {"median_ms": 100.0}, "summary": {"median_ms": 10.0}}}}
+    current = {
+        "results": {
+            "1000": {
+                "list": {"median_ms": 110.0},
+                "summary": {"median_ms": 12.0},
+                # new case without baseline is not compared
+                "search": {"median_ms": 50.0},
+            },
+        }
+    }
+
+    rows = compare(baseline, current, threshold=0.1)
+
+    assert rows == [
+        {
+            "size": "1000",
+            "case": "list",
+            "baseline_ms": 100.0,
+            "current_ms": 110.0,
+            "change": 0.1,
+            "regression": False,
+        },
+        {
+            "size": "1000",
+            "case": "summary",
+            "baseline_ms": 10.0,
+            "current_ms": 12.0,
+            "change": 0.2,
+            "regression": True,
+        },
+    ]
+
+
+@pytest.mark.parametrize("sort_by", list(RecommendationPageSortBy))
+def test_benchmark_queries_are_built(sort_by):
+    # context is not selected from seeded data, only parameters of queries are set
+    context = BenchmarkContext.__new__(BenchmarkContext)
+    context.account_id = 1
+    context.page_size = 10
+
+    query = context.list_query(sort_by=sort_by).compile(dialect=postgresql.dialect())
+    count_query = context.count_query().compile(dialect=postgresql.dialect())
+
+    assert "ORDER BY" in str(query)
+    assert "count" in str(count_query)
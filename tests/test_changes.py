@@ -0,0 +1,36 @@
+from app.recommendations.enums import RecommendationStatus
+from tests.conftest import MockRecommendation
+
+
+def test_changes_since_cursor(client, headers):
+    MockRecommendation.create(id=1)
+    MockRecommendation.create(id=2)
+    MockRecommendation.create(id=3, account_id=262)
+
+    response = client.get("/api/recommendations/changes", params={"limit": 1}, headers=headers)
+    assert response.status_code == 200
+    first = response.json()
+    assert [item["id"] for item in first["items"]] == [1]
+    assert first["has_more"] is True
+
+    response = client.get("/api/recommendations/changes", params={"since": first["next_since"]}, headers=headers)
+    second = response.json()
+    assert [item["id"] for item in second["items"]] == [2]
+    assert second["has_more"] is False
+
+    client.post("/api/recommendations/1/reject", json={"reason": "test"}, headers=headers)
+
+    response = client.get("/api/recommendations/changes", params={"since": second["next_since"]}, headers=headers)
+    items = response.json()["items"]
+    assert [item["id"] for item in items] == [1]
+    assert items[0]["status"] == RecommendationStatus.REJECTED
+    assert items[0]["change_seq"] > second["next_since"]
+
+
+def test_changes_without_new_changes(client, headers):
+    MockRecommendation.create(id=1)
+
+    cursor = MockRecommendation.get(1).change_seq
+    response = client.get("/api/recommendations/changes", params={"since": cursor}, headers=headers)
+
+    assert response.json() == {"items": [], "next_since": cursor, "has_more": False}
@@ -1,6 +1,18 @@
+import hashlib
+from collections import defaultdict
+from datetime import datetime
+from unittest.mock import Mock
+
+from app import db
+from app.commands import profile
+from app.commands import seed as seed_data
 from app.commands.__main__ import update_url_schema
 from app.producer.models import URLSchema, URLSchemaEndpoint
+from app.recommendations import services
+from app.recommendations.enums import RecommendationStatus
+from app.recommendations.states import get_platforms_state
 from app.topics import Topics
+from app.utils import from_json
 
 
 def test_update_url_schema_command(producer_mock):
@@ -19,3 +31,129 @@ def test_update_url_schema_command(producer_mock):
             )
         ],
     )
+
+
+def test_seed_data_generator_is_deterministic():
+    options = seed_data.SeedOptions(
+        seed=1,
+        accounts=2,
+        journeys_per_account=3,
+        recommendations=500,
+        statuses_depth=3,
+        goal_updates=10,
+        days=30,
+        end_date=datetime(2022, 12, 1),
+    )
+
+    def generate():
+        generator = seed_data.SeedGenerator(options)
+        recommendations = list(generator.generate_recommendations())
+        statuses = list(generator.generate_platform_statuses())
+        goal_updates = list(generator.generate_goal_updates())
+        return recommendations, statuses, goal_updates
+
+    recommendations, statuses, goal_updates = generate()
+    assert (recommendations, statuses, goal_updates) == generate()
+    assert len(recommendations) == 500
+    assert len(goal_updates) == 10
+    assert {status[1] for status in statuses} <= {row[0] for row in recommendations}
+    status_index = seed_data.RECOMMENDATION_COLUMNS.index("status")
+    assert {row[status_index] for row in recommendations} == {status.value for status in RecommendationStatus}
+
+
+def test_seed_recommendations_reference_interned_taxonomies():
+    options = seed_data.SeedOptions(
+        seed=1,
+        accounts=2,
+        journeys_per_account=3,
+        recommendations=50,
+        statuses_depth=3,
+        goal_updates=10,
+        days=30,
+        end_date=datetime(2022, 12, 1),
+    )
+    generator = seed_data.SeedGenerator(options)
+
+    taxonomies = list(generator.generate_taxonomies())
+    generator.taxonomy_hashes = {journey_id: f"hash-{journey_id}" for journey_id, _ in taxonomies}
+    recommendations = list(generator.generate_recommendations())
+
+    assert len(taxonomies) == 6
+    journey_index = seed_data.RECOMMENDATION_COLUMNS.index("journey_id")
+    hash_index = seed_data.RECOMMENDATION_COLUMNS.index("taxonomy_hash")
+    assert all(row[hash_index] == f"hash-{row[journey_index]}" for row in recommendations)
+
+
+def test_seed_recommendations_have_summary_of_their_platform_statuses():
+    options = seed_data.SeedOptions(
+        seed=1,
+        accounts=2,
+        journeys_per_account=3,
+        recommendations=200,
+        statuses_depth=3,
+        goal_updates=10,
+        days=30,
+        end_date=datetime(2022, 12, 1),
+    )
+    generator = seed_data.SeedGenerator(options)
+    recommendations = list(generator.generate_recommendations())
+    statuses = list(generator.generate_platform_statuses())
+
+    platforms = defaultdict(set)
+    for _, recommendation_id, platform, _, data_hash in statuses:
+        platforms[recommendation_id].add(platform)
+        assert data_hash is not None
+
+    columns = seed_data.RECOMMENDATION_COLUMNS
+    for row in recommendations:
+        summary = from_json(row[columns.index("platforms_summary")])
+        assert set(summary) == platforms[row[0]]
+        assert row[columns.index("platforms_state")] == get_platforms_state(summary)
+    assert any(row[columns.index("platforms_state")] for row in recommendations)
+
+
+def test_seed_data_hash_text_is_normalized_like_jsonb():
+    data = [{"object_id": "1", "object_type": "ad", "status": "error", "details": None}]
+
+    text = '[{"status": "error", "details": null, "object_id": "1", "object_type": "ad"}]'
+    assert seed_data._jsonb_text(data) == text
+    assert seed_data._data_hash(data) == hashlib.md5(text.encode()).hexdigest()
+
+
+def test_seed_creates_partitions_before_copy(monkeypatch):
+    options = seed_data.SeedOptions(
+        seed=1,
+        accounts=1,
+        journeys_per_account=1,
+        recommendations=10,
+        statuses_depth=1,
+        goal_updates=1,
+        days=30,
+        end_date=datetime(2022, 12, 1),
+    )
+    calls = []
+    connection = Mock()
+    connection.cursor.return_value.fetchall.return_value = []
+    connection.cursor.return_value.copy_expert.side_effect = lambda statement, buffer: calls.append(statement)
+    monkeypatch.setattr(db.engine, "raw_connection", lambda: connection)
+    monkeypatch.setattr(services, "create_partitions", lambda max_id: calls.append(max_id))
+
+    seed_data.seed(options, truncate=False)
+
+    assert calls[0] == 10
+    assert any("COPY platform_statuses" in call for call in calls[1:])
+
+
+def test_parse_import_time():
+    output = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:      1500 |       1500 |     kafka.errors",
+            "import time:      2000 |       3500 |   kafka",
+            "import time:       500 |        500 | app.config",
+        ]
+    )
+    imports = profile.parse_import_time(output)
+
+    assert imports[1] == {"module": "kafka", "level": 1, "self_ms": 2.0, "cumulative_ms": 3.5}
+    assert profile.group_by_package(imports) == {"kafka": 3.5, "app": 0.5}
@@ -0,0 +1,51 @@
+from app.utils import is_etag_matched, make_etag
+from tests.conftest import MockRecommendation
+
+
+def test_is_etag_matched():
+    etag = make_etag(1, 2)
+
+    assert etag == make_etag(1, 2)
+    assert etag != make_etag(1, 3)
+    assert is_etag_matched(etag, etag)
+    assert is_etag_matched(f'"other", W/{etag}', etag)
+    assert is_etag_matched("*", etag)
+    assert not is_etag_matched(None, etag)
+    assert not is_etag_matched('"other"', etag)
+
+
+def test_recommendation_not_modified(client, headers):
+    MockRecommendation.create(id=1)
+
+    response = client.get("/api/recommendations/1", headers=headers)
+    etag = response.headers["ETag"]
+
+    response = client.get("/api/recommendations/1", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    # platform statuses are not selected
+    assert 'desc="1 queries"' in response.headers["Server-Timing"]
+
+    client.post("/api/recommendations/1/reject", json={"reason": "test"}, headers=headers)
+
+    response = client.get("/api/recommendations/1", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_recommendation_page_not_modified(client, headers):
+    MockRecommendation.create(id=1)
+
+    response = client.get("/api/recommendations/list", headers=headers)
+    etag = response.headers["ETag"]
+
+    response = client.get("/api/recommendations/list", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = client.get("/api/recommendations/list", params={"page": 2}, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+
+    client.post("/api/recommendations/1/reject", json={"reason": "test"}, headers=headers)
+
+    response = client.get("/api/recommendations/list", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
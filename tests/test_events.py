@@ -0,0 +1,59 @@
+import asyncio
+
+from app.pubsub import RESYNC_EVENT, Listener
+from app.recommendations import events
+from app.utils import from_json, to_json
+
+
+def test_listener_dispatches_to_matching_subscriptions():
+    listener = Listener(channel="test")
+
+    async def run():
+        first = listener.subscribe(predicate=lambda event: event["account_id"] == 1)
+        second = listener.subscribe(predicate=lambda event: event["account_id"] == 2)
+        listener.dispatch(to_json({"type": "recommendation", "account_id": 1}))
+        listener.dispatch("not a json")
+        await asyncio.sleep(0)
+        return first.queue.qsize(), second.queue.qsize()
+
+    assert asyncio.run(run()) == (1, 0)
+
+
+def test_slow_subscription_gets_resync(monkeypatch):
+    monkeypatch.setattr(events.config, "EVENTS_QUEUE_SIZE", 2)
+    listener = Listener(channel="test")
+
+    async def run():
+        subscription = listener.subscribe(predicate=lambda event: True)
+        for id_ in range(3):
+            listener.dispatch(to_json({"type": "recommendation", "recommendation_id": id_}))
+        await asyncio.sleep(0)
+        return [subscription.queue.get_nowait() for _ in range(subscription.queue.qsize())]
+
+    assert asyncio.run(run()) == [RESYNC_EVENT]
+
+
+class ConnectedRequest:
+    async def is_disconnected(self) -> bool:
+        return False
+
+
+def test_stream_events_filters_by_journey(monkeypatch):
+    listener = Listener(channel="test")
+    monkeypatch.setattr(events, "listener", listener)
+
+    async def run():
+        stream = events.stream_events(request=ConnectedRequest(), account_id=1, journey_id=10)
+        message = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        for journey_id in (11, 10):
+            event = {"type": "recommendation", "account_id": 1, "journey_id": journey_id, "recommendation_id": 5}
+            listener.dispatch(to_json(event))
+        try:
+            return await message
+        finally:
+            await stream.aclose()
+
+    event_line, data_line, *_ = asyncio.run(run()).split("\n")
+    assert event_line == "event: recommendation"
+    assert from_json(data_line.removeprefix("data: "))["journey_id"] == 10
@@ -0,0 +1,59 @@
+import pytest
+
+from app.recommendations.fields import UnknownFieldsError, parse_fields, parse_include
+from tests.conftest import MockRecommendation
+
+
+def test_parse_fields():
+    assert parse_fields(None) is None
+    assert parse_fields("status, creation_date,status") == ("id", "status", "creation_date")
+    assert parse_include("platform_statuses") == ("platform_statuses",)
+
+    with pytest.raises(UnknownFieldsError):
+        parse_fields("status,password")
+    with pytest.raises(UnknownFieldsError):
+        parse_include("goals")
+
+
+def test_list_sparse_fields(client, headers):
+    MockRecommendation.create(id=1)
+
+    response = client.get("/api/recommendations/list", params={"fields": "status"}, headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["items"] == [{"id": 1, "status": "ACTIVE"}]
+    # recommendations and count, platform statuses are not selected
+    assert 'desc="3 queries"' in response.headers["Server-Timing"]
+
+
+def test_recommendation_sparse_fields(client, headers):
+    MockRecommendation.create(id=1)
+
+    response = client.get(
+        "/api/recommendations/1",
+        params={"fields": "status", "include": "platform_statuses"},
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"id": 1, "status": "ACTIVE", "platform_statuses": []}
+
+
+def test_recommendation_sparse_etag(client, headers):
+    MockRecommendation.create(id=1)
+
+    full_etag = client.get("/api/recommendations/1", headers=headers).headers["ETag"]
+    response = client.get("/api/recommendations/1", params={"fields": "status"}, headers=headers)
+    sparse_etag = response.headers["ETag"]
+    assert sparse_etag != full_etag
+
+    # full recommendation is returned for tag of sparse one
+    response = client.get("/api/recommendations/1", headers={**headers, "If-None-Match": sparse_etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == full_etag
+
+
+def test_unknown_fields(client, headers):
+    response = client.get("/api/recommendations/list", params={"fields": "unknown"}, headers=headers)
+
+    assert response.status_code == 400
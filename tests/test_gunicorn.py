@@ -0,0 +1,26 @@
+from unittest.mock import Mock
+
+from app import db, gunicorn_conf
+from app.auth import services as authentication_services
+from app.auth.services import authentication
+from app.producer.services import producer
+
+
+def test_post_fork_resets_inherited_connections_and_clients(monkeypatch):
+    monkeypatch.setattr(producer, "_producer", Mock())
+    monkeypatch.setattr(authentication, "_client", Mock())
+    monkeypatch.setattr(authentication, "get_company", Mock())
+    authentication_services.get_company(company_id=261)
+    inherited_pool = db.engine.pool
+    inherited_connection = db.engine.connect()
+
+    gunicorn_conf.post_fork(server=Mock(), worker=Mock())
+
+    # connection of parent process is left open in the old pool, new one is not shared
+    assert db.engine.pool is not inherited_pool
+    assert db.engine.pool.checkedout() == 0
+    assert inherited_connection.closed is False
+    assert producer._producer is None
+    assert authentication._client is None
+    assert authentication_services.get_company.cache_info().currsize == 0
+    inherited_connection.close()
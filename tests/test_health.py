@@ -0,0 +1,65 @@
+from unittest.mock import Mock
+
+from app.health.services import DependencyChecker, HealthService
+from app.health.services import health as health_service
+
+
+def test_livez(client):
+    response = client.get("/livez")
+    assert response.status_code == 200
+    assert response.json() == {"status": "alive"}
+
+
+def test_dependency_checker_keeps_last_result():
+    check = Mock(side_effect=[None, ConnectionError("down")])
+    checker = DependencyChecker(name="test", check=check, interval_seconds=60)
+
+    assert checker.get_state(now=0).ok is False
+
+    result = checker.refresh()
+    assert checker.get_state(now=result.checked_at + 1).ok is True
+    assert check.call_count == 1
+
+    result = checker.refresh()
+    state = checker.get_state(now=result.checked_at)
+    assert state.ok is False
+    assert state.error == "ConnectionError('down')"
+
+
+def test_dependency_checker_stale_result():
+    checker = DependencyChecker(name="test", check=Mock(), interval_seconds=1)
+    result = checker.refresh()
+
+    state = checker.get_state(now=result.checked_at + 3600)
+    assert state.ok is False
+    assert state.error == "Result is stale"
+
+
+def test_readyz(client, monkeypatch):
+    ok = DependencyChecker(name="ok", check=Mock(), interval_seconds=60)
+    ok.refresh()
+    monkeypatch.setattr(health_service, "_checkers", [ok])
+
+    response = client.get("/readyz")
+    assert response.status_code == 200
+    assert response.json()["ready"] is True
+    assert response.json()["dependencies"]["ok"]["ok"] is True
+
+    failed = DependencyChecker(name="failed", check=Mock(side_effect=ConnectionError()), interval_seconds=60)
+    failed.refresh()
+    monkeypatch.setattr(health_service, "_checkers", [ok, failed])
+
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["ready"] is False
+    assert response.json()["dependencies"]["failed"]["ok"] is False
+
+
+def test_kafka_check_requests_brokers_metadata_only():
+    service = HealthService()
+    service._kafka = Mock()
+
+    service._check_kafka()
+
+    service._kafka._get_cluster_metadata.assert_called_once_with(topics=[])
+    service._kafka.describe_cluster.assert_not_called()
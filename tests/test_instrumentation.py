@@ -0,0 +1,51 @@
+import pytest
+import sqlalchemy as sa
+
+from app import db
+from app.config import config
+from app.instrumentation import QueryBudgetExceeded, assert_max_queries, count_queries
+from tests.conftest import MockRecommendation
+
+
+def test_count_queries():
+    with count_queries() as metrics, db.connect() as connection:
+        connection.execute(sa.text("SELECT 1"))
+        connection.execute(sa.text("SELECT 2"))
+
+    assert metrics.statements == 2
+    assert metrics.db_seconds > 0
+
+
+def test_failed_query_is_not_counted():
+    with count_queries() as metrics, db.connect() as connection:
+        with pytest.raises(sa.exc.DBAPIError):
+            connection.execute(sa.text("SELECT 1 / 0"))
+        # start of failed statement is not left on pooled connection
+        assert "query_started" not in connection.info
+
+    assert metrics.statements == 0
+
+
+def test_assert_max_queries():
+    with pytest.raises(QueryBudgetExceeded), assert_max_queries(1), db.connect() as connection:
+        connection.execute(sa.text("SELECT 1"))
+        connection.execute(sa.text("SELECT 2"))
+
+
+def test_server_timing_header(client, headers):
+    MockRecommendation.create(id=1)
+
+    response = client.get("/api/recommendations/1", headers=headers)
+
+    assert response.status_code == 200
+    timing = response.headers["Server-Timing"]
+    # select recommendation and select platform statuses
+    assert 'desc="2 queries"' in timing
+    assert "serialize;dur=" in timing
+
+
+def test_query_budget_strict_mode(client, headers, monkeypatch):
+    monkeypatch.setattr(config, "QUERY_BUDGET", 1)
+
+    with pytest.raises(QueryBudgetExceeded):
+        client.get("/api/recommendations/list", headers=headers)
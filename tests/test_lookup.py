@@ -0,0 +1,49 @@
+import pytest
+import sqlalchemy as sa
+
+from app import db
+from app.recommendations import tables
+from tests.conftest import MockRecommendation
+
+
+@pytest.fixture
+def recommendations():
+    MockRecommendation.create(id=1, journey_id=1, taxonomy_hash="a")
+    MockRecommendation.create(id=2, journey_id=2, taxonomy_hash="b")
+    MockRecommendation.create(id=3, journey_id=3, taxonomy_hash="a", account_id=262)
+    with db.begin():
+        db.execute(
+            sa.insert(tables.Taxonomy).values(
+                [{"hash": "a", "data": {"channels": ["facebook"]}}, {"hash": "b", "data": {"budget": {"total": 1}}}]
+            )
+        )
+        for recommendation_id, object_id in ((1, "10"), (2, "20"), (3, "10")):
+            db.execute(
+                sa.insert(tables.PlatformStatus).values(
+                    recommendation_id=recommendation_id,
+                    platform="facebook",
+                    data=[{"object_id": object_id, "object_type": "campaign", "status": "success"}],
+                )
+            )
+
+
+@pytest.mark.parametrize(
+    "params, ids",
+    [
+        ({"object_id": "10"}, [1]),
+        ({"object_type": "campaign"}, [2, 1]),
+        ({"object_id": "20", "object_type": "adset"}, []),
+        ({"taxonomy_key": "budget"}, [2]),
+        ({"taxonomy_key": "channels", "object_id": "10"}, [1]),
+    ],
+)
+def test_lookup_recommendations(client, headers, recommendations, params, ids):
+    response = client.get("/api/recommendations/lookup", params=params, headers=headers)
+
+    assert response.status_code == 200
+    assert response.json() == {"ids": ids}
+
+
+def test_lookup_requires_filter(client, headers):
+    response = client.get("/api/recommendations/lookup", headers=headers)
+    assert response.status_code == 400
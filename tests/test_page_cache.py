@@ -0,0 +1,71 @@
+import pytest
+
+from app.config import config
+from app.recommendations.cache import PageCache, page_cache
+from app.recommendations.responses import RecommendationPageState
+from tests.conftest import MockRecommendation
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value.encode()
+
+
+class BrokenRedis:
+    def get(self, key):
+        raise ConnectionError("down")
+
+    def set(self, key, value, ex=None):
+        raise ConnectionError("down")
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(config, "PAGE_CACHE_ENABLED", True)
+    monkeypatch.setattr(page_cache, "_redis", redis)
+    yield redis
+
+
+def test_cache_falls_back_on_redis_errors(monkeypatch):
+    monkeypatch.setattr(config, "PAGE_CACHE_ENABLED", True)
+    cache = PageCache()
+    cache._redis = BrokenRedis()
+
+    response = cache.get_or_build("key", build=lambda: RecommendationPageState(active_exists=True))
+
+    assert response.body == b'{"active_exists": true}'
+    assert cache.get_stats()["errors"] == 2
+
+
+def test_list_page_is_cached_until_account_is_changed(client, headers, redis):
+    MockRecommendation.create(id=1)
+
+    first = client.get("/api/recommendations/list", headers=headers)
+    second = client.get("/api/recommendations/list", headers=headers)
+    assert first.json() == second.json()
+    assert len(redis.data) == 1
+    # only version of account is selected
+    assert 'desc="1 queries"' in second.headers["Server-Timing"]
+
+    client.post("/api/recommendations/1/reject", json={"reason": "test"}, headers=headers)
+
+    response = client.get("/api/recommendations/list", headers=headers)
+    assert response.json()["items"][0]["status"] == "REJECTED"
+    assert len(redis.data) == 2
+
+
+def test_state_without_page_cache_does_not_read_version(client, headers, monkeypatch):
+    monkeypatch.setattr(config, "PAGE_CACHE_ENABLED", False)
+    MockRecommendation.create(id=1)
+
+    response = client.get("/api/recommendations/list/state", headers=headers)
+
+    assert response.json()["active_exists"] is True
+    assert 'desc="1 queries"' in response.headers["Server-Timing"]
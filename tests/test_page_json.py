@@ -0,0 +1,72 @@
+from datetime import datetime
+
+import pytest
+import sqlalchemy as sa
+
+from app import db
+from app.config import config
+from app.recommendations import tables
+from app.recommendations.enums import RecommendationStatus
+from tests.conftest import MockRecommendation
+
+
+def _create_platform_status(recommendation_id: int, data: list[dict]) -> None:
+    with db.begin():
+        db.execute(
+            sa.insert(tables.PlatformStatus).values(
+                recommendation_id=recommendation_id,
+                platform="facebook",
+                data=data,
+            )
+        )
+
+
+def _get_page(client, headers, monkeypatch, rendering: bool, **params) -> dict:
+    monkeypatch.setattr(config, "PAGE_JSON_RENDERING", rendering)
+    response = client.get("/api/recommendations/list", params=params, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.parametrize("sort_by", ["status_date", "date"])
+def test_rendered_page_equals_model_page(client, headers, monkeypatch, sort_by):
+    MockRecommendation.create(id=1)
+    MockRecommendation.create(
+        id=2,
+        status=RecommendationStatus.REJECTED,
+        creation_date=datetime(2022, 3, 2, 10, 0, 0),
+        decision_time=datetime(2022, 3, 3, 11, 12, 13, 141516),
+    )
+    MockRecommendation.create(id=3, creation_date=datetime(2022, 3, 4, 9, 30, 0))
+    _create_platform_status(1, [{"object_id": "1", "object_type": "campaign", "status": "pending"}])
+    _create_platform_status(
+        1,
+        [
+            {"object_id": "2", "object_type": "ad_set", "status": "error", "details": "Invalid budget"},
+            {"object_id": "3", "object_type": "ad_set", "status": "success"},
+        ],
+    )
+    # statuses without data are not returned
+    _create_platform_status(3, [])
+
+    for params in ({"sort_by": sort_by}, {"sort_by": sort_by, "page_size": 2, "page": 2}):
+        expected = _get_page(client, headers, monkeypatch, rendering=False, **params)
+        assert _get_page(client, headers, monkeypatch, rendering=True, **params) == expected
+
+
+def test_rendered_empty_page(client, headers, monkeypatch):
+    page = _get_page(client, headers, monkeypatch, rendering=True, page=3)
+
+    assert page == _get_page(client, headers, monkeypatch, rendering=False, page=3)
+    assert page["items"] == []
+    assert page["pages"] == 1
+
+
+def test_rendered_page_queries(client, headers, monkeypatch):
+    MockRecommendation.create(id=1)
+    monkeypatch.setattr(config, "PAGE_JSON_RENDERING", True)
+
+    response = client.get("/api/recommendations/list", headers=headers)
+
+    # version of account and the page itself
+    assert 'desc="2 queries"' in response.headers["Server-Timing"]
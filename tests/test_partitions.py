@@ -0,0 +1,142 @@
+from contextlib import nullcontext
+from datetime import datetime
+from unittest.mock import Mock
+
+import pytest
+import sqlalchemy as sa
+
+from app import db
+from app.config import config
+from app.recommendations import db as recommendations_db
+from app.recommendations import services, tables
+from tests.conftest import MockRecommendation
+
+RECOMMENDATION_ID = 3_500_000
+
+
+@pytest.fixture
+def created_partitions():
+    """Partitions created by test are dropped, as they are not cleaned by truncate"""
+    created: list[str] = []
+    yield created
+    for name in created:
+        with db.begin():
+            recommendations_db.drop_partition(name)
+
+
+def test_partitions_are_created_ahead(client, headers, created_partitions):
+    MockRecommendation.create(id=RECOMMENDATION_ID)
+
+    created, dropped = services.maintain_partitions()
+    created_partitions.extend(created)
+
+    assert dropped == []
+    ahead = RECOMMENDATION_ID + config.PLATFORM_STATUSES_PARTITION_SIZE * config.PLATFORM_STATUSES_PARTITIONS_AHEAD
+    with db.connect():
+        for table in recommendations_db.PARTITIONED_TABLES:
+            assert recommendations_db.select_partitions(table)[-1]["upper"] > ahead
+
+    with db.begin():
+        db.execute(
+            sa.insert(tables.PlatformStatus).values(
+                recommendation_id=RECOMMENDATION_ID,
+                platform="facebook",
+                data=[{"object_id": "1", "object_type": "campaign", "status": "success"}],
+            )
+        )
+
+    response = client.get(f"/api/recommendations/{RECOMMENDATION_ID}", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()["platform_statuses"]) == 1
+
+
+def test_partitions_are_dropped_after_retention(monkeypatch):
+    size = config.PLATFORM_STATUSES_PARTITION_SIZE
+    partitions = [
+        {"name": "platform_statuses_legacy", "lower": None, "upper": size},
+        {"name": f"platform_statuses_p{size}", "lower": size, "upper": 2 * size},
+        {"name": f"platform_statuses_p{2 * size}", "lower": 2 * size, "upper": 3 * size},
+    ]
+    creation_dates = {size: datetime(2020, 1, 1), 2 * size: datetime.utcnow()}
+    dropped_names: list[str] = []
+
+    monkeypatch.setattr(config, "PLATFORM_STATUSES_RETENTION_DAYS", 30)
+    monkeypatch.setattr(recommendations_db, "begin", nullcontext)
+    monkeypatch.setattr(recommendations_db, "PARTITIONED_TABLES", ("platform_statuses",))
+    monkeypatch.setattr(recommendations_db, "select_max_recommendation_id", lambda: 2 * size + 1)
+    monkeypatch.setattr(recommendations_db, "select_partitions", lambda table: partitions)
+    monkeypatch.setattr(recommendations_db, "select_last_creation_date", lambda before_id: creation_dates[before_id])
+    monkeypatch.setattr(recommendations_db, "create_partition", lambda table, lower, upper: f"{table}_p{lower}")
+    monkeypatch.setattr(recommendations_db, "drop_partition", dropped_names.append)
+
+    created, dropped = services.maintain_partitions()
+
+    # partition with recent recommendations and the current one are kept
+    assert dropped == dropped_names == ["platform_statuses_legacy"]
+    assert created == [f"platform_statuses_p{3 * size}", f"platform_statuses_p{4 * size}"]
+
+
+def test_partition_is_created_once(created_partitions):
+    size = config.PLATFORM_STATUSES_PARTITION_SIZE
+    lower = 1000 * size
+    with db.begin():
+        name = recommendations_db.create_partition("platform_statuses", lower=lower, upper=lower + size)
+    created_partitions.append(name)
+
+    # the same partition created by concurrent worker is skipped
+    with db.begin():
+        assert recommendations_db.create_partition("platform_statuses", lower=lower, upper=lower + size) is None
+
+
+def test_select_partitions_with_unbounded_and_default(monkeypatch):
+    rows = [
+        {"name": "platform_statuses_rest", "bound": "FOR VALUES FROM ('200') TO (MAXVALUE)"},
+        {"name": "platform_statuses_legacy", "bound": "FOR VALUES FROM (MINVALUE) TO ('100')"},
+        {"name": "platform_statuses_p100", "bound": "FOR VALUES FROM ('100') TO ('200')"},
+    ]
+    monkeypatch.setattr(db, "select_all", lambda query: rows)
+
+    partitions = recommendations_db.select_partitions("platform_statuses")
+    assert [(partition["lower"], partition["upper"]) for partition in partitions] == [
+        (None, 100),
+        (100, 200),
+        (200, None),
+    ]
+
+    rows.append({"name": "platform_statuses_default", "bound": "DEFAULT"})
+    with pytest.raises(ValueError, match="Default partition"):
+        recommendations_db.select_partitions("platform_statuses")
+
+
+def test_partitions_are_not_created_after_unbounded_one(monkeypatch):
+    partitions = [{"name": "platform_statuses_legacy", "lower": None, "upper": None}]
+    create_partition = Mock()
+
+    monkeypatch.setattr(config, "PLATFORM_STATUSES_RETENTION_DAYS", 30)
+    monkeypatch.setattr(recommendations_db, "begin", nullcontext)
+    monkeypatch.setattr(recommendations_db, "PARTITIONED_TABLES", ("platform_statuses",))
+    monkeypatch.setattr(recommendations_db, "select_max_recommendation_id", lambda: 1)
+    monkeypatch.setattr(recommendations_db, "select_partitions", lambda table: partitions)
+    monkeypatch.setattr(recommendations_db, "create_partition", create_partition)
+
+    assert services.maintain_partitions() == ([], [])
+    create_partition.assert_not_called()
+
+    partitions.clear()
+    with pytest.raises(ValueError, match="has no partitions"):
+        services.maintain_partitions()
+
+
+def test_partitions_are_created_up_to_given_id(monkeypatch):
+    size = config.PLATFORM_STATUSES_PARTITION_SIZE
+    partitions = [{"name": "platform_statuses_legacy", "lower": None, "upper": size}]
+
+    monkeypatch.setattr(recommendations_db, "begin", nullcontext)
+    monkeypatch.setattr(recommendations_db, "PARTITIONED_TABLES", ("platform_statuses",))
+    monkeypatch.setattr(recommendations_db, "select_partitions", lambda table: partitions)
+    monkeypatch.setattr(recommendations_db, "create_partition", lambda table, lower, upper: f"{table}_p{lower}")
+
+    created = services.create_partitions(max_id=3 * size + 1)
+
+    ahead = config.PLATFORM_STATUSES_PARTITIONS_AHEAD
+    assert created == [f"platform_statuses_p{n * size}" for n in range(1, 4 + ahead)]
@@ -0,0 +1,65 @@
+from datetime import datetime
+
+import sqlalchemy as sa
+
+from app import db
+from app.recommendations import models, services, tables
+from app.recommendations.enums import RecommendationStatus
+from app.recommendations.states import PlatformState
+from tests.conftest import MockRecommendation
+
+
+def _consume(platform: str, data: list[dict]) -> None:
+    with db.begin():
+        services.consume_platform_status(models.PlatformStatusInput(id=1, platform=platform, data=data))
+
+
+def _select_data() -> list[tuple[str, list]]:
+    with db.connect():
+        rows = db.select_all(sa.select(tables.PlatformStatus).order_by(tables.PlatformStatus.id))
+    return [(row["platform"], row["data"]) for row in rows]
+
+
+def test_repeated_platform_status_is_skipped():
+    MockRecommendation.create(id=1)
+    pending = [{"object_id": "1", "object_type": "campaign", "status": "pending"}]
+    success = [{"status": "success", "object_type": "campaign", "object_id": "1"}]
+
+    _consume("facebook", pending)
+    _consume("facebook", pending)
+    _consume("google", pending)
+    _consume("facebook", success)
+    _consume("facebook", success)
+    # the same data as not the newest status
+    _consume("facebook", pending)
+
+    assert [(platform, data[0]["status"]) for platform, data in _select_data()] == [
+        ("facebook", "pending"),
+        ("google", "pending"),
+        ("facebook", "success"),
+        ("facebook", "pending"),
+    ]
+
+
+def test_error_of_first_platform_is_fixed_by_applied_platform():
+    MockRecommendation.create(id=1, status=RecommendationStatus.ACCEPTING)
+
+    _consume("google", [{"object_id": "1", "object_type": "campaign", "status": "error"}])
+    assert MockRecommendation.get(1).status == RecommendationStatus.ERROR
+
+    _consume("facebook", [{"object_id": "2", "object_type": "campaign", "status": "success"}])
+    recommendation = MockRecommendation.get(1)
+    assert recommendation.status == RecommendationStatus.ACCEPTED
+    assert recommendation.platforms_state == PlatformState.partial
+
+
+def test_repeated_platform_status_of_archived_recommendation_is_skipped():
+    MockRecommendation.create(id=1, status=RecommendationStatus.EXPIRED, creation_date=datetime(2020, 1, 1))
+    pending = [{"object_id": "1", "object_type": "campaign", "status": "pending"}]
+    _consume("facebook", pending)
+    assert services.archive_recommendations() == (1, 1)
+
+    _consume("facebook", pending)
+
+    assert MockRecommendation.get(1) is None
+    assert _select_data() == []
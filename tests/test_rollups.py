@@ -0,0 +1,88 @@
+from datetime import date, datetime, timedelta
+
+from app import db
+from app.recommendations import rollups, services
+from app.recommendations.enums import RecommendationStatus
+from app.recommendations.models import Recommendation
+from tests.conftest import MockRecommendation
+
+CREATION_DATE = datetime(2022, 3, 1, 16, 34, 26)
+
+
+def _recommendation(**kwargs) -> Recommendation:
+    data = dict(
+        id=1,
+        uuid="1",
+        account_id=261,
+        type="budget",
+        version=1,
+        creation_date=CREATION_DATE,
+        enabled=True,
+        journey_id=1,
+        media_plan_id=None,
+        journey_name="journey",
+        user_id=None,
+        currency="USD",
+        status=RecommendationStatus.ACTIVE,
+        decision_time=None,
+        reason=None,
+        change_seq=1,
+    )
+    return Recommendation(**{**data, **kwargs})
+
+
+def test_rollup_deltas():
+    active = _recommendation()
+    rejected = _recommendation(
+        status=RecommendationStatus.REJECTED,
+        decision_time=CREATION_DATE + timedelta(hours=2, seconds=0.5),
+    )
+
+    deltas = rollups.get_rollup_deltas([(None, active), (active, rejected)])
+
+    assert list(deltas) == [(261, date(2022, 3, 1), "budget")]
+    delta = deltas[(261, date(2022, 3, 1), "budget")]
+    assert {name: value for name, value in delta.items() if value} == {
+        "rejected_count": 1,
+        "rejects": 1,
+        "decision_seconds": 7200,
+        "decisions_1d": 1,
+    }
+
+
+def test_rollup_deltas_without_changes():
+    accepting = _recommendation(status=RecommendationStatus.ACCEPTING, decision_time=CREATION_DATE)
+    expired = accepting.copy(update={"status": RecommendationStatus.EXPIRED})
+
+    delta = rollups.get_rollup_deltas([(accepting, expired)])[(261, date(2022, 3, 1), "budget")]
+
+    # decision is kept by expiration
+    assert {name: value for name, value in delta.items() if value} == {"accepting_count": -1, "expired_count": 1}
+    assert rollups.get_rollup_deltas([(accepting, accepting)]) == {}
+
+
+def test_decision_rollups_are_equal_to_rebuilt(client, headers):
+    MockRecommendation.create(id=1, journey_id=1)
+    MockRecommendation.create(id=2, journey_id=2)
+    MockRecommendation.create(id=3, journey_id=3, creation_date=CREATION_DATE + timedelta(days=1))
+    with db.begin():
+        services.rebuild_decision_rollups()
+
+    client.post("/api/recommendations/1/reject", json={"reason": "test"}, headers=headers)
+    client.post("/api/recommendations/3/accept", headers=headers)
+
+    response = client.get("/api/recommendations/analytics/decisions", headers=headers)
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [(item["day"], item["total"], item["accepts"], item["rejects"]) for item in items] == [
+        ("2022-03-01", 2, 0, 1),
+        ("2022-03-02", 1, 1, 0),
+    ]
+    assert items[0]["rejection_rate"] == 0.5
+    assert items[0]["counts"]["ACTIVE"] == 1
+
+    with db.begin():
+        services.rebuild_decision_rollups(account_id=261)
+
+    response = client.get("/api/recommendations/analytics/decisions", headers=headers)
+    assert response.json()["items"] == items
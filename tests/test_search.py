@@ -0,0 +1,61 @@
+from datetime import datetime
+
+import pytest
+
+from app.config import config
+from app.recommendations.enums import RecommendationStatus
+from tests.conftest import MockRecommendation
+
+
+@pytest.fixture(params=[True, False], ids=["json", "model"])
+def page_json_rendering(request, monkeypatch):
+    monkeypatch.setattr(config, "PAGE_JSON_RENDERING", request.param)
+
+
+@pytest.fixture
+def recommendations():
+    names = ["Summer sale", "Summer sale", "Winter promo", "Black Friday 50%_off", "Summer sale"]
+    for id_, name in enumerate(names, start=1):
+        MockRecommendation.create(
+            id=id_,
+            journey_id=id_,
+            journey_name=name,
+            creation_date=datetime(2022, 3, id_),
+            status=RecommendationStatus.ACTIVE if id_ == 1 else RecommendationStatus.EXPIRED,
+        )
+    MockRecommendation.create(id=6, journey_id=6, journey_name="Summer sale", account_id=262)
+
+
+def _get_ids(client, headers, **params) -> list[int]:
+    response = client.get("/api/recommendations/list", params=params, headers=headers)
+    assert response.status_code == 200
+    return [item["id"] for item in response.json()["items"]]
+
+
+@pytest.mark.usefixtures("page_json_rendering", "recommendations")
+@pytest.mark.parametrize(
+    "q, sort_by, ids",
+    [
+        # substring, active is on top with sorting by status
+        ("mmer", "status_date", [1, 5, 2]),
+        ("mmer", "date", [5, 2, 1]),
+        # fuzzy term
+        ("Wintr", "date", [3]),
+        # wildcards are matched literally
+        ("50%_", "date", [4]),
+        ("r%s", "date", []),
+    ],
+)
+def test_search_by_journey_name(client, headers, q, sort_by, ids):
+    assert _get_ids(client, headers, q=q, sort_by=sort_by) == ids
+
+
+@pytest.mark.usefixtures("recommendations")
+def test_search_is_paginated(client, headers):
+    response = client.get("/api/recommendations/list", params={"q": "summer", "page_size": 2}, headers=headers)
+    assert response.json()["pages"] == 2
+
+    ids = _get_ids(client, headers, q="summer", page_size=2) + _get_ids(
+        client, headers, q="summer", page_size=2, page=2
+    )
+    assert ids == [1, 5, 2]
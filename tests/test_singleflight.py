@@ -0,0 +1,70 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+import pytest
+
+from app.config import config
+from app.singleflight import SingleFlight, single_flight
+
+
+def test_concurrent_calls_share_result(monkeypatch):
+    monkeypatch.setattr(config, "SINGLE_FLIGHT_WINDOW_SECONDS", 60)
+    started = threading.Event()
+    release = threading.Event()
+
+    def compute():
+        started.set()
+        release.wait(timeout=1)
+        return "result"
+
+    func = Mock(side_effect=compute)
+    flight = SingleFlight()
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        leader = executor.submit(flight.do, "key", func)
+        started.wait(timeout=1)
+        followers = [executor.submit(flight.do, "key", func) for _ in range(4)]
+        release.set()
+        results = [leader.result()] + [future.result() for future in followers]
+
+    assert results == ["result"] * 5
+    assert func.call_count == 1
+
+
+def test_error_is_shared(monkeypatch):
+    monkeypatch.setattr(config, "SINGLE_FLIGHT_WINDOW_SECONDS", 60)
+    func = Mock(side_effect=ValueError("failed"))
+    flight = SingleFlight()
+
+    for _ in range(2):
+        with pytest.raises(ValueError, match="failed"):
+            flight.do("key", func)
+
+    assert func.call_count == 1
+
+
+def test_result_expires_after_window(monkeypatch):
+    monkeypatch.setattr(config, "SINGLE_FLIGHT_WINDOW_SECONDS", 0)
+    func = Mock(return_value="result")
+    flight = SingleFlight()
+
+    flight.do("key", func)
+    flight.do("key", func)
+
+    assert func.call_count == 2
+
+
+def test_single_flight_normalizes_arguments(monkeypatch):
+    monkeypatch.setattr(config, "SINGLE_FLIGHT_WINDOW_SECONDS", 60)
+    calls = Mock()
+
+    @single_flight
+    def get_page(account_id: int, journey_id: int | None = None) -> int:
+        calls(account_id, journey_id)
+        return account_id
+
+    assert get_page(1) == get_page(account_id=1, journey_id=None) == 1
+    assert get_page(1, journey_id=2) == 1
+
+    assert calls.call_count == 2
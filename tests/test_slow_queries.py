@@ -0,0 +1,54 @@
+import pytest
+import sqlalchemy as sa
+
+from app import db
+from app.slow_queries import fingerprint, normalize_parameters, slow_query_log
+
+
+def test_fingerprint():
+    statement = """
+        SELECT id FROM platform_statuses
+        WHERE recommendation_id IN (%(id_1_1)s, %(id_1_2)s, %(id_1_3)s)
+    """
+    assert fingerprint(statement) == "SELECT id FROM platform_statuses WHERE recommendation_id IN (%(id_1_N)s)"
+
+
+def test_normalize_parameters():
+    assert normalize_parameters({"id": 1, "ids": [1, 2, 3], "name": "a" * 200}) == {
+        "id": 1,
+        "ids": "<list of 3 items>",
+        "name": "a" * 100 + "...",
+    }
+
+
+def test_failed_query_is_not_left_on_connection():
+    with db.connect() as connection:
+        with pytest.raises(sa.exc.DBAPIError):
+            connection.execute(sa.text("SELECT 1 / 0"))
+        assert "slow_query_started" not in connection.info
+
+
+def test_slow_queries_endpoint(client, headers):
+    slow_query_log.reset()
+    slow_query_log.record(statement="UPDATE recommendations SET status = %(status)s", parameters={}, duration_ms=300)
+    slow_query_log.record(statement="UPDATE recommendations SET status = %(status)s", parameters={}, duration_ms=500)
+
+    response = client.get("/internal/slow-queries", headers=headers)
+    assert response.status_code == 200
+    [stats] = response.json()
+    assert stats["count"] == 2
+    assert stats["max_ms"] == 500
+    assert stats["callers"] == []
+
+    client.delete("/internal/slow-queries", headers=headers)
+    assert client.get("/internal/slow-queries", headers=headers).json() == []
+
+
+@pytest.mark.parametrize("method, path", [("GET", "/internal/slow-queries"), ("DELETE", "/internal/slow-queries")])
+def test_internal_endpoints_require_token(client, method, path):
+    slow_query_log.record(statement="SELECT 1", parameters={}, duration_ms=300)
+
+    response = client.request(method, path)
+
+    assert response.status_code == 403
+    assert slow_query_log.get_stats() != []
@@ -0,0 +1,76 @@
+import pytest
+
+from app.recommendations.enums import RecommendationStatus
+from app.recommendations.models import PlatformStatus
+from app.recommendations.states import (
+    PlatformState,
+    get_platforms_state,
+    get_recommendation_status,
+)
+
+
+def _status(*items: str) -> PlatformStatus:
+    data = [{"object_id": str(i), "object_type": "campaign", "status": item} for i, item in enumerate(items)]
+    return PlatformStatus(id=1, recommendation_id=1, platform="google", data=data)
+
+
+@pytest.mark.parametrize(
+    "items, state",
+    [
+        ((), None),
+        (("pending", "pending"), PlatformState.pending),
+        (("pending", "success"), PlatformState.pending),
+        (("success", "success"), PlatformState.applied),
+        (("success", "error"), PlatformState.partial),
+        (("error",), PlatformState.error),
+    ],
+)
+def test_platform_status_state(items, state):
+    assert _status(*items).state == state
+
+
+@pytest.mark.parametrize(
+    "summary, state",
+    [
+        ({}, None),
+        ({"google": PlatformState.applied, "facebook": PlatformState.pending}, PlatformState.pending),
+        ({"google": PlatformState.applied, "facebook": PlatformState.applied}, PlatformState.applied),
+        ({"google": PlatformState.error, "facebook": PlatformState.error}, PlatformState.error),
+        ({"google": PlatformState.applied, "facebook": PlatformState.error}, PlatformState.partial),
+    ],
+)
+def test_get_platforms_state(summary, state):
+    assert get_platforms_state(summary) == state
+
+
+@pytest.mark.parametrize(
+    "status, platforms_state, expected",
+    [
+        (RecommendationStatus.ACCEPTING, PlatformState.pending, RecommendationStatus.ACCEPTING),
+        (RecommendationStatus.ACCEPTING, PlatformState.applied, RecommendationStatus.ACCEPTED),
+        (RecommendationStatus.ACCEPTING, PlatformState.partial, RecommendationStatus.ACCEPTED),
+        (RecommendationStatus.ACCEPTING, PlatformState.error, RecommendationStatus.ERROR),
+        (RecommendationStatus.EXPIRED, PlatformState.applied, RecommendationStatus.EXPIRED),
+        # error of not platforms is kept
+        (RecommendationStatus.ERROR, PlatformState.applied, RecommendationStatus.ERROR),
+    ],
+)
+def test_get_recommendation_status(status, platforms_state, expected):
+    assert get_recommendation_status(status, platforms_state) == expected
+
+
+@pytest.mark.parametrize(
+    "platforms_state, expected",
+    [
+        (PlatformState.partial, RecommendationStatus.ACCEPTED),
+        (PlatformState.pending, RecommendationStatus.ACCEPTING),
+        (PlatformState.error, RecommendationStatus.ERROR),
+    ],
+)
+def test_get_recommendation_status_after_platform_error(platforms_state, expected):
+    status = get_recommendation_status(
+        RecommendationStatus.ERROR,
+        platforms_state,
+        previous_platforms_state=PlatformState.error,
+    )
+    assert status == expected
@@ -0,0 +1,66 @@
+from datetime import datetime
+
+from app.recommendations import services
+from app.recommendations.enums import RecommendationStatus
+from tests.conftest import MockRecommendation
+
+
+def _counts(**counts: int) -> dict[str, int]:
+    return {status.value: counts.get(status.value, 0) for status in RecommendationStatus}
+
+
+def test_summary(client, headers):
+    MockRecommendation.create(id=1, journey_id=1)
+    MockRecommendation.create(id=2, journey_id=1, status=RecommendationStatus.REJECTED)
+    MockRecommendation.create(id=3, journey_id=2)
+    # another account
+    MockRecommendation.create(id=4, account_id=262)
+
+    response = client.get("/api/recommendations/list/summary", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "total": 3,
+        "counts": _counts(ACTIVE=2, REJECTED=1),
+        "active_exists": True,
+        "journeys": None,
+    }
+    # version of account and grouped count
+    assert 'desc="2 queries"' in response.headers["Server-Timing"]
+
+
+def test_summary_by_journey(client, headers):
+    MockRecommendation.create(id=1, journey_id=2)
+    MockRecommendation.create(id=2, journey_id=1, status=RecommendationStatus.REJECTED)
+
+    response = client.get("/api/recommendations/list/summary", params={"by_journey": True}, headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["journeys"] == [
+        {"journey_id": 1, "total": 1, "counts": _counts(REJECTED=1)},
+        {"journey_id": 2, "total": 1, "counts": _counts(ACTIVE=1)},
+    ]
+
+
+def test_summary_of_journey(client, headers):
+    MockRecommendation.create(id=1, journey_id=1, status=RecommendationStatus.EXPIRED)
+    MockRecommendation.create(id=2, journey_id=2)
+
+    response = client.get("/api/recommendations/list/summary", params={"journey_id": 1}, headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["counts"] == _counts(EXPIRED=1)
+    assert response.json()["active_exists"] is False
+
+
+def test_summary_matches_default_list(client, headers):
+    MockRecommendation.create(id=1, status=RecommendationStatus.EXPIRED, creation_date=datetime(2020, 1, 1))
+    MockRecommendation.create(id=2, status=RecommendationStatus.EXPIRED)
+    services.archive_recommendations()
+
+    response = client.get("/api/recommendations/list/summary", headers=headers)
+    page = client.get("/api/recommendations/list", params={"status": "EXPIRED"}, headers=headers)
+
+    # archived recommendation is counted neither by summary nor by default list
+    assert response.json()["counts"] == _counts(EXPIRED=1)
+    assert [item["id"] for item in page.json()["items"]] == [2]
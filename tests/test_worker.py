@@ -0,0 +1,60 @@
+from unittest.mock import Mock
+
+import pytest
+from celery.exceptions import Retry
+
+from app import db
+from app.auth import services as auth
+from app.auth.clients import HTTPError
+from app.recommendations import models, services
+from app.worker import enqueue_send_recommendations
+from app.worker.tasks import send_recommendations
+from tests.conftest import MockRecommendation
+
+
+def test_enqueue_send_recommendations(celery_mock):
+    count = enqueue_send_recommendations(recommendation_ids=list(range(1, 8)), batch_size=3)
+
+    assert count == 3
+    assert [message["name"] for message in celery_mock.messages] == ["app.worker.tasks.send_recommendations"] * 3
+    assert [message["args"] for message in celery_mock.messages] == [([1, 2, 3],), ([4, 5, 6],), ([7],)]
+
+
+def test_get_recommendations_responses():
+    MockRecommendation.create(id=1)
+    MockRecommendation.create(id=2)
+
+    with db.begin():
+        for data in ([], [{"object_id": "1", "object_type": "campaign", "status": "pending"}]):
+            db_status = models.PlatformStatusInput(id=1, platform="facebook", data=data)
+            services.consume_platform_status(db_status)
+
+    with db.connect():
+        items = services.get_recommendations_responses(ids_=[1, 2, 3])
+
+    assert [item.id for item in items] == [1, 2]
+    assert [status.id for status in items[0].platform_statuses] == [2]
+    assert items[1].platform_statuses == []
+
+
+def test_send_recommendations_retries_failed_account(monkeypatch):
+    MockRecommendation.create(id=1, account_id=261)
+    MockRecommendation.create(id=2, account_id=262)
+    MockRecommendation.create(id=3, account_id=262)
+
+    def get_users(company_id):
+        if company_id == 262:
+            raise HTTPError("Service unavailable")
+        return []
+
+    retry = Mock(return_value=Retry())
+    monkeypatch.setattr(auth, "get_users", get_users)
+    monkeypatch.setattr(send_recommendations, "retry", retry)
+
+    with pytest.raises(Retry):
+        send_recommendations([1, 2, 3])
+
+    # recommendation of account sent successfully is not retried
+    retry.assert_called_once()
+    assert retry.call_args.kwargs["args"] == ([2, 3],)
+    assert isinstance(retry.call_args.kwargs["exc"], HTTPError)